@@ -0,0 +1,92 @@
+# batch_optimize.py
+import argparse
+import os
+from dotenv import load_dotenv
+load_dotenv()
+
+from utils import llm_config
+from utils.batch_runner import discover_pairs, run_batch
+from utils.output_sink import COMPRESSIONS, SHARD_MAX_RECORDS, SINK_KINDS, create_sink
+from utils.results import RESULT_EXTENSIONS, RESULT_FORMATS
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Optimize many resumes against many job descriptions without interactive prompts."
+    )
+    parser.add_argument("resumes", help="Directory of resumes (.pdf/.txt) or a JSON manifest file")
+    parser.add_argument("job_descriptions", nargs="?", help="Directory of job descriptions (.txt), when resumes is a directory")
+    parser.add_argument("-o", "--output-dir", default="batch_output", help="Directory for optimized resumes and the summary")
+    parser.add_argument("--pdf-workers", type=int, default=os.cpu_count(), help="Processes used for PDF extraction")
+    parser.add_argument("--llm-workers", type=int, default=8, help="Maximum LLM requests in flight")
+    parser.add_argument("--chunked", choices=["auto", "on", "off"], default="auto",
+                        help="Optimize section by section in parallel LLM calls and reuse unchanged sections on reruns "
+                             "(default: for long resumes and resumes optimized section by section before)")
+    parser.add_argument("--sink", choices=SINK_KINDS, default="files",
+                        help="Write one text file per result, or append results to JSONL shards")
+    parser.add_argument("--format", choices=RESULT_FORMATS, default="text",
+                        help="Render each result as the text report, Markdown, or JSON fields for downstream services")
+    parser.add_argument("--compression", choices=COMPRESSIONS, default="none", help="Compression of JSONL shards")
+    parser.add_argument("--shard-records", type=int, default=SHARD_MAX_RECORDS, help="Results per JSONL shard")
+    parser.add_argument("--dedup-threshold", type=float, default=None,
+                        help="Similarity (0-1) at which resumes count as near-duplicates and reuse earlier results "
+                             "(default: RESUME_AGENT_DEDUP_THRESHOLD or 0.9; 0 disables)")
+    parser.add_argument("--no-llm", action="store_true", help="Skip the LLM and use enhanced (fallback) processing only")
+    return parser.parse_args()
+
+def main():
+    """Runs the resume optimization pipeline in batch mode."""
+    args = parse_args()
+    print("🚀 RESUME OPTIMIZATION SYSTEM (BATCH MODE) 🚀")
+    print("=" * 50)
+
+    pairs = discover_pairs(args.resumes, args.job_descriptions)
+    if not pairs:
+        print("❌ No resume/job description pairs found.")
+        return
+    print(f"Found {len(pairs)} resume/job description pairs.")
+
+    if not args.no_llm:
+        llm_config.setup_llm()
+
+    try:
+        sink = create_sink(args.sink, args.output_dir, args.compression, args.shard_records,
+                           RESULT_EXTENSIONS[args.format])
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    with sink:
+        summary = run_batch(
+            pairs,
+            args.output_dir,
+            llm_instance=None if args.no_llm else llm_config.llm,
+            pdf_workers=args.pdf_workers,
+            llm_workers=args.llm_workers,
+            chunked=args.chunked,
+            sink=sink,
+            dedup_threshold=args.dedup_threshold,
+            result_format=args.format,
+        )
+
+    print("\n" + "=" * 50)
+    print("✅ BATCH OPTIMIZATION COMPLETED")
+    print("=" * 50)
+    print(f"Pairs processed: {summary['pairs']} "
+          f"(LLM: {summary['llm']}, enhanced: {summary['fallback']}, skipped: {summary['skipped']}, "
+          f"failed: {summary['failed']})")
+    if summary['dedup']:
+        dedup = summary['dedup']
+        print(f"Near-duplicate resumes: {dedup['hits']} of {dedup['lookups']} (hit rate {dedup['hit_rate']:.1%}), "
+              f"{summary['duplicate']} pairs reused")
+    if summary['llm']:
+        print(f"Prompt tokens saved by compaction: {summary['prompt_tokens_saved']}")
+    print(f"Input extraction: {summary['extraction_seconds']:.2f}s")
+    print(f"Total time: {summary['elapsed_seconds']:.2f}s ({summary['pairs_per_second']} pairs/s)")
+    if hasattr(llm_config.llm, 'stats'):
+        cache_stats = llm_config.llm.stats()
+        print(f"LLM cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+    if getattr(sink, 'committed', None):
+        print(f"Results written to {len(sink.committed)} shard(s) in: {args.output_dir}")
+    print(f"Summary written to: {os.path.join(args.output_dir, 'batch_summary.json')}")
+
+if __name__ == "__main__":
+    main()
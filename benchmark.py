@@ -0,0 +1,40 @@
+# benchmark.py
+import argparse
+import json
+
+from utils.benchmark import run_benchmarks
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the resume pipeline on a synthetic corpus and emit JSON.")
+    parser.add_argument("-o", "--output", help="Write the JSON results to this file instead of stdout")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the synthetic corpus")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions per benchmark")
+    parser.add_argument("--jobs", type=int, default=3, help="Jobs in each synthetic resume")
+    parser.add_argument("--bullets", type=int, default=5, help="Bullet points per job")
+    parser.add_argument("--pdf-pages", type=int, default=5, help="Pages in the synthetic PDF")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Stub LLM latency before the first token (s)")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=500.0, help="Stub LLM output rate")
+    parser.add_argument("--llm-response-tokens", type=int, default=200, help="Tokens in each stub LLM response")
+    parser.add_argument("--no-startup", action="store_true", help="Skip the CLI cold start measurement")
+    parser.add_argument("--batch-pairs", type=int, default=20, help="Resume/job description pairs in the batch benchmark")
+    return parser.parse_args()
+
+def main():
+    """Runs the benchmark suite and writes machine-readable results."""
+    args = parse_args()
+    results = run_benchmarks(
+        seed=args.seed, repeat=args.repeat, jobs=args.jobs, bullets_per_job=args.bullets,
+        pdf_pages=args.pdf_pages, llm_latency=args.llm_latency,
+        llm_tokens_per_second=args.llm_tokens_per_second, llm_response_tokens=args.llm_response_tokens,
+        batch_pairs=args.batch_pairs, startup=not args.no_startup,
+    )
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output + "\n")
+        print(f"✓ Benchmark results written to: {args.output}")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# candidate_search.py
+import argparse
+import json
+import os
+import time
+
+from utils.batch_runner import RESUME_EXTENSIONS
+from utils.candidate_index import CandidateIndex, ingest_resumes
+
+def _collect_resume_paths(paths):
+    """Expands directories into the resume files (.pdf/.txt) they contain."""
+    resume_paths = []
+    for path in paths:
+        if os.path.isdir(path):
+            resume_paths.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.lower().endswith(RESUME_EXTENSIONS)
+            )
+        else:
+            resume_paths.append(path)
+    return resume_paths
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Find the best resumes for a job posting in a persistent candidate index.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest = subparsers.add_parser("ingest", help="Add resumes (files or directories) to the index")
+    ingest.add_argument("index", help="Index directory (created if missing)")
+    ingest.add_argument("paths", nargs="+", help="Resume files (.pdf/.txt) or directories")
+    ingest.add_argument("--pdf-workers", type=int, default=os.cpu_count(), help="Processes used for PDF extraction")
+
+    search = subparsers.add_parser("search", help="Rank the indexed candidates for a job description")
+    search.add_argument("index", help="Index directory")
+    search.add_argument("job_description", help="Job description text file")
+    search.add_argument("-k", "--top", type=int, default=10, help="Number of candidates to show")
+    search.add_argument("--json", action="store_true", help="Print the results as JSON")
+
+    delete = subparsers.add_parser("delete", help="Remove candidates from the index")
+    delete.add_argument("index", help="Index directory")
+    delete.add_argument("ids", nargs="+", help="Candidate ids (resume file names without extension)")
+
+    compact = subparsers.add_parser("compact", help="Reclaim the space of deleted candidates")
+    compact.add_argument("index", help="Index directory")
+    return parser.parse_args()
+
+def main():
+    """Manages and queries the recruiter-side candidate index."""
+    args = parse_args()
+    index = CandidateIndex(args.index)
+
+    if args.command == "ingest":
+        paths = _collect_resume_paths(args.paths)
+        started = time.perf_counter()
+        added = ingest_resumes(index, paths, args.pdf_workers)
+        print(f"✓ Added {added} of {len(paths)} resumes in {time.perf_counter() - started:.2f}s "
+              f"({len(paths) - added} empty or already indexed).")
+    elif args.command == "search":
+        with open(args.job_description, 'r', encoding='utf-8') as file:
+            job_description = file.read()
+        started = time.perf_counter()
+        results = index.search(job_description, top_k=args.top)
+        search_seconds = time.perf_counter() - started
+        if args.json:
+            print(json.dumps(results, indent=2))
+            return
+        print(f"\n✓ Searched {len(index)} candidates in {search_seconds * 1000:.1f} ms")
+        print("=" * 50)
+        for rank, result in enumerate(results, start=1):
+            print(f"{rank}. {result['id']}  (score {result['score']:.3f})  {result['path']}")
+            print(f"   Matched skills: {', '.join(result['matched_skills']) or 'None'}")
+            print(f"   Missing skills: {', '.join(result['missing_skills']) or 'None'}")
+    elif args.command == "delete":
+        print(f"✓ Deleted {index.delete(args.ids)} candidates.")
+    elif args.command == "compact":
+        print(f"✓ Compacted the index, removing {index.compact()} deleted candidates.")
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,65 @@
 # main.py
+import argparse
 import os
+import time
 import traceback
 from dotenv import load_dotenv 
 load_dotenv()
 
 # Import functions and classes from the utils module
-from utils.llm_config import setup_llm, llm, test_llm_simple
+from utils import llm_config
+from utils.llm_config import setup_llm
 from utils.input_handlers import ResumeInputHandler
-from utils.resume_processor import simple_resume_optimization, SimpleFallback
-from utils.file_manager import save_output_to_file
+from utils.resume_processor import (
+    simple_resume_optimization, llm_resume_optimization, llm_resume_optimization_stream,
+    prepare_optimization_prompt
+)
+from utils.file_manager import save_output_to_file, StreamingFileWriter
+from utils.metrics import enable_metrics, span, write_metrics, METRICS_FORMATS
 
-def main():
-    """Main function to run the resume optimization system."""
+def stream_llm_optimization(llm, resume_text: str, job_description: str, prompt: str = None) -> StreamingFileWriter:
+    """
+    Streams the AI-powered optimization to the console and to a partial output file
+    as chunks arrive, and reports the time to first token.
+    Returns the writer, to be committed or discarded once the user decides whether to save.
+    """
+    writer = StreamingFileWriter()
+    started = time.perf_counter()
+    first_token_seconds = None
+    with writer:
+        print("\n" + "=" * 50)
+        for chunk in llm_resume_optimization_stream(llm, resume_text, job_description, prompt):
+            if first_token_seconds is None:
+                first_token_seconds = time.perf_counter() - started
+            print(chunk, end="", flush=True) # Show each chunk as soon as it arrives
+            writer.write(chunk)
+        print()
+    if first_token_seconds is None:
+        writer.discard()
+        raise ValueError("The LLM returned an empty response.")
+
+    total_seconds = time.perf_counter() - started
+    print("=" * 50)
+    print("✅ AI-POWERED OPTIMIZATION COMPLETED!")
+    print(f"⏱️ First token after {first_token_seconds:.2f}s, complete after {total_seconds:.2f}s")
+    print("=" * 50)
+    return writer
+
+def main(stream: bool = True, chunked: str = "auto"):
+    """
+    Main function to run the resume optimization system.
+    With 'stream', the LLM output is shown and written to disk as it is generated.
+    'chunked' ('auto', 'on' or 'off') selects section-by-section optimization;
+    in 'auto' mode it is used for long resumes.
+    """
     print("🚀 RESUME OPTIMIZATION SYSTEM 🚀")
     print("=" * 50)
 
-    # Step 1: Setup LLM
-    # The setup_llm function initializes the global 'llm' variable
-    # defined in llm_config.py
-    setup_llm()
+    # The provider SDKs are imported in the background while the user enters the inputs,
+    # so the first prompt appears without waiting for them
+    llm_config.preload_provider_sdks_in_background()
 
-    # Step 2: Get user inputs for resume and job description
+    # Step 1: Get user inputs for resume and job description
     try:
         print("\nStep 1: Provide your resume")
         resume_text = ResumeInputHandler.get_resume_input()
@@ -35,63 +74,69 @@ def main():
         traceback.print_exc()
         return
 
+    # Step 2: Setup LLM
+    # The setup_llm function initializes the global 'llm' variable
+    # defined in llm_config.py (read through the module, since it is reassigned there)
+    setup_llm()
+
     result = "" # Initialize result variable
+    streamed_output = None # Set when the LLM output was streamed to a partial file
 
     # Step 3: Perform resume optimization
-    # Check if LLM is functional and proceed with AI-powered optimization or fallback
-    if llm and test_llm_simple():
+    # Proceed with AI-powered optimization if an LLM is configured, or fall back.
+    # No separate test request is made: a failure of the real request is recorded
+    # as provider health and handled by the fallback below.
+    llm = llm_config.llm
+    if llm:
         print("\n🚀 LLM is available, proceeding with AI-powered optimization...")
+        from utils.chunked_optimizer import (
+            chunked_resume_optimization, record_whole_prompt_run, use_chunked_mode
+        )
         
         try:
-            # Extract skills using the simple fallback method, as the original code
-            # used it even before the direct LLM call. This provides structured skills
-            # for the LLM prompt.
-            skills = SimpleFallback.extract_skills_simple(resume_text)
-            skills_text = (
-                f"Technical: {', '.join(skills['technical'])}\n"
-                f"Soft: {', '.join(skills['soft'])}\n"
-                f"Domain: {', '.join(skills['domain'])}"
-            )
-            
-            # Construct the prompt for the LLM to generate the optimized resume
-            prompt = (
-                f"You are an expert resume writer. Create a highly ATS-friendly resume. "
-                f"Utilize the following information to tailor the resume specifically for the job description:\n\n"
-                f"--- ORIGINAL RESUME CONTENT ---\n{resume_text}\n\n"
-                f"--- EXTRACTED SKILLS ---\n{skills_text}\n\n"
-                f"--- JOB DESCRIPTION ---\n{job_description}\n\n"
-                f"Focus on:\n"
-                f"- Incorporating keywords from the job description naturally\n"
-                f"- Quantifying achievements wherever possible\n"
-                f"- Using clear, standard section headers\n"
-                f"- Ensuring ATS-friendly formatting\n"
-                f"Provide only the complete, well-formatted resume text."
-            )
-            
-            # Invoke the LLM to get the optimized resume content
-            response = llm.invoke(prompt)
-            # Extract the content from the LLM's response object
-            result = response.content if hasattr(response, 'content') else str(response)
-            
-            print("\n" + "=" * 50)
-            print("✅ AI-POWERED OPTIMIZATION COMPLETED!")
-            print("=" * 50)
-            print(result)
+            if use_chunked_mode(resume_text, chunked):
+                # Long resume: rewrite the sections in parallel calls and merge them
+                print("🧩 Optimizing the resume section by section...")
+                result = chunked_resume_optimization(llm, resume_text, job_description)
+
+                print("\n" + "=" * 50)
+                print("✅ AI-POWERED OPTIMIZATION COMPLETED!")
+                print("=" * 50)
+                print(result)
+            else:
+                # Build the prompt (resume, SimpleFallback skills and compacted job description)
+                # and invoke the LLM to get the optimized resume content
+                prepared = prepare_optimization_prompt(resume_text, job_description, getattr(llm, 'provider', None))
+                if prepared.tokens_saved > 0:
+                    print(f"✂️ Prompt compacted to {prepared.prompt_tokens} tokens ({prepared.tokens_saved} tokens saved)")
+                if stream:
+                    streamed_output = stream_llm_optimization(llm, resume_text, job_description, prepared.prompt)
+                    record_whole_prompt_run(resume_text)
+                else:
+                    result = llm_resume_optimization(llm, resume_text, job_description, prepared.prompt)
+                    record_whole_prompt_run(resume_text)
+
+                    print("\n" + "=" * 50)
+                    print("✅ AI-POWERED OPTIMIZATION COMPLETED!")
+                    print("=" * 50)
+                    print(result)
             
         except Exception as e:
             print(f"❌ AI-powered optimization failed: {e}")
             print("🔄 Falling back to enhanced processing (non-LLM mode)...")
             # If LLM optimization fails, fall back to the simple rule-based optimization
-            result = simple_resume_optimization(resume_text, job_description)
+            with span("fallback_optimize"):
+                result = simple_resume_optimization(resume_text, job_description)
             
             print("\n" + "=" * 50)
             print("✅ RESUME OPTIMIZATION COMPLETED (Enhanced Mode)")
             print("=" * 50)  
             print(result)
     else:
-        # If no LLM is available or LLM test fails, use the enhanced fallback mode
-        print("🔄 LLM not available or test failed. Using enhanced processing mode...")
-        result = simple_resume_optimization(resume_text, job_description)
+        # If no LLM is available, use the enhanced fallback mode
+        print("🔄 LLM not available. Using enhanced processing mode...")
+        with span("fallback_optimize"):
+            result = simple_resume_optimization(resume_text, job_description)
 
         print("\n" + "=" * 50)
         print("✅ RESUME OPTIMIZATION COMPLETED (Enhanced Mode)")
@@ -102,13 +147,40 @@ def main():
     try:
         save_choice = input("\nDo you want to save the results to a file? (y/n): ").strip().lower()
         if save_choice in ['y', 'yes']:
-            filename = save_output_to_file(str(result))
+            if streamed_output is not None:
+                # Streamed output is already on disk; move it into place
+                filename = streamed_output.commit()
+            else:
+                filename = save_output_to_file(str(result))
             if filename:
                 print(f"✅ Results saved to: {filename}")
+        elif streamed_output is not None:
+            streamed_output.discard()
     except KeyboardInterrupt:
+        if streamed_output is not None:
+            streamed_output.discard()
         print("\nGoodbye!")
     except Exception as e:
         print(f"Error saving file: {e}")
 
 if __name__ == "__main__":
-    main() # Call the main function when the script is executed
+    parser = argparse.ArgumentParser(description="Optimize a resume for a job description.")
+    parser.add_argument("--no-stream", action="store_true", help="Wait for the complete LLM response instead of streaming it")
+    parser.add_argument("--chunked", choices=["auto", "on", "off"], default="auto",
+                        help="Optimize section by section in parallel LLM calls and reuse unchanged sections on reruns "
+                             "(default: for long resumes and resumes optimized section by section before)")
+    parser.add_argument("--metrics", default=os.getenv('RESUME_AGENT_METRICS'),
+                        help="Write per-stage timings to this file (default: RESUME_AGENT_METRICS)")
+    parser.add_argument("--metrics-format", choices=METRICS_FORMATS,
+                        help="Metrics file format (default: inferred from the extension; .prom is Prometheus)")
+    args = parser.parse_args()
+    if args.metrics:
+        enable_metrics()
+    try:
+        main(stream=not args.no_stream, chunked=args.chunked) # Call the main function when the script is executed
+    finally:
+        if args.metrics:
+            try:
+                print(f"📊 Metrics written to: {write_metrics(args.metrics, args.metrics_format)}")
+            except Exception as e:
+                print(f"Error writing metrics: {e}")
@@ -0,0 +1,52 @@
+# rank_jobs.py
+import argparse
+import json
+import time
+
+from utils.batch_runner import load_resume_file
+from utils.jd_index import JobDescriptionIndex, load_postings
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Rank job postings by how well they fit a resume.")
+    parser.add_argument("resume", help="Resume file (.pdf or .txt)")
+    parser.add_argument("jobs", nargs="?", help="Directory of .txt job descriptions or a JSON Lines feed")
+    parser.add_argument("--index", help="Load a saved index instead of building one from 'jobs'")
+    parser.add_argument("--save-index", help="Save the built index to this directory")
+    parser.add_argument("-k", "--top", type=int, default=10, help="Number of postings to show")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    return parser.parse_args()
+
+def main():
+    """Ranks job postings against a resume using the sparse job description index."""
+    args = parse_args()
+    if not args.index and not args.jobs:
+        print("❌ Provide job postings or a saved index (--index).")
+        return
+
+    started = time.perf_counter()
+    if args.index:
+        index = JobDescriptionIndex.load(args.index)
+    else:
+        index = JobDescriptionIndex.build(load_postings(args.jobs))
+        if args.save_index:
+            index.save(args.save_index)
+    index_seconds = time.perf_counter() - started
+
+    resume_text = load_resume_file(args.resume)
+    started = time.perf_counter()
+    results = index.search(resume_text, top_k=args.top)
+    search_seconds = time.perf_counter() - started
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"\n✓ Indexed {len(index)} postings in {index_seconds:.2f}s, searched in {search_seconds * 1000:.1f} ms")
+    print("=" * 50)
+    for rank, result in enumerate(results, start=1):
+        print(f"{rank}. {result['id']}  (score {result['score']:.3f})")
+        print(f"   Matched skills: {', '.join(result['matched_skills']) or 'None'}")
+        print(f"   Missing skills: {', '.join(result['missing_skills']) or 'None'}")
+
+if __name__ == "__main__":
+    main()
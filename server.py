@@ -0,0 +1,49 @@
+# server.py
+import argparse
+import os
+from dotenv import load_dotenv
+load_dotenv()
+
+from utils import llm_config
+from utils.server import OptimizationService, make_server
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve resume optimization over HTTP with a warm LLM client.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--pdf-workers", type=int, default=os.cpu_count(), help="Processes used for PDF extraction")
+    parser.add_argument("--max-in-flight", type=int, default=8, help="Maximum LLM requests in flight")
+    parser.add_argument("--max-pending", type=int, default=32, help="Requests admitted at once before answering 429")
+    parser.add_argument("--stub-llm", action="store_true", help="Use the local stub LLM instead of a real provider")
+    parser.add_argument("--no-llm", action="store_true", help="Use enhanced (fallback) processing only")
+    return parser.parse_args()
+
+def main():
+    """Starts the long-running optimization service."""
+    args = parse_args()
+    print("🚀 RESUME OPTIMIZATION SERVICE 🚀")
+    print("=" * 50)
+
+    if args.stub_llm:
+        os.environ['RESUME_AGENT_LLM_PROVIDER'] = 'stub'
+    if not args.no_llm:
+        llm_config.setup_llm()
+
+    service = OptimizationService(
+        None if args.no_llm else llm_config.llm,
+        pdf_workers=args.pdf_workers,
+        max_in_flight=args.max_in_flight,
+        max_pending=args.max_pending,
+    )
+    server = make_server(service, args.host, args.port)
+    print(f"✓ Listening on http://{args.host}:{args.port} (POST /optimize, GET /health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        server.server_close()
+        service.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# utils/async_llm.py
+import asyncio
+import os
+import random
+import time
+from typing import Dict, Optional
+
+from utils.prompt_budget import estimate_tokens
+
+class TokenBucket:
+    """
+    An asyncio token bucket refilled continuously at 'per_minute' units per minute.
+    The bucket holds at most one minute's worth of units, which bounds bursts.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        """Waits until 'amount' units are available, then takes them."""
+        amount = min(amount, self.capacity)  # A request larger than the bucket waits for a full bucket
+        while True:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep((amount - self.tokens) / self.rate)
+
+# Rate limit buckets shared by every client talking to the same provider
+_provider_buckets: Dict[tuple, TokenBucket] = {}
+
+def _provider_bucket(provider: str, kind: str) -> Optional[TokenBucket]:
+    """
+    Returns the shared bucket for a provider's requests ('RPM') or tokens ('TPM') per minute,
+    configured with RESUME_AGENT_<PROVIDER>_RPM / RESUME_AGENT_<PROVIDER>_TPM. None means unlimited.
+    """
+    key = (provider, kind)
+    if key not in _provider_buckets:
+        limit = os.getenv(f"RESUME_AGENT_{provider.upper()}_{kind}")
+        _provider_buckets[key] = TokenBucket(float(limit)) if limit else None
+    return _provider_buckets[key]
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Returns True if the error is a provider rate limit (HTTP 429 / resource exhausted)."""
+    status = getattr(error, 'status_code', None) or getattr(getattr(error, 'response', None), 'status_code', None)
+    if status == 429:
+        return True
+    name = type(error).__name__
+    return 'RateLimit' in name or 'ResourceExhausted' in name or '429' in str(error)
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Returns the delay in seconds requested by the provider's Retry-After header, if any."""
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    try:
+        value = headers.get('retry-after') or headers.get('Retry-After')
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+class AsyncLLMClient:
+    """
+    Runs LLM requests on an asyncio event loop using the chat model's 'ainvoke'.
+    At most 'max_in_flight' requests run at once, requests and tokens are rate limited
+    per provider, and rate-limit errors are retried with exponential backoff that
+    honours the provider's Retry-After.
+    """
+
+    def __init__(self, llm, max_in_flight: int = 8, max_retries: int = 4, base_delay: float = 1.0):
+        self.llm = llm
+        self.provider = getattr(llm, 'provider', None) or 'default'
+        self.max_tokens = getattr(llm, 'max_tokens', None) or 0
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        # A router (utils/llm_router.py) limits each provider it routes to itself
+        limited_by_llm = getattr(llm, 'limits_providers', False)
+        self._request_bucket = None if limited_by_llm else _provider_bucket(self.provider, 'RPM')
+        self._token_bucket = None if limited_by_llm else _provider_bucket(self.provider, 'TPM')
+
+    async def _call(self, prompt):
+        if hasattr(self.llm, 'ainvoke_uncached'):
+            # The cache was already checked in ainvoke
+            return await self.llm.ainvoke_uncached(prompt)
+        if hasattr(self.llm, 'ainvoke'):
+            return await self.llm.ainvoke(prompt)
+        # Models without an async interface run on a worker thread
+        return await asyncio.to_thread(self.llm.invoke, prompt)
+
+    async def ainvoke(self, prompt):
+        """Invokes the LLM asynchronously within the concurrency and rate limits."""
+        # Cached responses cost no provider capacity, so they skip the limits.
+        # The lookup is a SQLite query, run on a worker thread so a busy database never blocks the loop
+        lookup = getattr(self.llm, 'lookup', None)
+        if lookup is not None:
+            cached = await asyncio.to_thread(lookup, prompt)
+            if cached is not None:
+                return cached
+
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                if self._request_bucket is not None:
+                    await self._request_bucket.acquire(1)
+                if self._token_bucket is not None:
+                    # Reserve the prompt plus the maximum completion length
+                    await self._token_bucket.acquire(estimate_tokens(str(prompt)) + self.max_tokens)
+                try:
+                    return await self._call(prompt)
+                except Exception as e:
+                    if not is_rate_limit_error(e) or attempt == self.max_retries:
+                        raise
+                    delay = _retry_after(e) or self.base_delay * (2 ** attempt) * (1 + random.random())
+                    print(f"⚠️ {self.provider} rate limit hit. Retrying in {delay:.1f}s...")
+                    await asyncio.sleep(delay)
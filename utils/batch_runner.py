@@ -0,0 +1,353 @@
+# utils/batch_runner.py
+import asyncio
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from utils.chunked_optimizer import (
+    chunked_resume_optimization_async, record_whole_prompt_run, use_chunked_mode
+)
+from utils.input_handlers import ResumeInputHandler
+from utils.async_llm import AsyncLLMClient
+from utils.dedup import NearDuplicateIndex, configured_threshold
+from utils.resume_processor import (
+    analyze_resume, llm_resume_optimization_async, prepare_optimization_prompt
+)
+from utils.output_sink import FileSink, OutputSink, text_sha256
+from utils.results import RESULT_EXTENSIONS, RESULT_FORMATS, render_content
+
+RESUME_EXTENSIONS = ('.pdf', '.txt')
+JOB_DESCRIPTION_EXTENSIONS = ('.txt',)
+
+def _list_files(directory: str, extensions: Tuple[str, ...]) -> List[str]:
+    """Returns the sorted paths of all files in 'directory' with one of the given extensions."""
+    return sorted(
+        str(path) for path in Path(directory).iterdir()
+        if path.is_file() and path.suffix.lower() in extensions
+    )
+
+def discover_pairs(resumes: str, job_descriptions: str = None) -> List[Tuple[str, str]]:
+    """
+    Builds the list of (resume_path, job_description_path) pairs to process.
+
+    'resumes' is either a directory of resumes (PDF/txt) or a JSON manifest file.
+    With a directory, 'job_descriptions' must be a directory of .txt job descriptions
+    and every resume is paired with every job description.
+
+    A manifest may list explicit pairs:
+        {"pairs": [{"resume": "a.pdf", "job_description": "jd1.txt"}, ...]}
+    or two lists that are combined into every possible pair:
+        {"resumes": ["a.pdf", "b.txt"], "job_descriptions": ["jd1.txt", "jd2.txt"]}
+    Relative paths in a manifest are resolved against the manifest's directory.
+    """
+    if os.path.isdir(resumes):
+        if not job_descriptions or not os.path.isdir(job_descriptions):
+            raise ValueError("A job description directory is required when resumes is a directory.")
+        resume_paths = _list_files(resumes, RESUME_EXTENSIONS)
+        jd_paths = _list_files(job_descriptions, JOB_DESCRIPTION_EXTENSIONS)
+        return [(resume, jd) for resume in resume_paths for jd in jd_paths]
+
+    with open(resumes, 'r', encoding='utf-8') as file:
+        manifest = json.load(file)
+    base_dir = os.path.dirname(os.path.abspath(resumes))
+
+    def resolve(path: str) -> str:
+        return path if os.path.isabs(path) else os.path.join(base_dir, path)
+
+    if "pairs" in manifest:
+        return [(resolve(pair["resume"]), resolve(pair["job_description"])) for pair in manifest["pairs"]]
+    return [
+        (resolve(resume), resolve(jd))
+        for resume in manifest.get("resumes", [])
+        for jd in manifest.get("job_descriptions", [])
+    ]
+
+def load_resume_file(path: str) -> str:
+    """
+    Loads the text of a single resume file (PDF or plain text).
+    Defined at module level so it can be shipped to worker processes.
+    """
+    if path.lower().endswith('.pdf'):
+        return ResumeInputHandler.extract_text_from_pdf(path)
+    with open(path, 'r', encoding='utf-8') as file:
+        return file.read()
+
+def load_resumes(paths: List[str], pdf_workers: Optional[int] = None) -> Dict[str, str]:
+    """
+    Loads every unique resume once. PDF parsing is CPU-bound, so PDFs are
+    spread across a process pool; text files are read directly.
+    """
+    texts = {}
+    pdf_paths = [path for path in paths if path.lower().endswith('.pdf')]
+    for path in paths:
+        if path not in pdf_paths:
+            try:
+                texts[path] = load_resume_file(path)
+            except Exception as e:
+                print(f"❌ Could not read resume '{path}': {e}")
+                texts[path] = ""
+
+    if pdf_paths:
+        with ProcessPoolExecutor(max_workers=pdf_workers) as executor:
+            futures = {path: executor.submit(load_resume_file, path) for path in pdf_paths}
+            for path, future in futures.items():
+                try:
+                    texts[path] = future.result()
+                except Exception as e:
+                    print(f"❌ Could not extract resume '{path}': {e}")
+                    texts[path] = ""
+    return texts
+
+def find_duplicate_resumes(resume_texts: Dict[str, str], threshold: float) -> Tuple[Dict[str, Tuple[str, float]], Dict]:
+    """
+    Fingerprints every extracted resume with MinHash and looks it up in an LSH index of
+    the resumes seen before it (in path order). Returns the near-duplicates as
+    {path: (path of the earlier resume, estimated similarity)} and the index statistics.
+    """
+    index = NearDuplicateIndex(threshold)
+    duplicates = {}
+    for path in sorted(resume_texts):
+        match = index.find_or_add(path, resume_texts[path])
+        if match is not None:
+            duplicates[path] = match
+    return duplicates, index.stats()
+
+def _output_key(resume_path: str, jd_path: str) -> str:
+    """Returns a pair's output key (the file name stem) from the resume and job description file names."""
+    return f"{Path(resume_path).stem}__{Path(jd_path).stem}"
+
+def _output_keys(pairs: List[Tuple[str, str]]) -> Dict[Tuple[str, str], str]:
+    """
+    Returns a unique output key for each pair. Pairs whose file name stems collide
+    (jane.pdf and jane.txt, or the same names in different directories) get a short
+    hash of their full paths appended, so no result overwrites another.
+    """
+    stems = {}
+    for pair in dict.fromkeys(pairs):
+        stems.setdefault(_output_key(*pair), []).append(pair)
+    keys = {}
+    for key, stem_pairs in stems.items():
+        for resume_path, jd_path in stem_pairs:
+            if len(stem_pairs) == 1:
+                keys[(resume_path, jd_path)] = key
+            else:
+                identity = f"{os.path.abspath(resume_path)}\n{os.path.abspath(jd_path)}"
+                keys[(resume_path, jd_path)] = f"{key}-{hashlib.sha256(identity.encode('utf-8')).hexdigest()[:8]}"
+    return keys
+
+async def _process_pair(llm_client, resume_path: str, resume_text: str,
+                        jd_path: str, job_description: str, sink: OutputSink, chunked: str = "auto",
+                        result_format: str = "text", output_key: str = None) -> Dict:
+    """
+    Optimizes one resume against one job description.
+    Uses the LLM when available and falls back to SimpleFallback processing otherwise.
+    The result is rendered once, in 'result_format' (see utils/results.py); the
+    structured fallback analysis also goes into the sink's metadata.
+    The result is stored under 'output_key' (default: _output_key of the file names).
+    Returns the pair's record and its (LLM text, analysis) result, for reuse by near-duplicate
+    resumes (None if the resume was skipped).
+    """
+    started = time.perf_counter()
+    record = {"resume": resume_path, "job_description": jd_path, "mode": None, "output": None, "error": None}
+
+    if not resume_text.strip():
+        record["mode"] = "skipped"
+        record["error"] = "No text could be extracted from the resume."
+        record["seconds"] = round(time.perf_counter() - started, 4)
+        return record, None
+
+    result, analysis = None, None
+    if llm_client is not None:
+        try:
+            # Prompt building (parsing, compaction, skill matching) and the section cache's SQLite
+            # lookups run on worker threads, like the fallback analysis below
+            if await asyncio.to_thread(use_chunked_mode, resume_text, chunked):
+                result = await chunked_resume_optimization_async(llm_client, resume_text, job_description,
+                                                                 llm_client.provider)
+                record["chunked"] = True
+            else:
+                prepared = await asyncio.to_thread(prepare_optimization_prompt, resume_text, job_description,
+                                                   llm_client.provider)
+                record["prompt_tokens"] = prepared.prompt_tokens
+                record["prompt_tokens_saved"] = prepared.tokens_saved
+                result = await llm_resume_optimization_async(llm_client, resume_text, job_description, prepared.prompt)
+                await asyncio.to_thread(record_whole_prompt_run, resume_text)
+            record["mode"] = "llm"
+        except Exception as e:
+            record["error"] = f"LLM optimization failed: {e}"
+
+    if result is None:
+        # No LLM configured or the LLM call failed: use the rule-based optimization,
+        # on a worker thread so the CPU-bound work does not stall the other pairs' requests
+        analysis = await asyncio.to_thread(analyze_resume, resume_text, job_description)
+        record["mode"] = "fallback"
+
+    metadata = {
+        "resume": resume_path,
+        "job_description": jd_path,
+        "resume_sha256": text_sha256(resume_text),
+        "job_description_sha256": text_sha256(job_description),
+        "mode": record["mode"],
+    }
+    if analysis is not None:
+        metadata["analysis"] = analysis.to_dict(include_resume=False)
+    content = render_content(result, result_format, analysis, {"mode": record["mode"]})
+    record["output"] = await asyncio.to_thread(sink.write, content, output_key or _output_key(resume_path, jd_path),
+                                               metadata)
+    record["seconds"] = round(time.perf_counter() - started, 4)
+    return record, (result, analysis)
+
+def _reuse_result(resume_path: str, resume_text: str, jd_path: str, job_description: str,
+                  duplicate_of: str, similarity: float, result: Tuple[Optional[str], object], sink: OutputSink,
+                  result_format: str = "text", output_key: str = None) -> Dict:
+    """
+    Stores the result of a near-duplicate resume's pair for this pair, without optimizing again.
+    'result' is the (LLM text, analysis) returned by _process_pair for that pair; it is
+    rendered again so a JSON result carries this pair's mode and duplicate_of.
+    """
+    record = {
+        "resume": resume_path, "job_description": jd_path, "mode": "duplicate",
+        "duplicate_of": duplicate_of, "similarity": round(similarity, 4), "error": None,
+    }
+    text, analysis = result
+    content = render_content(text, result_format, analysis, {"mode": "duplicate", "duplicate_of": duplicate_of})
+    record["output"] = sink.write(content, output_key or _output_key(resume_path, jd_path), {
+        "resume": resume_path,
+        "job_description": jd_path,
+        "resume_sha256": text_sha256(resume_text),
+        "job_description_sha256": text_sha256(job_description),
+        "mode": "duplicate",
+        "duplicate_of": duplicate_of,
+    })
+    record["seconds"] = 0.0
+    return record
+
+async def _process_pairs(pairs: List[Tuple[str, str]], resume_texts: Dict[str, str],
+                         job_descriptions: Dict[str, str], sink: OutputSink,
+                         llm_instance, llm_workers: int, chunked: str = "auto",
+                         duplicates: Dict[str, Tuple[str, float]] = None, result_format: str = "text",
+                         job_description_errors: Dict[str, str] = None) -> List[Dict]:
+    """
+    Optimizes all pairs on one event loop, sharing a rate-limited async LLM client.
+    A pair whose resume is a near-duplicate (see find_duplicate_resumes) reuses the result
+    of the earlier resume with the same job description, when that pair is in the batch.
+    Pairs whose job description could not be read ('job_description_errors') are failed.
+    """
+    llm_client = AsyncLLMClient(llm_instance, max_in_flight=max(1, llm_workers)) if llm_instance is not None else None
+    duplicates = duplicates or {}
+    job_description_errors = job_description_errors or {}
+    records = {
+        (resume, jd): {"resume": resume, "job_description": jd, "mode": "failed", "output": None,
+                       "error": job_description_errors[jd], "seconds": 0.0}
+        for resume, jd in pairs if jd in job_description_errors
+    }
+    pairs_to_run = [pair for pair in pairs if pair not in records]
+    pair_set = set(pairs_to_run)
+    reused = [(resume, jd) for resume, jd in pairs_to_run
+              if resume in duplicates and (duplicates[resume][0], jd) in pair_set]
+    reused_set = set(reused)
+    optimized = [pair for pair in dict.fromkeys(pairs_to_run) if pair not in reused_set]
+    output_keys = _output_keys(pairs)
+
+    outcomes = await asyncio.gather(*(
+        _process_pair(llm_client, resume, resume_texts[resume], jd, job_descriptions[jd], sink, chunked,
+                      result_format, output_keys[(resume, jd)])
+        for resume, jd in optimized
+    ))
+    records.update((pair, record) for pair, (record, _) in zip(optimized, outcomes))
+    results = {pair: result for pair, (_, result) in zip(optimized, outcomes)}
+    for resume, jd in dict.fromkeys(reused):
+        duplicate_of, similarity = duplicates[resume]
+        records[(resume, jd)] = await asyncio.to_thread(
+            _reuse_result, resume, resume_texts[resume], jd, job_descriptions[jd], duplicate_of, similarity,
+            results[(duplicate_of, jd)], sink, result_format, output_keys[(resume, jd)]
+        )
+    return [records[pair] for pair in pairs]
+
+def run_batch(pairs: List[Tuple[str, str]], output_dir: str, llm_instance=None,
+              pdf_workers: Optional[int] = None, llm_workers: int = 8, chunked: str = "auto",
+              sink: OutputSink = None, dedup_threshold: Optional[float] = None,
+              result_format: str = "text") -> Dict:
+    """
+    Runs the full optimization pipeline for every (resume, job description) pair.
+
+    Each unique resume and job description is loaded only once. PDF extraction runs
+    in a process pool of 'pdf_workers' processes and the per-pair optimizations share
+    one event loop, with at most 'llm_workers' LLM requests in flight. Long resumes are
+    optimized section by section ('chunked': 'auto', 'on' or 'off').
+    After extraction, resumes are fingerprinted and near-duplicates (estimated similarity
+    at least 'dedup_threshold', default RESUME_AGENT_DEDUP_THRESHOLD; 0 turns it off)
+    reuse the result of the earlier copy instead of being optimized again.
+    Each result is rendered once, as 'result_format': 'text', 'markdown' or 'json' (the
+    mode, the optimized resume and the structured fields, without the report, in the same
+    schema for every mode; see utils/results.py).
+    Results go to 'sink' (see utils/output_sink.py), which the caller closes; by default
+    each result is a file in 'output_dir'. The summary is always written to 'output_dir'.
+    Returns a summary with per-pair records and throughput figures.
+    """
+    if result_format not in RESULT_FORMATS:
+        raise ValueError(f"Unknown result format '{result_format}'. Use one of: {', '.join(RESULT_FORMATS)}.")
+    os.makedirs(output_dir, exist_ok=True)
+    started = time.perf_counter()
+
+    # Step 1: Load inputs, each file exactly once
+    resume_paths = sorted({resume for resume, _ in pairs})
+    jd_paths = sorted({jd for _, jd in pairs})
+    resume_texts = load_resumes(resume_paths, pdf_workers)
+    job_descriptions, job_description_errors = {}, {}
+    for path in jd_paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                job_descriptions[path] = file.read()
+        except (OSError, UnicodeDecodeError) as e:
+            # Only the pairs with this job description fail; the rest of the batch runs
+            print(f"❌ Could not read job description '{path}': {e}")
+            job_description_errors[path] = f"Could not read the job description: {e}"
+    extraction_seconds = time.perf_counter() - started
+
+    # Step 2: Fingerprint the resumes to find near-duplicates
+    if dedup_threshold is None:
+        dedup_threshold = configured_threshold()
+    duplicates, dedup_stats = {}, None
+    if dedup_threshold > 0:
+        duplicates, dedup_stats = find_duplicate_resumes(resume_texts, dedup_threshold)
+        for path, (duplicate_of, similarity) in duplicates.items():
+            print(f"🔗 {path} is a near-duplicate of {duplicate_of} ({similarity:.0%} similar); reusing its results.")
+
+    # Step 3: Optimize all pairs concurrently
+    own_sink = sink is None
+    if own_sink:
+        sink = FileSink(output_dir, RESULT_EXTENSIONS[result_format])
+    try:
+        records = asyncio.run(_process_pairs(pairs, resume_texts, job_descriptions,
+                                             sink, llm_instance, llm_workers, chunked, duplicates,
+                                             result_format, job_description_errors))
+    finally:
+        if own_sink:
+            sink.close()
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "pairs": len(pairs),
+        "resumes": len(resume_paths),
+        "job_descriptions": len(jd_paths),
+        "llm": sum(1 for record in records if record["mode"] == "llm"),
+        "fallback": sum(1 for record in records if record["mode"] == "fallback"),
+        "skipped": sum(1 for record in records if record["mode"] == "skipped"),
+        "failed": sum(1 for record in records if record["mode"] == "failed"),
+        "duplicate": sum(1 for record in records if record["mode"] == "duplicate"),
+        "dedup": dedup_stats,
+        "prompt_tokens_saved": sum(record.get("prompt_tokens_saved", 0) for record in records),
+        "extraction_seconds": round(extraction_seconds, 4),
+        "elapsed_seconds": round(elapsed, 4),
+        "pairs_per_second": round(len(pairs) / elapsed, 2) if elapsed > 0 else None,
+        "results": records,
+    }
+
+    with open(os.path.join(output_dir, "batch_summary.json"), 'w', encoding='utf-8') as file:
+        json.dump(summary, file, indent=2)
+    return summary
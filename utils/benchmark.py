@@ -0,0 +1,344 @@
+# utils/benchmark.py
+import contextlib
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from utils.skill_matcher import DEFAULT_TAXONOMY
+
+# Target for the interactive CLI: time from launch to the first prompt on the text-only path,
+# beyond the bare interpreter startup (which depends on the installed site-packages)
+STARTUP_TARGET_MS = 100
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_FIRST_NAMES = ["Jane", "John", "Priya", "Wei", "Maria", "Ahmed", "Olga", "Kwame", "Lucia", "Kenji"]
+_LAST_NAMES = ["Smith", "Patel", "Chen", "Garcia", "Khan", "Ivanova", "Mensah", "Rossi", "Tanaka", "Brown"]
+_COMPANIES = ["Tech Solutions Inc.", "DataWorks", "CloudNine Labs", "Acme Corp", "Blue Ocean Analytics"]
+_TITLES = ["Software Engineer", "Data Analyst", "Backend Developer", "ML Engineer", "DevOps Engineer"]
+_VERBS = ["Built", "Led", "Designed", "Automated", "Migrated", "Optimized", "Delivered", "Mentored"]
+_OBJECTS = ["a reporting pipeline", "the checkout service", "internal dashboards", "a data platform",
+            "CI pipelines", "the search API", "a recommendation engine", "monitoring and alerting"]
+_BOILERPLATE = (
+    "We are an equal opportunity employer and value diversity at our company. We do not discriminate "
+    "on the basis of race, religion, color, national origin, gender, sexual orientation, age, marital "
+    "status, veteran status, or disability status. Our benefits include medical, dental and vision "
+    "insurance, a 401(k) plan with company match, paid time off and a learning stipend."
+)
+
+def _skills(rng: random.Random, count: int) -> List[str]:
+    all_skills = sorted({skill for skills in DEFAULT_TAXONOMY.values() for skill in skills})
+    return rng.sample(all_skills, min(count, len(all_skills)))
+
+def synthetic_resume(rng: random.Random, jobs: int = 3, bullets_per_job: int = 5) -> str:
+    """Generates a plausible resume with contact details, sections and skill-bearing bullets."""
+    first, last = rng.choice(_FIRST_NAMES), rng.choice(_LAST_NAMES)
+    lines = [
+        f"{first} {last}",
+        f"{first.lower()}.{last.lower()}@example.com | ({rng.randint(200, 999)}) {rng.randint(200, 999)}-{rng.randint(1000, 9999)}",
+        "",
+        "Professional Summary",
+        f"{rng.choice(_TITLES)} with {rng.randint(2, 15)} years of experience in {', '.join(_skills(rng, 4))}.",
+        "",
+        "Professional Experience",
+    ]
+    for job in range(jobs):
+        lines.append(f"{rng.choice(_TITLES)} | {rng.choice(_COMPANIES)} | {2024 - 2 * job - 2} - {2024 - 2 * job}")
+        for _ in range(bullets_per_job):
+            lines.append(f"• {rng.choice(_VERBS)} {rng.choice(_OBJECTS)} using {' and '.join(_skills(rng, 2))}, "
+                         f"improving throughput by {rng.randint(5, 80)}%.")
+        lines.append("")
+    lines += [
+        "Education",
+        f"B.S. in Computer Science | State University | {2024 - 2 * jobs - 4}",
+        "",
+        "Skills",
+        ", ".join(_skills(rng, 15)),
+    ]
+    return "\n".join(lines)
+
+def synthetic_job_description(rng: random.Random, requirements: int = 8, boilerplate_paragraphs: int = 2) -> str:
+    """Generates a job posting with requirement bullets and EEO/benefits boilerplate."""
+    lines = [f"{rng.choice(_TITLES)} at {rng.choice(_COMPANIES)}", "", "Requirements:"]
+    for _ in range(requirements):
+        lines.append(f"- {rng.randint(2, 6)}+ years of experience with {' and '.join(_skills(rng, 2))}")
+    lines += ["", "About us:"] + [_BOILERPLATE] * boilerplate_paragraphs
+    return "\n".join(lines)
+
+def write_synthetic_pdf(path: str, text: str, pages: int = 1) -> bool:
+    """
+    Writes the text into a PDF, repeated on every page. Returns False if PyMuPDF is not
+    installed (it is only needed to generate the benchmark corpus).
+    """
+    try:
+        import fitz
+    except ImportError:
+        return False
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(36, 36, 576, 806), text, fontsize=8)
+    doc.save(path)
+    doc.close()
+    return True
+
+def time_call(function: Callable, repeat: int = 5, warmup: int = 1) -> Dict:
+    """Times repeated calls of a function and returns summary statistics in milliseconds."""
+    for _ in range(warmup):
+        function()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "repeat": repeat,
+        "min_ms": round(samples[0], 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(0.95 * len(samples)))], 3),
+        "max_ms": round(samples[-1], 3),
+    }
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+def parse_importtime(output: str) -> List[Dict]:
+    """
+    Parses the report written to stderr by 'python -X importtime' into one entry per
+    module: its name, nesting depth, and self and cumulative import time in microseconds.
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return entries
+
+def import_time_report(module: str = "main", top: int = 10) -> Dict:
+    """
+    Imports a module in a fresh interpreter with '-X importtime' and reports its total
+    import time, the direct imports that cost the most, and the slowest modules by
+    their own import time.
+    """
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               capture_output=True, text=True, cwd=_PROJECT_ROOT)
+    entries = parse_importtime(completed.stderr)
+    root = next((entry for entry in entries if entry["module"] == module and entry["depth"] == 0), None)
+    # Direct imports of the module are the entries one level deeper, up to the module's own entry
+    direct = []
+    for entry in reversed(entries[:entries.index(root)] if root else []):
+        if entry["depth"] == 0:
+            break
+        if entry["depth"] == 1:
+            direct.append(entry)
+    milliseconds = lambda us: round(us / 1000, 3)
+    return {
+        "module": module,
+        "import_ms": milliseconds(root["cumulative_us"]) if root else None,
+        "slowest_direct_imports": [
+            {"module": entry["module"], "cumulative_ms": milliseconds(entry["cumulative_us"])}
+            for entry in sorted(direct, key=lambda entry: -entry["cumulative_us"])[:top]
+        ],
+        "slowest_modules": [
+            {"module": entry["module"], "self_ms": milliseconds(entry["self_us"])}
+            for entry in sorted(entries, key=lambda entry: -entry["self_us"])[:top]
+        ],
+    }
+
+def _launch_until(command: List[str], marker: bytes) -> float:
+    """Starts a process, returns the seconds until 'marker' appears on its stdout, and kills it."""
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=_PROJECT_ROOT, stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        output = b""
+        while marker not in output:
+            chunk = os.read(process.stdout.fileno(), 4096)
+            if not chunk:
+                raise RuntimeError(f"'{' '.join(command)}' exited before printing {marker!r}")
+            output += chunk
+        return time.perf_counter() - started
+    finally:
+        process.kill()
+        process.wait()
+        process.stdin.close()
+        process.stdout.close()
+
+def startup_report(repeat: int = 5) -> Dict:
+    """
+    Measures the cold start of the interactive CLI: the time from launching main.py to its
+    first prompt, next to the time of a bare interpreter, plus an '-X importtime' breakdown.
+    The startup target (STARTUP_TARGET_MS) applies to the difference, the time the
+    application itself adds.
+    """
+    interpreter = [_launch_until([sys.executable, "-u", "-c", "print('ready')"], b"ready") * 1000
+                   for _ in range(repeat)]
+    first_prompt = [_launch_until([sys.executable, "-u", "main.py"], b"Select option") * 1000
+                    for _ in range(repeat)]
+    overhead = statistics.median(first_prompt) - statistics.median(interpreter)
+    return {
+        "first_prompt_median_ms": round(statistics.median(first_prompt), 3),
+        "interpreter_median_ms": round(statistics.median(interpreter), 3),
+        "application_overhead_ms": round(overhead, 3),
+        "target_ms": STARTUP_TARGET_MS,
+        "within_target": overhead <= STARTUP_TARGET_MS,
+        "imports": import_time_report("main"),
+    }
+
+def run_benchmarks(seed: int = 42, repeat: int = 5, jobs: int = 3, bullets_per_job: int = 5,
+                   pdf_pages: int = 5, llm_latency: float = 0.2, llm_tokens_per_second: float = 500.0,
+                   llm_response_tokens: int = 200, batch_pairs: int = 20, startup: bool = True) -> Dict:
+    """
+    Runs every benchmark on a synthetic corpus and returns the results as a JSON-ready dict.
+    Caches are disabled so repeated runs measure real work. With 'startup', the cold start
+    of the interactive CLI is measured too (see startup_report).
+    """
+    from utils.input_handlers import available_pdf_engines
+    from utils.resume_parser import parse_resume
+    from utils.semantic_matcher import find_skills, get_semantic_matcher
+    from utils.resume_processor import (
+        SimpleFallback, analyze_resume, simple_resume_optimization, llm_resume_optimization,
+        llm_resume_optimization_stream
+    )
+    from utils.stub_llm import StubChatModel
+
+    rng = random.Random(seed)
+    resume = synthetic_resume(rng, jobs, bullets_per_job)
+    job_description = synthetic_job_description(rng)
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {
+                "seed": seed, "repeat": repeat, "jobs": jobs, "bullets_per_job": bullets_per_job,
+                "pdf_pages": pdf_pages, "llm_latency": llm_latency,
+                "llm_tokens_per_second": llm_tokens_per_second, "llm_response_tokens": llm_response_tokens,
+                "batch_pairs": batch_pairs,
+            },
+            "resume_chars": len(resume),
+            "job_description_chars": len(job_description),
+        },
+        "benchmarks": {},
+    }
+    benchmarks = results["benchmarks"]
+    if startup:
+        # Measured first, in fresh processes, before this process changes any environment variables
+        benchmarks["startup.cli"] = startup_report(repeat)
+    os.environ['RESUME_AGENT_PDF_CACHE'] = '0'
+    os.environ['RESUME_AGENT_LLM_CACHE'] = '0'
+
+    def quiet(function):
+        """Wraps a function so its progress prints do not flood the benchmark output."""
+        def run():
+            with open(os.devnull, 'w') as devnull:
+                with contextlib.redirect_stdout(devnull):
+                    return function()
+        return run
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # PDF extraction, per engine
+        pdf_path = os.path.join(workdir, "resume.pdf")
+        if write_synthetic_pdf(pdf_path, resume, pdf_pages):
+            for engine, _, extractor in available_pdf_engines():
+                benchmarks[f"extract_text_from_pdf.{engine}"] = time_call(lambda: extractor(pdf_path), repeat)
+        else:
+            benchmarks["extract_text_from_pdf"] = {"skipped": "PyMuPDF is required to generate the PDF corpus"}
+
+        # Rule-based processing; the parse and skill caches are cleared so each call does the full work
+        def uncached(function):
+            def run():
+                parse_resume.cache_clear()
+                find_skills.cache_clear()
+                return function()
+            return run
+
+        benchmarks["parse_resume"] = time_call(uncached(lambda: parse_resume(resume)), repeat)
+        benchmarks["extract_skills_simple"] = time_call(
+            uncached(lambda: SimpleFallback.extract_skills_simple(resume)), repeat)
+        semantic = get_semantic_matcher()
+        if semantic is not None:
+            benchmarks["semantic_skills"] = time_call(lambda: semantic.paraphrases(resume), repeat)
+        else:
+            benchmarks["semantic_skills"] = {"skipped": "NumPy is required for semantic skill matching"}
+        benchmarks["create_optimized_resume"] = time_call(
+            uncached(lambda: SimpleFallback.create_optimized_resume(resume, job_description)), repeat)
+        # The structured result alone, serialized without rendering any text
+        benchmarks["analyze_resume_json"] = time_call(
+            uncached(lambda: analyze_resume(resume, job_description).to_json(include_resume=False)), repeat)
+        benchmarks["simple_resume_optimization"] = time_call(
+            uncached(quiet(lambda: simple_resume_optimization(resume, job_description))), repeat)
+
+        # End-to-end with the latency-simulating stub model
+        stub = StubChatModel(latency=llm_latency, tokens_per_second=llm_tokens_per_second,
+                             response_tokens=llm_response_tokens)
+        benchmarks["llm_resume_optimization.stub"] = time_call(
+            lambda: llm_resume_optimization(stub, resume, job_description), max(1, repeat // 2), warmup=0)
+
+        def first_token():
+            started = time.perf_counter()
+            stream = llm_resume_optimization_stream(stub, resume, job_description)
+            next(stream)
+            elapsed = time.perf_counter() - started
+            stream.close()
+            return elapsed
+        ttft = [first_token() * 1000 for _ in range(max(1, repeat // 2))]
+        benchmarks["llm_stream_time_to_first_token.stub"] = {"median_ms": round(statistics.median(ttft), 3)}
+
+        # Tail latency of one provider with occasional slow calls, alone and hedged by a second one
+        from utils.llm_router import LLMRouter
+        def latency_percentiles(llm, calls: int = 100) -> Dict:
+            samples = []
+            for _ in range(calls):
+                started = time.perf_counter()
+                llm.invoke("benchmark")
+                samples.append((time.perf_counter() - started) * 1000)
+            samples.sort()
+            return {"p50_ms": round(samples[len(samples) // 2], 3), "p99_ms": round(samples[int(0.99 * (len(samples) - 1))], 3)}
+        def tail_stub():
+            return StubChatModel(latency=0.01, response_tokens=10, tail_latency=0.3, tail_probability=0.03, seed=seed)
+        router = LLMRouter([("primary", tail_stub()), ("secondary", StubChatModel(latency=0.015, response_tokens=10))],
+                           hedge_delay=0.05)
+        benchmarks["router.single_provider.stub"] = latency_percentiles(tail_stub())
+        benchmarks["router.hedged.stub"] = dict(latency_percentiles(router), hedged=router.hedged)
+
+        # Batch throughput: text resumes against job descriptions on one event loop
+        from utils.batch_runner import run_batch
+        resume_paths, jd_paths = [], []
+        for i in range(max(1, batch_pairs // 2)):
+            path = os.path.join(workdir, f"resume_{i}.txt")
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(synthetic_resume(rng, jobs, bullets_per_job))
+            resume_paths.append(path)
+        for i in range(2):
+            path = os.path.join(workdir, f"job_{i}.txt")
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(synthetic_job_description(rng))
+            jd_paths.append(path)
+        pairs = [(r, j) for r in resume_paths for j in jd_paths][:batch_pairs]
+        summary = quiet(lambda: run_batch(pairs, os.path.join(workdir, "batch_output"), stub, llm_workers=8))()
+        benchmarks["batch.stub"] = {
+            "pairs": summary["pairs"],
+            "elapsed_ms": round(summary["elapsed_seconds"] * 1000, 3),
+            "pairs_per_second": summary["pairs_per_second"],
+        }
+    return results
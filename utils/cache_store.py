@@ -0,0 +1,99 @@
+# utils/cache_store.py
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+def get_cache_dir() -> str:
+    """
+    Returns the directory used for persistent caches, creating it if needed.
+    Defaults to ~/.cache/resume_agent and can be overridden with RESUME_AGENT_CACHE_DIR.
+    """
+    cache_dir = os.getenv('RESUME_AGENT_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'resume_agent')
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+def hash_file(path: str, chunk_size: int = 1 << 20) -> str:
+    """Returns the SHA-256 hex digest of a file's content, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class LRUCacheStore:
+    """
+    A persistent key/value store on SQLite with size-bounded LRU eviction.
+    Entries optionally expire 'ttl_seconds' after they were stored.
+    Safe to share between threads and between processes using the same database file.
+    """
+
+    def __init__(self, db_path: str, max_bytes: int, ttl_seconds: Optional[float] = None):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached value for 'key' (marking it as recently used), or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if self.ttl_seconds is not None and time.time() - row[1] > self.ttl_seconds:
+                # Expired entries count as misses and are removed right away
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, value: str):
+        """Stores 'value' under 'key', then evicts least recently used entries over the size limit."""
+        size = len(value.encode('utf-8'))
+        if size > self.max_bytes:
+            return  # Never store an entry that could not fit on its own
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Deletes expired entries, then the least recently used ones until the total size fits 'max_bytes'."""
+        if self.ttl_seconds is not None:
+            self._conn.execute("DELETE FROM entries WHERE created < ?", (time.time() - self.ttl_seconds,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters and the current number and size of entries."""
+        with self._lock:
+            entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": total}
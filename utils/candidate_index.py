@@ -0,0 +1,300 @@
+# utils/candidate_index.py
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.jd_index import SKILL_WEIGHT
+from utils.skill_matcher import DEFAULT_MATCHER, SkillMatcher
+from utils.text_vectors import SkillVocabulary, TERM_DIMENSIONS, require_vectors, term_counts, VECTORS_AVAILABLE
+
+if VECTORS_AVAILABLE:
+    import numpy as np
+
+# Rows scored per block while scanning, which bounds the memory a query needs
+SCAN_BLOCK_ROWS = 1 << 16
+
+class CandidateIndex:
+    """
+    A persistent, append-only index of resumes for finding the best candidates for a job posting.
+
+    Each resume is stored as an L2-normalized vector of hashed word n-grams (1 + log tf)
+    and a list of SimpleFallback taxonomy skill ids, in flat binary files that queries
+    read through memory maps; opening the index loads nothing into Python objects.
+
+    Files in the index directory:
+        meta.json               skill vocabulary the index was built with
+        term_ptr / skill_ptr    int64 end offset of each row's entries
+        term_idx / term_val     int32 column ids / float32 weights of the n-gram vectors
+        skill_idx               int32 skill ids
+        doc_freq                int32 document frequency per n-gram column (for IDF at query time)
+        deleted                 uint8 tombstone per row
+        content_hash            uint64 prefix of each resume text's SHA-256 (to skip re-ingesting)
+        records.jsonl           one {"id", "path", "hash"} line per row
+        record_offsets          int64 byte offset of each line in records.jsonl
+
+    Appends only add to the end of these files and deletes set a tombstone, so the index
+    never has to be rebuilt; compact() reclaims the space of deleted rows.
+    """
+
+    ARRAYS = {
+        'term_ptr': 'int64', 'term_idx': 'int32', 'term_val': 'float32',
+        'skill_ptr': 'int64', 'skill_idx': 'int32', 'deleted': 'uint8', 'record_offsets': 'int64',
+        'content_hash': 'uint64',
+    }
+
+    def __init__(self, directory: str, matcher: SkillMatcher = DEFAULT_MATCHER):
+        require_vectors()
+        self.directory = directory
+        self.vocabulary = SkillVocabulary(matcher)
+        os.makedirs(directory, exist_ok=True)
+
+        meta_path = self._path('meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r', encoding='utf-8') as file:
+                meta = json.load(file)
+            if meta.get("skills") != self.vocabulary.skills or meta.get("term_dimensions") != TERM_DIMENSIONS:
+                raise ValueError("The index was built with a different skill taxonomy. Please rebuild it.")
+        else:
+            with open(meta_path, 'w', encoding='utf-8') as file:
+                json.dump({"skills": self.vocabulary.skills, "term_dimensions": TERM_DIMENSIONS}, file)
+            for name in self.ARRAYS:
+                open(self._path(name), 'ab').close()
+            open(self._path('records.jsonl'), 'ab').close()
+            np.zeros(TERM_DIMENSIONS, dtype=np.int32).tofile(self._path('doc_freq'))
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _array(self, name: str):
+        """Memory-maps one of the index's flat arrays (read-only)."""
+        dtype = np.dtype(self.ARRAYS.get(name, 'int32'))
+        path = self._path(name)
+        if os.path.getsize(path) == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r')
+
+    def __len__(self):
+        """Number of rows, including deleted ones."""
+        return os.path.getsize(self._path('deleted'))
+
+    def _record(self, row: int) -> Dict:
+        """Reads a single row's record line without loading the others."""
+        offset = int(self._array('record_offsets')[row])
+        with open(self._path('records.jsonl'), 'rb') as file:
+            file.seek(offset)
+            return json.loads(file.readline())
+
+    @staticmethod
+    def _hash_prefix(content_hash: str) -> int:
+        """The first 64 bits of a SHA-256 hex digest, as stored in the content_hash array."""
+        return int(content_hash[:16], 16)
+
+    def _live_hashes(self) -> set:
+        """Returns the content hash prefixes of all rows that are not deleted."""
+        deleted = np.asarray(self._array('deleted'), dtype=bool)
+        return set(self._array('content_hash')[~deleted].tolist())
+
+    def add(self, resumes: Iterable[Tuple[str, str, str]]) -> int:
+        """
+        Appends resumes given as (candidate_id, source_path, text) tuples.
+        Resumes whose text is already in the index are skipped. Returns the number added.
+        """
+        known = self._live_hashes()
+        doc_freq = np.fromfile(self._path('doc_freq'), dtype=np.int32)
+        term_end = int(self._array('term_ptr')[-1]) if len(self) else 0
+        skill_end = int(self._array('skill_ptr')[-1]) if len(self) else 0
+        records_end = os.path.getsize(self._path('records.jsonl'))
+        added = 0
+
+        files = {name: open(self._path(name), 'ab') for name in self.ARRAYS}
+        records = open(self._path('records.jsonl'), 'ab')
+        try:
+            for candidate_id, source_path, text in resumes:
+                content_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+                hash_prefix = self._hash_prefix(content_hash)
+                if not text.strip() or hash_prefix in known:
+                    continue
+                counts = term_counts(text)
+                columns = np.fromiter(sorted(counts), dtype=np.int32, count=len(counts))
+                values = 1.0 + np.log(np.fromiter((counts[c] for c in columns), dtype=np.float32, count=len(columns)))
+                norm = np.sqrt(np.dot(values, values))
+                if norm > 0:
+                    values /= norm
+                skills = np.asarray(self.vocabulary.skill_ids(text), dtype=np.int32)
+
+                # The row count is the size of 'deleted', which is flushed last (see below),
+                # so readers never see a row whose data is not complete on disk
+                files['term_idx'].write(columns.tobytes())
+                files['term_val'].write(values.astype(np.float32).tobytes())
+                files['skill_idx'].write(skills.tobytes())
+                term_end += len(columns)
+                skill_end += len(skills)
+                files['term_ptr'].write(np.int64(term_end).tobytes())
+                files['skill_ptr'].write(np.int64(skill_end).tobytes())
+                line = (json.dumps({"id": str(candidate_id), "path": source_path, "hash": content_hash}) + "\n").encode('utf-8')
+                records.write(line)
+                files['record_offsets'].write(np.int64(records_end).tobytes())
+                records_end += len(line)
+                files['content_hash'].write(np.uint64(hash_prefix).tobytes())
+                files['deleted'].write(b'\x00')
+
+                doc_freq[columns] += 1
+                known.add(hash_prefix)
+                added += 1
+        finally:
+            for name, file in files.items():
+                if name != 'deleted':
+                    file.close()
+            records.close()
+            files['deleted'].close()
+            doc_freq.tofile(self._path('doc_freq'))
+        return added
+
+    def delete(self, candidate_ids: Iterable[str]) -> int:
+        """Marks every row of the given candidates as deleted. Returns the number of rows deleted."""
+        targets = {str(candidate_id) for candidate_id in candidate_ids}
+        if not len(self) or not targets:
+            return 0
+        deleted = np.memmap(self._path('deleted'), dtype=np.uint8, mode='r+')
+        term_ptr = self._array('term_ptr')
+        term_idx = self._array('term_idx')
+        doc_freq = np.fromfile(self._path('doc_freq'), dtype=np.int32)
+        removed = 0
+        with open(self._path('records.jsonl'), 'r', encoding='utf-8') as file:
+            for row, line in enumerate(file):
+                if row < len(deleted) and not deleted[row] and json.loads(line)["id"] in targets:
+                    deleted[row] = 1
+                    start = int(term_ptr[row - 1]) if row else 0
+                    doc_freq[term_idx[start:int(term_ptr[row])]] -= 1
+                    removed += 1
+        deleted.flush()
+        doc_freq.tofile(self._path('doc_freq'))
+        return removed
+
+    def search(self, job_description: str, top_k: int = 10) -> List[Dict]:
+        """
+        Returns the 'top_k' best candidates for the job description, best first.
+        The n-gram and skill arrays are scanned block by block straight from the memory maps.
+        """
+        rows = len(self)
+        if rows == 0:
+            return []
+        deleted = self._array('deleted')
+        term_ptr = np.concatenate(([0], self._array('term_ptr')))
+        term_idx, term_val = self._array('term_idx'), self._array('term_val')
+        skill_ptr = np.concatenate(([0], self._array('skill_ptr')))
+        skill_idx = self._array('skill_idx')
+
+        # Dense query vectors: TF-IDF weights per n-gram column and a mask of the posting's skills
+        live_rows = rows - int(deleted.sum())
+        doc_freq = np.fromfile(self._path('doc_freq'), dtype=np.int32)
+        counts = term_counts(job_description)
+        query = np.zeros(TERM_DIMENSIONS, dtype=np.float32)
+        for column, count in counts.items():
+            query[column] = (1.0 + np.log(count)) * (np.log((1 + live_rows) / (1 + doc_freq[column])) + 1.0)
+        norm = np.sqrt(np.dot(query, query))
+        if norm > 0:
+            query /= norm
+        job_skills = self.vocabulary.skill_ids(job_description)
+        skill_mask = np.zeros(len(self.vocabulary), dtype=np.float32)
+        skill_mask[job_skills] = 1.0
+
+        scores = np.empty(rows, dtype=np.float32)
+        for block_start in range(0, rows, SCAN_BLOCK_ROWS):
+            block_end = min(rows, block_start + SCAN_BLOCK_ROWS)
+            scores[block_start:block_end] = self._score_block(
+                block_start, block_end, term_ptr, term_idx, term_val, query,
+                skill_ptr, skill_idx, skill_mask, len(job_skills))
+        scores[np.asarray(deleted, dtype=bool)] = -np.inf
+
+        top_k = min(top_k, live_rows)
+        if top_k <= 0:
+            return []
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for row in top:
+            candidate_skills = set(skill_idx[skill_ptr[row]:skill_ptr[row + 1]].tolist())
+            record = self._record(int(row))
+            results.append({
+                "id": record["id"],
+                "path": record["path"],
+                "score": round(float(scores[row]), 4),
+                "matched_skills": [self.vocabulary.skills[i] for i in job_skills if i in candidate_skills],
+                "missing_skills": [self.vocabulary.skills[i] for i in job_skills if i not in candidate_skills],
+            })
+        return results
+
+    @staticmethod
+    def _score_block(start: int, end: int, term_ptr, term_idx, term_val, query,
+                     skill_ptr, skill_idx, skill_mask, job_skill_count: int):
+        """Scores rows [start, end) with vectorized segment sums over their entries."""
+        lo, hi = int(term_ptr[start]), int(term_ptr[end])
+        weighted = np.concatenate(([0.0], np.cumsum(term_val[lo:hi] * query[term_idx[lo:hi]], dtype=np.float64)))
+        offsets = term_ptr[start:end + 1] - lo
+        term_scores = weighted[offsets[1:]] - weighted[offsets[:-1]]
+
+        if job_skill_count == 0:
+            return term_scores
+        lo, hi = int(skill_ptr[start]), int(skill_ptr[end])
+        matched = np.concatenate(([0.0], np.cumsum(skill_mask[skill_idx[lo:hi]], dtype=np.float64)))
+        offsets = skill_ptr[start:end + 1] - lo
+        coverage = (matched[offsets[1:]] - matched[offsets[:-1]]) / job_skill_count
+        return (1.0 - SKILL_WEIGHT) * term_scores + SKILL_WEIGHT * coverage
+
+    def compact(self) -> int:
+        """
+        Rewrites the index without its deleted rows and returns the number of rows removed.
+        Only needed to reclaim disk space; searches skip deleted rows either way.
+        """
+        deleted = np.asarray(self._array('deleted'), dtype=bool)
+        if not deleted.any():
+            return 0
+        term_ptr = np.concatenate(([0], self._array('term_ptr')))
+        skill_ptr = np.concatenate(([0], self._array('skill_ptr')))
+        term_idx, term_val, skill_idx = self._array('term_idx'), self._array('term_val'), self._array('skill_idx')
+        keep = ~deleted
+
+        def gather(ptr, values):
+            # Expand the row mask to one flag per entry, then select the kept entries
+            return np.asarray(values)[np.repeat(keep, np.diff(ptr))]
+
+        def lengths(ptr):
+            return np.cumsum(np.diff(ptr)[keep]).astype(np.int64)
+
+        new_arrays = {
+            'term_idx': gather(term_ptr, term_idx), 'term_val': gather(term_ptr, term_val),
+            'skill_idx': gather(skill_ptr, skill_idx),
+            'term_ptr': lengths(term_ptr), 'skill_ptr': lengths(skill_ptr),
+            'deleted': np.zeros(int(keep.sum()), dtype=np.uint8),
+            'content_hash': np.asarray(self._array('content_hash'))[keep],
+        }
+        lines = []
+        with open(self._path('records.jsonl'), 'rb') as file:
+            for row, line in enumerate(file):
+                if row < len(deleted) and not deleted[row]:
+                    lines.append(line)
+        new_arrays['record_offsets'] = np.concatenate(([0], np.cumsum([len(line) for line in lines])[:-1])).astype(np.int64) \
+            if lines else np.zeros(0, dtype=np.int64)
+
+        # Write every file next to the old one, then swap them in
+        for name, values in new_arrays.items():
+            np.asarray(values, dtype=self.ARRAYS[name]).tofile(self._path(name) + '.tmp')
+        with open(self._path('records.jsonl.tmp'), 'wb') as file:
+            file.writelines(lines)
+        for name in list(new_arrays) + ['records.jsonl']:
+            os.replace(self._path(name) + '.tmp', self._path(name))
+        return int(deleted.sum())
+
+def ingest_resumes(index: CandidateIndex, paths: List[str], pdf_workers: Optional[int] = None) -> int:
+    """
+    Extracts every resume once (PDFs in a process pool via ResumeInputHandler.extract_text_from_pdf)
+    and appends it to the index. Candidate ids are the file names without extension.
+    """
+    from utils.batch_runner import load_resumes
+    texts = load_resumes(paths, pdf_workers)
+    return index.add(
+        (os.path.splitext(os.path.basename(path))[0], os.path.abspath(path), texts[path]) for path in paths
+    )
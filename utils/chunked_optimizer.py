@@ -0,0 +1,266 @@
+# utils/chunked_optimizer.py
+import asyncio
+import hashlib
+import os
+import re
+from typing import List, Optional
+
+from utils.async_llm import AsyncLLMClient
+from utils.metrics import span
+from utils.prompt_budget import compact_job_description, estimate_tokens, truncate_to_tokens
+from utils.resume_parser import parse_resume
+from utils.section_cache import get_section_cache
+from utils.skill_matcher import DEFAULT_MATCHER
+
+# Resumes estimated at this many tokens or more are optimized section by section in 'auto' mode
+# (RESUME_AGENT_CHUNKED_MIN_TOKENS)
+CHUNKED_MIN_TOKENS = 1200
+# Sections longer than this are split further (at blank lines or role lines) into separate calls
+MAX_CHUNK_CHARS = 3000
+# Token budget for the job description context sent with every section
+JOB_CONTEXT_TOKENS = 600
+# Maximum concurrent section rewrites
+MAX_SECTION_CALLS = 8
+
+_ROLE_LINE = re.compile(r'^(?![•\-\*▪●◦‣–·])\S.*(?:\|| - | – |\b(?:19|20)\d{2}\b)', re.MULTILINE)
+
+class ResumeChunk:
+    """A part of a resume rewritten by one LLM call: its section title and source text."""
+    __slots__ = ('name', 'title', 'text')
+
+    def __init__(self, name: str, title: str, text: str):
+        self.name = name
+        self.title = title
+        self.text = text
+
+def _split_long_text(text: str, max_chars: int) -> List[str]:
+    """Splits a long section body into pieces of at most about 'max_chars', at role or paragraph starts."""
+    if len(text) <= max_chars:
+        return [text]
+    # Candidate cut points: lines that start a new role, then blank lines
+    cuts = sorted({match.start() for match in _ROLE_LINE.finditer(text)} |
+                  {match.end() for match in re.finditer(r'\n\s*\n', text)})
+    pieces, start = [], 0
+    for previous, cut in zip([0] + cuts, cuts + [len(text)]):
+        if cut - start > max_chars and previous > start:
+            pieces.append(text[start:previous].strip())
+            start = previous
+    pieces.append(text[start:].strip())
+    return [piece for piece in pieces if piece]
+
+def split_resume_sections(resume_text: str, max_chars: int = MAX_CHUNK_CHARS):
+    """
+    Splits a resume into its preamble (name and contact lines, kept as is) and the
+    chunks to rewrite: one per section, with sections longer than 'max_chars' split further.
+    A resume without recognizable sections is a single chunk.
+    Returns (preamble, chunks).
+    """
+    resume = parse_resume(resume_text)
+    if not resume.sections:
+        return "", [ResumeChunk("resume", "", piece) for piece in _split_long_text(resume_text.strip(), max_chars)]
+
+    first_header_line = resume_text.rfind('\n', 0, resume.sections[0].header[0]) + 1
+    preamble = resume_text[:first_header_line].strip()
+    chunks = []
+    for section in resume.sections:
+        title = resume_text[section.header[0]:section.header[1]]
+        body = resume_text[section.start:section.end].strip()
+        for piece in _split_long_text(body, max_chars):
+            chunks.append(ResumeChunk(section.name, title, piece))
+    return preamble, chunks
+
+def resume_identity(resume_text: str) -> str:
+    """
+    Identifies a resume across edits by its preamble (name and contact lines), or by its
+    first line when it has none, so a rerun with changed sections is matched to the last run.
+    """
+    preamble, _ = split_resume_sections(resume_text)
+    return preamble or resume_text.strip().partition('\n')[0]
+
+def relevant_requirements(section_text: str, job_context: str) -> str:
+    """
+    Selects the job context lines relevant to a section: the title line plus every line
+    that mentions a skill the section mentions. A section sharing no skill with the job
+    gets the whole context. Edits to unrelated parts of the job description therefore
+    leave the section's prompt, and its memoized rewrite, unchanged.
+    """
+    lines = job_context.splitlines()
+    section_skills = DEFAULT_MATCHER.find_keywords(section_text)
+    relevant = lines[:1] + [line for line in lines[1:] if DEFAULT_MATCHER.find_keywords(line) & section_skills]
+    if len(relevant) <= 1:
+        return job_context
+    return "\n".join(relevant)
+
+def build_section_prompt(chunk: ResumeChunk, job_context: str) -> str:
+    """Builds the prompt that rewrites one resume section for the job description."""
+    section = chunk.title or "resume"
+    return (
+        f"You are an expert resume writer. Rewrite the following {section} section of a resume so it is "
+        f"highly ATS-friendly and tailored to the job description.\n\n"
+        f"--- {section.upper()} SECTION ---\n{chunk.text}\n\n"
+        f"--- KEY JOB REQUIREMENTS ---\n{job_context}\n\n"
+        f"Focus on:\n"
+        f"- Incorporating keywords from the job description naturally\n"
+        f"- Quantifying achievements wherever possible\n"
+        f"- Keeping every fact, role and date from the original; do not invent experience\n"
+        f"Provide only the rewritten section content, without the section header."
+    )
+
+def _strip_repeated_header(content: str, title: str) -> str:
+    """Removes a leading section header if the model repeated it despite the instructions."""
+    content = content.strip()
+    first_line, _, rest = content.partition('\n')
+    if title and first_line.strip(' #*:').lower() == title.lower():
+        return rest.strip()
+    return content
+
+def merge_sections(preamble: str, chunks: List[ResumeChunk], rewritten: List[str]) -> str:
+    """
+    The reduce step: joins the preamble and the rewritten chunks in their original order
+    under standard uppercase headers. Pieces of one split section share a single header.
+    """
+    parts = [preamble] if preamble else []
+    previous_title = None
+    for chunk, content in zip(chunks, rewritten):
+        content = _strip_repeated_header(content, chunk.title)
+        if chunk.title and chunk.title != previous_title:
+            parts.append(f"{chunk.title.upper()}\n{content}")
+        else:
+            parts.append(content)
+        previous_title = chunk.title
+    return "\n\n".join(part for part in parts if part)
+
+def _resume_sha256(resume_text: str) -> str:
+    return hashlib.sha256(resume_text.strip().encode('utf-8')).hexdigest()
+
+def use_chunked_mode(resume_text: str, mode: str = "auto") -> bool:
+    """
+    Decides whether to optimize section by section: 'on', 'off', or 'auto': long resumes,
+    resumes optimized section by section before, and resumes edited since their last
+    whole-prompt run, so a rerun after an edit only rewrites the changed sections.
+    An unchanged resume keeps the whole prompt, whose answer the response cache holds.
+    """
+    if mode == "on":
+        return True
+    if mode == "off":
+        return False
+    threshold = int(os.getenv('RESUME_AGENT_CHUNKED_MIN_TOKENS', str(CHUNKED_MIN_TOKENS)))
+    if estimate_tokens(resume_text) >= threshold:
+        return True
+    cache = get_section_cache()
+    if cache is None:
+        return False
+    try:
+        previous = cache.previous_run(resume_identity(resume_text))
+    except Exception:
+        return False
+    if previous is None:
+        return False
+    return bool(previous["sections"]) or previous["resume_sha256"] != _resume_sha256(resume_text)
+
+def record_whole_prompt_run(resume_text: str):
+    """
+    Records a successful whole-prompt LLM run of a resume, so that a rerun after an
+    edit switches to section by section in 'auto' mode (see use_chunked_mode).
+    """
+    cache = get_section_cache()
+    if cache is None:
+        return
+    try:
+        cache.record_run(resume_identity(resume_text), [], _resume_sha256(resume_text))
+    except Exception as e:
+        print(f"Could not record the run in the section cache: {e}")
+
+def _model_identity(llm_client) -> str:
+    """Names the model behind a client, so memoized sections are never shared between models."""
+    llm = getattr(llm_client, 'llm', llm_client)
+    model = getattr(llm, 'model', None) or getattr(llm, 'model_name', None) or type(llm).__name__
+    return f"{getattr(llm, 'provider', None) or 'default'}:{model}"
+
+def _report_changes(chunks: List[ResumeChunk], keys: List[str], previous: Optional[List[str]]):
+    """Prints which sections changed since the last section-by-section run of the resume."""
+    if not previous:
+        return
+    previous_keys = set(previous)
+    changed = [chunk.title or chunk.name for chunk, key in zip(chunks, keys) if key not in previous_keys]
+    if not changed:
+        print("🔁 No section changed since the last run.")
+    else:
+        names = ", ".join(dict.fromkeys(changed)) # Pieces of one section are named once
+        print(f"🔁 {len(changed)} of {len(chunks)} sections changed since the last run: {names}")
+
+def _section_prompts(resume_text: str, job_description: str, provider: Optional[str] = None):
+    """Splits a resume into sections and builds their prompts. Returns (preamble, chunks, prompts)."""
+    preamble, chunks = split_resume_sections(resume_text)
+    job_context = (compact_job_description(job_description, JOB_CONTEXT_TOKENS, provider)
+                   or truncate_to_tokens(job_description, JOB_CONTEXT_TOKENS, provider))
+    prompts = [build_section_prompt(chunk, relevant_requirements(chunk.text, job_context)) for chunk in chunks]
+    return preamble, chunks, prompts
+
+async def chunked_resume_optimization_async(llm_client, resume_text: str, job_description: str,
+                                            provider: Optional[str] = None) -> str:
+    """
+    Map-reduce optimization: rewrites every section concurrently through 'llm_client'
+    (anything with an async 'ainvoke', typically an AsyncLLMClient), each call with the
+    compacted job requirements relevant to the section, then merges the sections locally.
+    Wall-clock time follows the longest section, and each section has the full output
+    token limit, so long histories are not truncated. A section whose call fails
+    keeps its original text; if every call fails the error is raised.
+
+    Every section is a separate prompt, so with the LLM response cache (utils/llm_cache.py)
+    a rerun reuses the sections whose text and relevant requirements are unchanged without
+    an LLM call; the section cache (utils/section_cache.py) records the run and reports
+    which sections changed.
+    """
+    # Parsing, compaction and skill matching are CPU-bound, and the section cache is SQLite:
+    # both run on worker threads so other requests on the event loop are not held up
+    preamble, chunks, prompts = await asyncio.to_thread(_section_prompts, resume_text, job_description, provider)
+
+    cache = get_section_cache()
+    identity, keys = None, []
+    if cache is not None:
+        try:
+            model = _model_identity(llm_client)
+            keys = [cache.section_key(model, prompt) for prompt in prompts]
+            identity = resume_identity(resume_text)
+            previous = await asyncio.to_thread(cache.previous_run, identity)
+            _report_changes(chunks, keys, previous["sections"] if previous is not None else None)
+        except Exception as e:
+            print(f"⚠️ Section cache unavailable: {e}")
+            cache = None
+
+    rewritten = [None] * len(chunks)
+    with span("chunked_optimize", sections=len(chunks)) as chunked_span:
+        results = await asyncio.gather(*(
+            llm_client.ainvoke(prompt) for prompt in prompts
+        ), return_exceptions=True)
+
+        failures, reused = [], 0
+        for i, result in enumerate(results):
+            if isinstance(result, Exception):
+                failures.append(result)
+                rewritten[i] = chunks[i].text
+                continue
+            reused += bool(getattr(result, 'cached', False))
+            rewritten[i] = result.content if hasattr(result, 'content') else str(result)
+        if reused:
+            print(f"♻️ Reused {reused} unchanged sections; rewrote {len(chunks) - reused}.")
+        if cache is not None:
+            try:
+                await asyncio.to_thread(cache.record_run, identity, keys, _resume_sha256(resume_text))
+            except Exception as e:
+                print(f"Could not record the run in the section cache: {e}")
+        chunked_span.set(reused_sections=reused, failed_sections=len(failures))
+        if failures and len(failures) == len(chunks):
+            raise failures[0]
+        if failures:
+            print(f"⚠️ {len(failures)} of {len(chunks)} sections could not be rewritten and were kept as is.")
+    return merge_sections(preamble, chunks, rewritten)
+
+def chunked_resume_optimization(llm_instance, resume_text: str, job_description: str,
+                                max_in_flight: int = MAX_SECTION_CALLS) -> str:
+    """Synchronous entry point for chunked_resume_optimization_async with a fresh AsyncLLMClient."""
+    client = AsyncLLMClient(llm_instance, max_in_flight=max_in_flight)
+    return asyncio.run(chunked_resume_optimization_async(
+        client, resume_text, job_description, getattr(llm_instance, 'provider', None)
+    ))
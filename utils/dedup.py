@@ -0,0 +1,149 @@
+# utils/dedup.py
+import os
+import random
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from utils.text_vectors import tokenize
+
+# NumPy speeds up signature computation; the pure Python path gives identical signatures
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Resumes whose estimated Jaccard similarity (of word shingles) reaches this are duplicates
+# (RESUME_AGENT_DEDUP_THRESHOLD, 0 = off)
+DEFAULT_DEDUP_THRESHOLD = 0.9
+NUM_PERMUTATIONS = 128
+SHINGLE_WORDS = 3
+# Universal hashing (a * x + b) mod a Mersenne prime; products stay within 64 bits
+_PRIME = (1 << 31) - 1
+
+def configured_threshold() -> float:
+    """Returns the configured near-duplicate threshold (RESUME_AGENT_DEDUP_THRESHOLD, 0 = off)."""
+    return float(os.getenv('RESUME_AGENT_DEDUP_THRESHOLD', str(DEFAULT_DEDUP_THRESHOLD)))
+
+def shingle_hashes(text: str, size: int = SHINGLE_WORDS) -> List[int]:
+    """
+    Hashes the overlapping 'size'-word shingles of a text. Words are lowercased and stop
+    words dropped, so layout differences between a PDF and a pasted copy do not matter.
+    """
+    tokens = tokenize(text)
+    if len(tokens) < size:
+        return [zlib.crc32(" ".join(tokens).encode('utf-8')) % _PRIME] if tokens else []
+    return list({zlib.crc32(" ".join(tokens[i:i + size]).encode('utf-8')) % _PRIME
+                 for i in range(len(tokens) - size + 1)})
+
+def _lsh_shape(threshold: float, num_permutations: int, recall: float = 0.95) -> Tuple[int, int]:
+    """
+    Picks the LSH bands and rows per band (bands * rows = num_permutations): the most
+    rows per band (fewest false candidates) for which texts exactly at the threshold
+    still share a band with probability 'recall'. Candidates are verified afterwards.
+    """
+    shapes = [(num_permutations // rows, rows) for rows in range(num_permutations, 0, -1)
+              if num_permutations % rows == 0]
+    for bands, rows in shapes:
+        if 1 - (1 - threshold ** rows) ** bands >= recall:
+            return bands, rows
+    return shapes[-1]
+
+class MinHasher:
+    """
+    Computes MinHash signatures: for each of 'num_permutations' random hash functions,
+    the smallest hash of the text's shingles. The fraction of equal positions in two
+    signatures estimates the Jaccard similarity of the shingle sets.
+    """
+
+    def __init__(self, num_permutations: int = NUM_PERMUTATIONS, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_permutations = num_permutations
+        self.a = [rng.randrange(1, _PRIME) for _ in range(num_permutations)]
+        self.b = [rng.randrange(0, _PRIME) for _ in range(num_permutations)]
+        if NUMPY_AVAILABLE:
+            self._a = np.array(self.a, dtype=np.uint64)[:, None]
+            self._b = np.array(self.b, dtype=np.uint64)[:, None]
+
+    def signature(self, text: str) -> Optional[Tuple[int, ...]]:
+        """Returns the signature of a text, or None if it has no words."""
+        hashes = shingle_hashes(text)
+        if not hashes:
+            return None
+        if NUMPY_AVAILABLE:
+            values = np.array(hashes, dtype=np.uint64)[None, :]
+            return tuple(int(value) for value in ((self._a * values + self._b) % _PRIME).min(axis=1))
+        return tuple(min((a * value + b) % _PRIME for value in hashes) for a, b in zip(self.a, self.b))
+
+    @staticmethod
+    def similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+        """Estimates the Jaccard similarity of the texts behind two signatures."""
+        return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+class NearDuplicateIndex:
+    """
+    LSH index of MinHash signatures for finding near-duplicate resumes. Signatures are
+    split into bands; texts sharing any band are candidates, and a candidate whose
+    estimated similarity reaches 'threshold' is a duplicate. Lookups cost a few
+    dictionary probes regardless of how many resumes were indexed.
+    Counts lookups and hits, for reporting the dedup hit rate.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_DEDUP_THRESHOLD, num_permutations: int = NUM_PERMUTATIONS):
+        self.threshold = threshold
+        self.hasher = MinHasher(num_permutations)
+        self.bands, self.rows = _lsh_shape(threshold, num_permutations)
+        self.buckets: List[Dict[Tuple[int, ...], List[str]]] = [{} for _ in range(self.bands)]
+        self.signatures: Dict[str, Tuple[int, ...]] = {}
+        self.lookups = 0
+        self.hits = 0
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def query(self, signature: Tuple[int, ...]) -> Optional[Tuple[str, float]]:
+        """Returns (key, similarity) of the most similar indexed text at or above the threshold, or None."""
+        candidates = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self.buckets[band].get(band_key, ()))
+        best = None
+        for candidate in candidates:
+            similarity = MinHasher.similarity(signature, self.signatures[candidate])
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (candidate, similarity)
+        return best
+
+    def add(self, key: str, signature: Tuple[int, ...]):
+        """Indexes a signature under 'key'."""
+        self.signatures[key] = signature
+        for band, band_key in self._band_keys(signature):
+            self.buckets[band].setdefault(band_key, []).append(key)
+
+    def find_or_add(self, key: str, text: str) -> Optional[Tuple[str, float]]:
+        """
+        Looks up a text: returns (key of the earlier near-duplicate, similarity) if there
+        is one, otherwise indexes the text under 'key' and returns None.
+        Texts without words are neither matched nor indexed.
+        """
+        signature = self.hasher.signature(text)
+        if signature is None:
+            return None
+        self.lookups += 1
+        match = self.query(signature)
+        if match is not None:
+            self.hits += 1
+            return match
+        self.add(key, signature)
+        return None
+
+    def stats(self) -> Dict:
+        """Returns the threshold, LSH shape, lookups, hits and hit rate."""
+        return {
+            "threshold": self.threshold,
+            "bands": self.bands,
+            "rows": self.rows,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+        }
@@ -1,25 +1,123 @@
 # utils/file_manager.py
 from datetime import datetime
 import os
+import uuid
+
+from utils.metrics import span
+
+def default_output_filename() -> str:
+    """Returns the default output filename, which includes a timestamp."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"optimized_resume_{timestamp}.txt"
+
+def _publish_file(temp_path: str, filename: str, overwrite: bool = True) -> str:
+    """
+    Moves a fully written temporary file to its final name in one step, so a partial
+    file is never visible. Without 'overwrite', an existing file is never replaced:
+    '_2', '_3', ... is appended to the name instead. Returns the final filename.
+    """
+    if overwrite:
+        os.replace(temp_path, filename)
+        return filename
+    stem, extension = os.path.splitext(filename)
+    attempt = 1
+    while True:
+        candidate = filename if attempt == 1 else f"{stem}_{attempt}{extension}"
+        try:
+            # A hard link fails if the name is taken, which makes claiming the name atomic
+            os.link(temp_path, candidate)
+            os.remove(temp_path)
+            return candidate
+        except FileExistsError:
+            attempt += 1
+        except OSError:
+            # Filesystems without hard links: check, then rename
+            if not os.path.exists(candidate):
+                os.replace(temp_path, candidate)
+                return candidate
+            attempt += 1
+
+def _temp_path_for(filename: str) -> str:
+    """Creates an empty, uniquely named hidden '.part' file next to 'filename' and returns its path."""
+    directory, basename = os.path.split(os.path.abspath(filename))
+    temp_path = os.path.join(directory, f".{basename}.{os.getpid()}.{uuid.uuid4().hex[:8]}.part")
+    open(temp_path, 'x').close() # Created like any other output file, with the default permissions
+    return temp_path
 
 def save_output_to_file(content: str, filename: str = None) -> str:
     """
     Saves the provided content to a text file.
-    If no filename is specified, a default filename with a timestamp is generated.
+    If no filename is specified, a default filename with a timestamp is generated;
+    if that name is already taken (another run in the same second), a suffix is added
+    rather than overwriting it. The file appears only once it is completely written.
     Returns the name of the file saved, or None if an error occurs.
     """
+    overwrite = bool(filename)
     if not filename:
         # Generate a filename with a timestamp to ensure uniqueness
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"optimized_resume_{timestamp}.txt" # Default filename
+        filename = default_output_filename() # Default filename
 
+    temp_path = None
     try:
-        # Open the file in write mode ('w') with UTF-8 encoding
-        # This will create the file if it doesn't exist, or overwrite it if it does
-        with open(filename, 'w', encoding='utf-8') as file:
-            file.write(content) # Write the content to the file
+        with span("save_output", mode="file") as save_span:
+            temp_path = _temp_path_for(filename)
+            # Write to a hidden temporary file first, then move it into place
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                file.write(content) # Write the content to the file
+                save_span.set(bytes_out=file.tell())
+            filename = _publish_file(temp_path, filename, overwrite)
         print(f"File saved successfully to: {filename}")
         return filename
     except Exception as e:
         print(f"Error saving file '{filename}': {e}")
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
         return None # Return None to indicate failure
+
+class StreamingFileWriter:
+    """
+    Writes content to a file incrementally as it is produced, so the full content
+    never has to be held in memory. Data goes to a hidden '.<filename>.*.part' file and is
+    renamed to the final filename on commit(); discard() removes it instead.
+    """
+
+    def __init__(self, filename: str = None):
+        # A default (timestamped) name never replaces an existing file on commit
+        self.overwrite = bool(filename)
+        self.filename = filename or default_output_filename()
+        self.part_filename = _temp_path_for(self.filename)
+        self.bytes_written = 0
+        self._file = open(self.part_filename, 'w', encoding='utf-8')
+
+    def write(self, text: str):
+        """Appends text to the file and flushes it, so it is on disk as soon as it arrives."""
+        self._file.write(text)
+        self._file.flush()
+        self.bytes_written += len(text.encode('utf-8'))
+
+    def commit(self) -> str:
+        """Closes the file and moves it to its final name. Returns the filename, or None on error."""
+        try:
+            with span("save_output", mode="stream", bytes_out=self.bytes_written):
+                self._file.close()
+                self.filename = _publish_file(self.part_filename, self.filename, self.overwrite)
+            print(f"File saved successfully to: {self.filename}")
+            return self.filename
+        except Exception as e:
+            print(f"Error saving file '{self.filename}': {e}")
+            return None
+
+    def discard(self):
+        """Closes and deletes the partial file."""
+        self._file.close()
+        if os.path.exists(self.part_filename):
+            os.remove(self.part_filename)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Never leave a partial file behind when streaming fails
+        if exc_type is not None:
+            self.discard()
+        return False
@@ -1,17 +1,116 @@
 # utils/input_handlers.py
+import importlib
+import importlib.util
+import io
 import os
 import re
-import PyPDF2
-import pdfplumber
+from collections import deque
 from pathlib import Path
+from typing import Iterator, Union
 
-# PDF processing imports
-try:
-    import fitz  # PyMuPDF for better PDF handling
-    PYMUPDF_AVAILABLE = True
-except ImportError:
-    PYMUPDF_AVAILABLE = False
-    print("PyMuPDF not available. Install with: pip install PyMuPDF")
+from utils.metrics import span
+
+# PDF engines are imported on first use, so entering a resume as text never loads them.
+# PyMuPDF (fitz) gives better extraction; whether it is installed is checked without importing it.
+PYMUPDF_AVAILABLE = importlib.util.find_spec('fitz') is not None
+_PDF_ENGINE_MODULES = {'pymupdf': 'fitz', 'pdfplumber': 'pdfplumber', 'pypdf2': 'PyPDF2'}
+_pymupdf_warning_shown = False
+# A PDF given as a file path, or held in memory
+PDFSource = Union[str, bytes, bytearray, memoryview]
+
+# PDFs with at least this many pages are extracted page by page in a process pool
+STREAMING_PAGE_THRESHOLD = 10
+# Maximum number of pages in flight (submitted but not yet yielded) while streaming
+STREAMING_PAGE_WINDOW = 8
+# A streamed PDF is stored in the text cache only up to this many characters; longer
+# documents are not kept in memory for it, so streaming memory stays bounded by the window
+STREAMING_CACHE_MAX_CHARS = 2_000_000
+
+# Documents opened by the current worker process, so each page task does not reopen the file
+_worker_documents = {}
+
+def _open_pdf_document(pdf_path: str, engine: str):
+    """Opens a PDF with the given engine, reusing the document already open in this process."""
+    key = (pdf_path, engine)
+    if key not in _worker_documents:
+        # Keep only one document open per worker to bound memory
+        for old_key, old_doc in list(_worker_documents.items()):
+            try:
+                old_doc.close()
+            except Exception:
+                pass
+            del _worker_documents[old_key]
+        module = importlib.import_module(_PDF_ENGINE_MODULES[engine])
+        if engine == 'pypdf2':
+            _worker_documents[key] = module.PdfReader(pdf_path)
+        else:
+            _worker_documents[key] = module.open(pdf_path)
+    return _worker_documents[key]
+
+def _extract_pdf_page(pdf_path: str, page_index: int, engine: str) -> str:
+    """
+    Extracts the text of a single PDF page with the given engine.
+    Defined at module level so it can run in worker processes.
+    """
+    doc = _open_pdf_document(pdf_path, engine)
+    if engine == 'pymupdf':
+        return doc[page_index].get_text()
+    if engine == 'pdfplumber':
+        page = doc.pages[page_index]
+        page_text = page.extract_text() or ""
+        if hasattr(page, 'close'):
+            page.close() # Release the page's cached layout objects
+        return page_text + "\n"
+    return (doc.pages[page_index].extract_text() or "") + "\n"
+
+def _extract_with_pymupdf(source: PDFSource) -> str:
+    """Extracts all text from a PDF (a path, or bytes opened in place) with PyMuPDF (fitz)."""
+    import fitz
+    with (fitz.open(source) if isinstance(source, str) else fitz.open(stream=source, filetype="pdf")) as doc:
+        # Collect page texts and join once instead of repeatedly concatenating
+        return "".join(page.get_text() for page in doc)
+
+def _extract_with_pdfplumber(source: PDFSource) -> str:
+    """Extracts all text from a PDF (a path, or bytes read through a BytesIO) with pdfplumber."""
+    import pdfplumber
+    with pdfplumber.open(source if isinstance(source, str) else io.BytesIO(source)) as pdf:
+        page_texts = []
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            if page_text:
+                page_texts.append(page_text + "\n") # Keep page text with a trailing newline
+        return "".join(page_texts)
+
+def _extract_with_pypdf2(source: PDFSource) -> str:
+    """Extracts all text from a PDF (a path, or bytes read through a BytesIO) with PyPDF2."""
+    import PyPDF2
+    with (open(source, 'rb') if isinstance(source, str) else io.BytesIO(source)) as file: # Binary read mode
+        reader = PyPDF2.PdfReader(file)
+        return "".join(page.extract_text() + "\n" for page in reader.pages) # Extract text from each page
+
+def available_pdf_engines():
+    """
+    Returns (engine, label, extractor) for each installed PDF engine, in order of preference:
+    PyMuPDF (if available) for potentially better extraction, then pdfplumber, then PyPDF2.
+    """
+    global _pymupdf_warning_shown
+    engines = []
+    if PYMUPDF_AVAILABLE:
+        engines.append(('pymupdf', 'PyMuPDF', _extract_with_pymupdf))
+    elif not _pymupdf_warning_shown:
+        _pymupdf_warning_shown = True
+        print("PyMuPDF not available. Install with: pip install PyMuPDF")
+    engines.append(('pdfplumber', 'pdfplumber', _extract_with_pdfplumber))
+    engines.append(('pypdf2', 'PyPDF2', _extract_with_pypdf2))
+    return engines
+
+def preload_pdf_engines():
+    """
+    Imports the installed PDF engines now rather than on first use, for processes that
+    are about to extract many PDFs (such as the server's worker pool).
+    """
+    for engine, _, _ in available_pdf_engines():
+        importlib.import_module(_PDF_ENGINE_MODULES[engine])
 
 class ResumeInputHandler:
     """
@@ -24,50 +123,157 @@ class ResumeInputHandler:
         """
         Extracts text from a PDF file using multiple libraries for robustness.
         It tries PyMuPDF first (if available), then pdfplumber, and finally PyPDF2.
+        Extracted text is cached by the PDF's content hash, so a PDF seen before
+        is returned from the cache without parsing it again.
+        """
+        with span("pdf_extract") as pdf_span:
+            if pdf_span:
+                pdf_span.set(bytes_in=os.path.getsize(pdf_path) if os.path.exists(pdf_path) else 0)
+            text = ResumeInputHandler._extract_text_from_pdf(pdf_path, pdf_span)
+            pdf_span.set(chars_out=len(text))
+            return text
+
+    @staticmethod
+    def extract_text_from_pdf_bytes(pdf_data: Union[bytes, bytearray, memoryview]) -> str:
+        """
+        Extracts text from a PDF held in memory, such as an upload, with the same engines,
+        fallback order and cache as extract_text_from_pdf. The data is opened in place
+        (PyMuPDF reads the buffer directly, pdfplumber and PyPDF2 through a BytesIO);
+        nothing is written to disk.
+        """
+        with span("pdf_extract", mode="memory") as pdf_span:
+            pdf_span.set(bytes_in=memoryview(pdf_data).nbytes)
+            text = ResumeInputHandler._extract_text_from_pdf(pdf_data, pdf_span)
+            pdf_span.set(chars_out=len(text))
+            return text
+
+    @staticmethod
+    def _extract_text_from_pdf(source: PDFSource, pdf_span) -> str:
+        """
+        Body of extract_text_from_pdf and extract_text_from_pdf_bytes ('source' is a path or
+        the PDF's bytes); records the cache hit and engine used on 'pdf_span'.
         """
         text = ""
-        print(f"Attempting to extract text from PDF: {pdf_path}")
+        if isinstance(source, str):
+            print(f"Attempting to extract text from PDF: {source}")
+        else:
+            print(f"Attempting to extract text from an in-memory PDF ({memoryview(source).nbytes} bytes)")
+
+        # Check the persistent cache before running any extraction engine
+        from utils.pdf_cache import get_pdf_cache
+        cache = get_pdf_cache()
+        content_hash = None
+        if cache is not None:
+            try:
+                content_hash = cache.content_hash(source) if isinstance(source, str) else cache.bytes_hash(source)
+                cached = cache.get(content_hash)
+                if cached is not None:
+                    engine, cached_text = cached
+                    print(f"✓ Text loaded from cache (extracted using {engine}).")
+                    pdf_span.set(engine=engine, cache_hit=True)
+                    return cached_text
+            except Exception as e:
+                print(f"PDF text cache unavailable: {e}. Extracting directly...")
+                cache = None
+        pdf_span.set(cache_hit=False)
+
+        # Try each available engine in order of preference until one returns text
+        for engine, label, extractor in available_pdf_engines():
+            with span("pdf_engine", engine=engine) as engine_span:
+                try:
+                    text = extractor(source)
+                    engine_span.set(chars_out=len(text))
+                    if text.strip(): # If text was successfully extracted, return it
+                        print(f"✓ Text extracted using {label}.")
+                        pdf_span.set(engine=engine)
+                        ResumeInputHandler._cache_text(cache, content_hash, engine, text)
+                        return text
+                    engine_span.set(empty=True)
+                except Exception as e:
+                    engine_span.set(error=type(e).__name__)
+                    print(f"{label} extraction failed: {e}. Trying next method...")
 
-        # Try PyMuPDF (fitz) if available for potentially better extraction
+        print("❌ Could not extract text from PDF using any method.")
+        return text # Return empty string if no text could be extracted
+
+    @staticmethod
+    def count_pdf_pages(pdf_path: str) -> int:
+        """Returns the number of pages in a PDF without extracting any text."""
         if PYMUPDF_AVAILABLE:
+            import fitz
+            with fitz.open(pdf_path) as doc:
+                return doc.page_count
+        import PyPDF2
+        with open(pdf_path, 'rb') as file:
+            return len(PyPDF2.PdfReader(file).pages)
+
+    @staticmethod
+    def stream_pdf_pages(pdf_path: str, max_workers: int = None,
+                         window: int = STREAMING_PAGE_WINDOW, executor=None) -> Iterator[str]:
+        """
+        Extracts a PDF page by page in a process pool and yields page texts in page order.
+        At most 'window' pages are in flight at once, so memory stays bounded for long documents
+        and callers can start processing early pages before the last page is parsed.
+        Uses PyMuPDF when available, otherwise pdfplumber. A PDF found in the text cache
+        is yielded as a single chunk, and a newly extracted one is cached once all pages are read,
+        unless its text exceeds STREAMING_CACHE_MAX_CHARS (it is then not cached at all).
+        Pass 'executor' to reuse an existing process pool.
+        """
+        from utils.pdf_cache import get_pdf_cache
+        cache = get_pdf_cache()
+        content_hash = None
+        if cache is not None:
             try:
-                doc = fitz.open(pdf_path)
-                for page in doc:
-                    text += page.get_text() # Extract text from each page
-                doc.close() # Close the document after extraction
-                if text.strip(): # If text was successfully extracted, return it
-                    print("✓ Text extracted using PyMuPDF.")
-                    return text
+                content_hash = cache.content_hash(pdf_path)
+                cached = cache.get(content_hash)
+                if cached is not None:
+                    yield cached[1]
+                    return
             except Exception as e:
-                print(f"PyMuPDF extraction failed: {e}. Trying next method...")
+                print(f"PDF text cache unavailable: {e}. Extracting directly...")
+                cache = None
+
+        engine = 'pymupdf' if PYMUPDF_AVAILABLE else 'pdfplumber'
+        page_count = ResumeInputHandler.count_pdf_pages(pdf_path)
+        own_executor = executor is None
+        if own_executor:
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(max_workers=max_workers)
 
-        # Try pdfplumber as a fallback
+        page_texts = [] if cache is not None else None
+        cached_chars = 0
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n" # Append page text with a newline
-            if text.strip():
-                print("✓ Text extracted using pdfplumber.")
-                return text
-        except Exception as e:
-            print(f"pdfplumber extraction failed: {e}. Trying next method...")
+            pending = deque()
+            next_page = 0
+            while next_page < page_count or pending:
+                # Keep the window full, then yield the oldest page as soon as it is ready
+                while next_page < page_count and len(pending) < window:
+                    pending.append(executor.submit(_extract_pdf_page, pdf_path, next_page, engine))
+                    next_page += 1
+                page_text = pending.popleft().result()
+                if page_texts is not None:
+                    cached_chars += len(page_text)
+                    if cached_chars > STREAMING_CACHE_MAX_CHARS:
+                        page_texts = None # Too long to hold for the cache; release what was kept
+                    else:
+                        page_texts.append(page_text)
+                yield page_text
+        finally:
+            if own_executor:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        if page_texts is not None and "".join(page_texts).strip():
+            ResumeInputHandler._cache_text(cache, content_hash, engine, "".join(page_texts))
 
-        # Try PyPDF2 as a final fallback
+    @staticmethod
+    def _cache_text(cache, content_hash: str, engine: str, text: str):
+        """Stores extracted PDF text in the cache; cache errors never interrupt extraction."""
+        if cache is None or content_hash is None:
+            return
         try:
-            with open(pdf_path, 'rb') as file: # Open PDF in binary read mode
-                reader = PyPDF2.PdfReader(file)
-                for page in reader.pages:
-                    text += page.extract_text() + "\n" # Extract text from each page
-            if text.strip():
-                print("✓ Text extracted using PyPDF2.")
-                return text
+            cache.put(content_hash, engine, text)
         except Exception as e:
-            print(f"PyPDF2 extraction failed: {e}.")
-
-        print("❌ Could not extract text from PDF using any method.")
-        return text # Return empty string if no text could be extracted
+            print(f"Could not cache extracted text: {e}")
 
     @staticmethod
     def get_resume_input() -> str:
@@ -112,7 +318,7 @@ class ResumeInputHandler:
                     print("Please provide a PDF file (.pdf extension).")
                     continue
                 
-                text = ResumeInputHandler.extract_text_from_pdf(pdf_path)
+                text = ResumeInputHandler._extract_pdf_input(pdf_path)
                 if text.strip():
                     print("✓ PDF processed successfully!")
                     return text
@@ -126,6 +332,44 @@ class ResumeInputHandler:
                 print(f"Error processing PDF: {e}")
                 continue
 
+    @staticmethod
+    def _extract_pdf_input(pdf_path: str) -> str:
+        """
+        Extracts text from a PDF provided by the user. Long PDFs are streamed page by page
+        through a process pool with progress reporting; short ones use extract_text_from_pdf.
+        """
+        try:
+            page_count = ResumeInputHandler.count_pdf_pages(pdf_path)
+        except Exception:
+            page_count = 0
+        if page_count < STREAMING_PAGE_THRESHOLD:
+            return ResumeInputHandler.extract_text_from_pdf(pdf_path)
+
+        print(f"Extracting {page_count} pages in parallel...")
+        page_texts = []
+        with span("pdf_extract", mode="streaming", pages=page_count) as pdf_span:
+            if pdf_span:
+                pdf_span.set(bytes_in=os.path.getsize(pdf_path) if os.path.exists(pdf_path) else 0)
+            try:
+                for page_number, page_text in enumerate(ResumeInputHandler.stream_pdf_pages(pdf_path), start=1):
+                    page_texts.append(page_text)
+                    print(f"\r  Processed page {page_number}/{page_count}", end="", flush=True)
+                print()
+            except Exception as e:
+                pdf_span.set(error=type(e).__name__)
+                print(f"\nParallel extraction failed: {e}. Trying standard extraction...")
+                page_texts = None
+            else:
+                pdf_span.set(chars_out=sum(len(page_text) for page_text in page_texts))
+        if page_texts is None:
+            return ResumeInputHandler.extract_text_from_pdf(pdf_path)
+
+        text = "".join(page_texts)
+        if not text.strip():
+            # The streaming engine found no text; let the multi-engine fallback try
+            return ResumeInputHandler.extract_text_from_pdf(pdf_path)
+        return text
+
     @staticmethod
     def _handle_text_file_input() -> str:
         """Handles input when the user chooses to upload a text file."""
@@ -0,0 +1,136 @@
+# utils/jd_index.py
+import json
+import os
+from typing import Dict, Iterable, List, Tuple
+
+from utils.skill_matcher import DEFAULT_MATCHER, SkillMatcher
+from utils.text_vectors import (
+    SkillVocabulary, normalize_rows, require_vectors, skill_matrix, term_matrix, VECTORS_AVAILABLE
+)
+
+if VECTORS_AVAILABLE:
+    import numpy as np
+    from scipy import sparse
+
+# Share of the score coming from taxonomy skill coverage; the rest is n-gram similarity
+SKILL_WEIGHT = 0.6
+
+class JobDescriptionIndex:
+    """
+    An in-memory index of job postings for ranking them against one resume.
+    Each posting is stored as a TF-IDF vector of hashed word n-grams and a binary
+    vector of SimpleFallback taxonomy skills. A query scores every posting at once
+    with sparse matrix products:
+
+        score = (1 - SKILL_WEIGHT) * cosine(n-grams) + SKILL_WEIGHT * share of the posting's skills the resume has
+    """
+
+    def __init__(self, ids: List[str], terms, idf, skills, vocabulary: SkillVocabulary):
+        require_vectors()
+        self.ids = ids
+        self.terms = terms  # Rows are L2-normalized TF-IDF vectors
+        self.idf = idf
+        self.skills = skills.tocsr()
+        self.vocabulary = vocabulary
+        self.skill_counts = np.asarray(self.skills.sum(axis=1)).ravel()
+
+    @classmethod
+    def build(cls, postings: Iterable[Tuple[str, str]], matcher: SkillMatcher = DEFAULT_MATCHER) -> "JobDescriptionIndex":
+        """Builds the index from (posting_id, job_description_text) pairs."""
+        require_vectors()
+        ids, texts = [], []
+        for posting_id, text in postings:
+            ids.append(str(posting_id))
+            texts.append(text)
+        vocabulary = SkillVocabulary(matcher)
+
+        terms = term_matrix(texts)
+        # Smoothed inverse document frequency, computed over the hashed columns
+        document_frequency = np.bincount(terms.indices, minlength=terms.shape[1])
+        idf = (np.log((1 + len(texts)) / (1 + document_frequency)) + 1.0).astype(np.float32)
+        terms = normalize_rows(terms @ sparse.diags(idf)).tocsr()
+        return cls(ids, terms, idf, skill_matrix(texts, vocabulary), vocabulary)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def search(self, resume_text: str, top_k: int = 10) -> List[Dict]:
+        """
+        Returns the 'top_k' best matching postings for the resume, best first, with
+        the score and the posting's skills the resume matches or is missing.
+        """
+        if not self.ids:
+            return []
+        query_terms = normalize_rows(term_matrix([resume_text]) @ sparse.diags(self.idf))
+        term_scores = (self.terms @ query_terms.T).toarray().ravel()
+
+        resume_skills = np.zeros(len(self.vocabulary), dtype=np.float32)
+        resume_skills[self.vocabulary.skill_ids(resume_text)] = 1.0
+        overlap = self.skills @ resume_skills
+        coverage = np.divide(overlap, self.skill_counts, out=np.zeros_like(overlap), where=self.skill_counts > 0)
+
+        scores = (1.0 - SKILL_WEIGHT) * term_scores + SKILL_WEIGHT * coverage
+        top_k = min(top_k, len(scores))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for row in top:
+            posting_skills = self.skills.indices[self.skills.indptr[row]:self.skills.indptr[row + 1]]
+            results.append({
+                "id": self.ids[row],
+                "score": round(float(scores[row]), 4),
+                "term_similarity": round(float(term_scores[row]), 4),
+                "skill_coverage": round(float(coverage[row]), 4),
+                "matched_skills": [self.vocabulary.skills[i] for i in posting_skills if resume_skills[i]],
+                "missing_skills": [self.vocabulary.skills[i] for i in posting_skills if not resume_skills[i]],
+            })
+        return results
+
+    def save(self, directory: str):
+        """Saves the index to a directory, so job feeds need not be re-vectorized on every run."""
+        os.makedirs(directory, exist_ok=True)
+        sparse.save_npz(os.path.join(directory, 'terms.npz'), self.terms)
+        sparse.save_npz(os.path.join(directory, 'skills.npz'), self.skills)
+        np.save(os.path.join(directory, 'idf.npy'), self.idf)
+        with open(os.path.join(directory, 'index.json'), 'w', encoding='utf-8') as file:
+            json.dump({"ids": self.ids, "skills": self.vocabulary.skills}, file)
+
+    @classmethod
+    def load(cls, directory: str, matcher: SkillMatcher = DEFAULT_MATCHER) -> "JobDescriptionIndex":
+        """Loads an index saved with save(). The skill taxonomy must be the one it was built with."""
+        require_vectors()
+        with open(os.path.join(directory, 'index.json'), 'r', encoding='utf-8') as file:
+            meta = json.load(file)
+        vocabulary = SkillVocabulary(matcher)
+        if vocabulary.skills != meta["skills"]:
+            raise ValueError("The index was built with a different skill taxonomy. Please rebuild it.")
+        return cls(
+            meta["ids"],
+            sparse.load_npz(os.path.join(directory, 'terms.npz')).tocsr(),
+            np.load(os.path.join(directory, 'idf.npy')),
+            sparse.load_npz(os.path.join(directory, 'skills.npz')),
+            vocabulary,
+        )
+
+def load_postings(source: str) -> List[Tuple[str, str]]:
+    """
+    Reads job postings from a directory of .txt files (id = file name) or from a
+    JSON Lines feed with one {"id": ..., "text": ...} object per line
+    ("description" is accepted instead of "text").
+    """
+    if os.path.isdir(source):
+        postings = []
+        for name in sorted(os.listdir(source)):
+            if name.lower().endswith('.txt'):
+                with open(os.path.join(source, name), 'r', encoding='utf-8') as file:
+                    postings.append((os.path.splitext(name)[0], file.read()))
+        return postings
+
+    postings = []
+    with open(source, 'r', encoding='utf-8') as file:
+        for line_number, line in enumerate(file, start=1):
+            if line.strip():
+                record = json.loads(line)
+                postings.append((record.get("id", line_number), record.get("text") or record.get("description", "")))
+    return postings
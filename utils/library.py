@@ -0,0 +1,169 @@
+# utils/library.py
+import json
+import time
+from typing import BinaryIO, Dict, Optional, Union
+
+from utils.input_handlers import ResumeInputHandler
+from utils.resume_processor import (
+    analyze_resume, llm_resume_optimization, llm_resume_optimization_async, prepare_optimization_prompt
+)
+from utils.results import ResumeAnalysis, dumps_msgpack
+
+# A resume given as text, as the bytes of a PDF or text file, or as a binary file object
+ResumeInput = Union[str, bytes, bytearray, memoryview, BinaryIO]
+
+class OptimizationResult:
+    """
+    The outcome of one optimization: the optimized resume and how it was produced.
+    In fallback mode, 'analysis' holds the structured rule-based result (skills, matched
+    keywords, sections; see utils/results.py) and the text report is only rendered
+    when 'optimized_resume' is read.
+    """
+    __slots__ = ('_optimized_resume', 'mode', 'error', 'resume_chars', 'chunked',
+                 'prompt_tokens', 'prompt_tokens_saved', 'seconds', 'analysis')
+
+    def __init__(self, optimized_resume: Optional[str], mode: str, error: Optional[str] = None, resume_chars: int = 0,
+                 chunked: bool = False, prompt_tokens: Optional[int] = None, prompt_tokens_saved: int = 0,
+                 seconds: float = 0.0, analysis: Optional[ResumeAnalysis] = None):
+        self._optimized_resume = optimized_resume
+        self.mode = mode # 'llm' or 'fallback'
+        self.error = error # Why the LLM was not used, when it failed
+        self.resume_chars = resume_chars
+        self.chunked = chunked
+        self.prompt_tokens = prompt_tokens
+        self.prompt_tokens_saved = prompt_tokens_saved
+        self.seconds = seconds
+        self.analysis = analysis
+
+    @property
+    def optimized_resume(self) -> str:
+        if self._optimized_resume is None:
+            self._optimized_resume = self.analysis.render_text() if self.analysis is not None else ""
+        return self._optimized_resume
+
+    @optimized_resume.setter
+    def optimized_resume(self, value: str):
+        self._optimized_resume = value
+
+    def to_dict(self, include_resume: bool = True) -> Dict:
+        """
+        Returns the result as plain data, with the analysis as a nested dict. Without
+        'include_resume', the optimized resume is left out and nothing is rendered.
+        """
+        data = {name: getattr(self, name) for name in self.__slots__[1:-1]}
+        if include_resume:
+            data["optimized_resume"] = self.optimized_resume
+        data["analysis"] = self.analysis.to_dict(include_resume=False) if self.analysis is not None else None
+        return data
+
+    def to_json(self, include_resume: bool = True) -> str:
+        return json.dumps(self.to_dict(include_resume), ensure_ascii=False)
+
+    def to_msgpack(self, include_resume: bool = True) -> bytes:
+        return dumps_msgpack(self.to_dict(include_resume))
+
+def _is_pdf(data) -> bool:
+    return bytes(memoryview(data)[:1024]).lstrip().startswith(b'%PDF-')
+
+def read_resume(resume: ResumeInput, content_type: Optional[str] = None) -> str:
+    """
+    Returns the text of a resume given in memory, without prompting or touching the disk.
+    A str is the resume text itself (not a path). Bytes, bytearrays, memoryviews and
+    binary file objects (an io.BytesIO is read through its buffer, without a copy) hold
+    a PDF, recognized by 'content_type' 'application/pdf' or its '%PDF-' header, or
+    UTF-8 text. Raises ValueError if no text can be obtained.
+    """
+    if isinstance(resume, str):
+        text = resume
+    else:
+        if hasattr(resume, 'getbuffer'):
+            data = resume.getbuffer()
+        elif hasattr(resume, 'read'):
+            data = resume.read()
+        else:
+            data = resume
+        if content_type == 'application/pdf' or _is_pdf(data):
+            text = ResumeInputHandler.extract_text_from_pdf_bytes(data)
+        else:
+            try:
+                text = str(memoryview(data), 'utf-8-sig')
+            except UnicodeDecodeError:
+                raise ValueError("The resume is neither a PDF nor UTF-8 text.") from None
+    if not text.strip():
+        raise ValueError("No text could be extracted from the resume.")
+    return text
+
+def optimize_resume(resume: ResumeInput, job_description: str, llm=None, chunked: str = "auto",
+                    content_type: Optional[str] = None) -> OptimizationResult:
+    """
+    Optimizes a resume for a job description and returns an OptimizationResult.
+    The library entry point for embedding: it never reads stdin, exits or writes files.
+    'resume' is anything read_resume accepts. With an 'llm' (any chat model with
+    'invoke', e.g. utils.llm_config.llm after setup_llm), the AI-powered optimization
+    is used, section by section for long resumes ('chunked': 'auto', 'on' or 'off');
+    without one, or if the LLM fails, the rule-based optimization is, and the result
+    carries its structured analysis.
+    Inside a running event loop, use optimize_resume_async instead.
+    """
+    started = time.perf_counter()
+    resume_text = read_resume(resume, content_type)
+    result = OptimizationResult(None, "fallback", resume_chars=len(resume_text))
+    if llm is not None:
+        from utils.chunked_optimizer import (
+            chunked_resume_optimization, record_whole_prompt_run, use_chunked_mode
+        )
+        try:
+            if use_chunked_mode(resume_text, chunked):
+                result.optimized_resume = chunked_resume_optimization(llm, resume_text, job_description)
+                result.chunked = True
+            else:
+                prepared = prepare_optimization_prompt(resume_text, job_description, getattr(llm, 'provider', None))
+                result.prompt_tokens, result.prompt_tokens_saved = prepared.prompt_tokens, prepared.tokens_saved
+                result.optimized_resume = llm_resume_optimization(llm, resume_text, job_description, prepared.prompt)
+                record_whole_prompt_run(resume_text)
+            result.mode = "llm"
+        except Exception as e:
+            result.error = f"LLM optimization failed: {e}"
+    if result.mode != "llm":
+        result.analysis = analyze_resume(resume_text, job_description)
+    result.seconds = round(time.perf_counter() - started, 4)
+    return result
+
+async def optimize_resume_async(resume: ResumeInput, job_description: str, llm_client=None,
+                                chunked: str = "auto", content_type: Optional[str] = None) -> OptimizationResult:
+    """
+    Async counterpart of optimize_resume. 'llm_client' is anything with an async
+    'ainvoke', typically a utils.async_llm.AsyncLLMClient shared by concurrent calls.
+    PDF extraction and the rule-based optimization run on worker threads.
+    """
+    import asyncio
+    from utils.chunked_optimizer import (
+        chunked_resume_optimization_async, record_whole_prompt_run, use_chunked_mode
+    )
+
+    started = time.perf_counter()
+    if isinstance(resume, str):
+        resume_text = read_resume(resume)
+    else:
+        resume_text = await asyncio.to_thread(read_resume, resume, content_type)
+    result = OptimizationResult(None, "fallback", resume_chars=len(resume_text))
+    if llm_client is not None:
+        provider = getattr(llm_client, 'provider', None)
+        try:
+            if use_chunked_mode(resume_text, chunked):
+                result.optimized_resume = await chunked_resume_optimization_async(
+                    llm_client, resume_text, job_description, provider)
+                result.chunked = True
+            else:
+                prepared = prepare_optimization_prompt(resume_text, job_description, provider)
+                result.prompt_tokens, result.prompt_tokens_saved = prepared.prompt_tokens, prepared.tokens_saved
+                result.optimized_resume = await llm_resume_optimization_async(
+                    llm_client, resume_text, job_description, prepared.prompt)
+                record_whole_prompt_run(resume_text)
+            result.mode = "llm"
+        except Exception as e:
+            result.error = f"LLM optimization failed: {e}"
+    if result.mode != "llm":
+        result.analysis = await asyncio.to_thread(analyze_resume, resume_text, job_description)
+    result.seconds = round(time.perf_counter() - started, 4)
+    return result
@@ -0,0 +1,134 @@
+# utils/llm_cache.py
+import asyncio
+import hashlib
+import json
+import os
+
+from utils.cache_store import LRUCacheStore, get_cache_dir
+
+# A streamed response is cached only up to this many characters; longer streams are not
+# held in memory for the cache, so streaming memory does not grow with the response
+STREAM_CACHE_MAX_CHARS = 1_000_000
+
+def normalize_prompt(prompt) -> str:
+    """
+    Normalizes a prompt for cache keying: unifies line endings and strips trailing
+    whitespace, so prompts that differ only in insignificant whitespace share an entry.
+    Non-string prompts (e.g. message lists) are keyed by their string representation.
+    """
+    text = prompt if isinstance(prompt, str) else repr(prompt)
+    lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    return '\n'.join(line.rstrip() for line in lines).strip()
+
+class CachedResponse:
+    """A minimal response object mirroring the 'content' attribute of LangChain messages."""
+
+    def __init__(self, content: str, cached: bool = True):
+        self.content = content
+        self.cached = cached
+
+    def __str__(self):
+        return self.content
+
+class CachedLLM:
+    """
+    Wraps a LangChain chat model with a persistent response cache.
+    Responses are keyed by provider, model name, temperature, max_tokens and the
+    normalized prompt hash, so re-runs with unchanged inputs make no network call.
+    Any attribute not defined here is forwarded to the wrapped model.
+    """
+
+    def __init__(self, llm, provider: str, model: str, temperature: float, max_tokens: int,
+                 store: LRUCacheStore = None):
+        self.wrapped = llm
+        self.provider = provider
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        if store is None:
+            store = LRUCacheStore(
+                os.path.join(get_cache_dir(), 'llm_responses.sqlite3'),
+                max_bytes=int(float(os.getenv('RESUME_AGENT_LLM_CACHE_MB', '64')) * 1024 * 1024),
+                ttl_seconds=float(os.getenv('RESUME_AGENT_LLM_CACHE_TTL', str(7 * 24 * 3600))),
+            )
+        self.store = store
+
+    def cache_key(self, prompt) -> str:
+        """Returns the cache key for a prompt under this model's settings."""
+        prompt_hash = hashlib.sha256(normalize_prompt(prompt).encode('utf-8')).hexdigest()
+        settings = json.dumps([self.provider, self.model, self.temperature, self.max_tokens])
+        return hashlib.sha256(f"{settings}:{prompt_hash}".encode('utf-8')).hexdigest()
+
+    def lookup(self, prompt):
+        """Returns the cached response for the prompt, or None on a miss."""
+        try:
+            content = self.store.get(self.cache_key(prompt))
+        except Exception as e:
+            print(f"LLM cache unavailable: {e}")
+            return None
+        if content is None:
+            return None
+        print("✓ LLM response served from cache.")
+        return CachedResponse(content)
+
+    def _store_response(self, prompt, response):
+        """Caches the text content of a model response."""
+        content = response.content if hasattr(response, 'content') else str(response)
+        if isinstance(content, str) and content.strip():
+            try:
+                self.store.put(self.cache_key(prompt), content)
+            except Exception as e:
+                print(f"Could not cache LLM response: {e}")
+
+    def invoke(self, prompt, *args, **kwargs):
+        """Returns the cached response for the prompt, or invokes the model and caches its answer."""
+        cached = self.lookup(prompt)
+        if cached is not None:
+            return cached
+        response = self.wrapped.invoke(prompt, *args, **kwargs)
+        self._store_response(prompt, response)
+        return response
+
+    def stream(self, prompt, *args, **kwargs):
+        """
+        Streams the response. A cached response is yielded as a single chunk;
+        otherwise chunks come from the model and the complete text is cached at the end,
+        unless it exceeds STREAM_CACHE_MAX_CHARS (it is then not cached at all).
+        """
+        cached = self.lookup(prompt)
+        if cached is not None:
+            yield cached
+            return
+        parts, chars = [], 0
+        for chunk in self.wrapped.stream(prompt, *args, **kwargs):
+            content = chunk.content if hasattr(chunk, 'content') else str(chunk)
+            if parts is not None and isinstance(content, str):
+                chars += len(content)
+                if chars > STREAM_CACHE_MAX_CHARS:
+                    parts = None # Too long to hold for the cache; release what was kept
+                else:
+                    parts.append(content)
+            yield chunk
+        if parts is not None:
+            self._store_response(prompt, CachedResponse("".join(parts), cached=False))
+
+    async def ainvoke(self, prompt, *args, **kwargs):
+        """Async counterpart of invoke, using the model's 'ainvoke'. The cache is read and written on worker threads."""
+        cached = await asyncio.to_thread(self.lookup, prompt)
+        if cached is not None:
+            return cached
+        return await self.ainvoke_uncached(prompt, *args, **kwargs)
+
+    async def ainvoke_uncached(self, prompt, *args, **kwargs):
+        """Invokes the model without a cache lookup (for callers that already did one) and caches the answer."""
+        response = await self.wrapped.ainvoke(prompt, *args, **kwargs)
+        await asyncio.to_thread(self._store_response, prompt, response)
+        return response
+
+    def stats(self) -> dict:
+        """Returns the cache's hit/miss counters and size."""
+        return self.store.stats()
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the wrapper itself
+        return getattr(self.wrapped, name)
@@ -1,92 +1,184 @@
 # utils/llm_config.py
+import importlib
 import os
-import time # Import time for potential retry delays
+import threading
 
 # Global LLM variable, initialized to None
 llm = None
 
+# Model settings shared by the providers; they are also part of the response cache key
+GEMINI_MODEL = "gemini-1.5-flash-latest"
+OPENAI_MODEL = "gpt-3.5-turbo"
+LLM_TEMPERATURE = 0.3
+LLM_MAX_TOKENS = 2000
+
+# Provider SDKs are imported only when a provider is set up; each is keyed by its API key variable
+PROVIDER_SDKS = (('GOOGLE_API_KEY', 'langchain_google_genai'), ('OPENAI_API_KEY', 'langchain_openai'))
+
+def preload_provider_sdks():
+    """
+    Imports the SDKs of the providers that have an API key, without configuring anything.
+    Import errors are ignored here; setup_llm reports them.
+    """
+    if os.getenv('RESUME_AGENT_LLM_PROVIDER', '').lower() == 'stub':
+        return
+    for key_variable, module in PROVIDER_SDKS:
+        if os.getenv(key_variable, '').strip():
+            try:
+                importlib.import_module(module)
+            except Exception:
+                pass
+
+def preload_provider_sdks_in_background() -> threading.Thread:
+    """
+    Starts preload_provider_sdks in a daemon thread, so the SDK imports (often seconds)
+    overlap with the user entering input instead of delaying the first prompt.
+    """
+    thread = threading.Thread(target=preload_provider_sdks, name="llm-sdk-preload", daemon=True)
+    thread.start()
+    return thread
+
+def _with_response_cache(llm_instance, provider: str, model: str):
+    """
+    Wraps a configured LLM with the persistent response cache, unless it is
+    disabled with RESUME_AGENT_LLM_CACHE=0 or cannot be opened.
+    """
+    if os.getenv('RESUME_AGENT_LLM_CACHE', '1') == '0':
+        return llm_instance
+    try:
+        from utils.llm_cache import CachedLLM
+        return CachedLLM(llm_instance, provider, model, LLM_TEMPERATURE, LLM_MAX_TOKENS)
+    except Exception as e:
+        print(f"⚠️ LLM response cache unavailable: {e}")
+        return llm_instance
+
+def _prepare_llm(llm_instance, provider: str, model: str):
+    """
+    Wraps a configured LLM so real requests record the provider's health,
+    then puts it behind the response cache.
+    """
+    from utils.provider_health import HealthTrackedLLM
+    return _with_response_cache(HealthTrackedLLM(llm_instance, provider), provider, model)
+
 def setup_llm():
     """
     Sets up the Large Language Model (LLM) provider.
-    Tries to configure Gemini first, then falls back to OpenAI if Gemini fails.
+    Tries to configure Gemini first, then falls back to OpenAI
+    (or uses the local stub model when RESUME_AGENT_LLM_PROVIDER=stub).
+    When both are available they are combined in a utils.llm_router.LLMRouter,
+    which hedges slow requests to the other provider and trips a circuit breaker
+    on a failing one.
+    No test request is sent: a provider is skipped only if a real request to it
+    failed recently (see utils/provider_health.py), and the first real request
+    records its health for the next run.
     The configured LLM instance is stored in the global 'llm' variable.
     """
-    global llm # Declare 'llm' as global to modify the module-level variable
-    print("Setting up LLM provider...")
+    from utils.metrics import span
+    with span("llm_setup") as setup_span:
+        _configure_llm()
+        setup_span.set(provider=getattr(llm, 'provider', None) or ("stub" if llm is not None else "none"))
 
-    # Try Gemini with better error handling and retry logic
+def _create_gemini(max_retries: int = 2):
+    """Returns a Gemini chat model, or None (after printing why) if it cannot be set up."""
+    from utils.provider_health import get_provider_health
+    # Skip Gemini if it failed within the health TTL
+    if get_provider_health("gemini") is False:
+        print("⚠️ Gemini failed recently. Skipping it until its health status expires.")
+        return None
     try:
         from langchain_google_genai import ChatGoogleGenerativeAI
         google_api_key = os.getenv('GOOGLE_API_KEY') # Retrieve API key from environment variables
 
         if google_api_key and google_api_key.strip():
-            print("✓ Attempting to use Google Gemini (gemini-1.5-flash-latest)...")
-            
             # Initialize Gemini LLM with specified model, temperature, and token limits
             # Also includes request timeout and max retries for robustness
-            gemini_llm_instance = ChatGoogleGenerativeAI(
-                model="gemini-1.5-flash-latest",
-                temperature=0.3, # Controls creativity of the response
-                max_tokens=2000, # Maximum number of tokens in the generated response
+            return ChatGoogleGenerativeAI(
+                model=GEMINI_MODEL,
+                temperature=LLM_TEMPERATURE, # Controls creativity of the response
+                max_tokens=LLM_MAX_TOKENS, # Maximum number of tokens in the generated response
                 convert_system_message_to_human=True, # Converts system messages to human messages
                 request_timeout=60, # Timeout for each API request in seconds
-                max_retries=2 # Number of retries for failed requests
+                max_retries=max_retries # Number of retries for failed requests
             )
-            
-            # Test the Gemini connection
-            try:
-                print("Testing Gemini connection...")
-                test_response = gemini_llm_instance.invoke("Hello, please respond with 'Gemini ready'.")
-                if test_response and "Gemini ready" in (test_response.content if hasattr(test_response, 'content') else str(test_response)):
-                    print("✓ Gemini connection successful")
-                    llm = gemini_llm_instance # Assign the successful instance to the global llm
-                    return
-                else:
-                    print(f"❌ Gemini test failed: Unexpected response. {test_response.content if hasattr(test_response, 'content') else str(test_response)}")
-            except Exception as test_error:
-                print(f"❌ Gemini test failed during invoke: {test_error}")
-        else:
-            print("❌ Google API key (GOOGLE_API_KEY) not found or empty.")
+        print("❌ Google API key (GOOGLE_API_KEY) not found or empty.")
     except ImportError:
         print("❌ 'langchain_google_genai' not installed. Skipping Gemini setup.")
     except Exception as e:
         print(f"❌ Gemini setup experienced an unexpected error: {e}")
+    return None
 
-    # Fallback to OpenAI if Gemini setup or test failed
-    if llm is None: # Only try OpenAI if Gemini wasn't successfully set up
-        try:
-            from langchain_openai import ChatOpenAI
-            openai_api_key = os.getenv('OPENAI_API_KEY') # Retrieve OpenAI API key
-
-            if openai_api_key and openai_api_key.strip():
-                print("✓ Attempting to use OpenAI GPT-3.5-turbo (Fallback)...")
-                # Initialize OpenAI LLM
-                openai_llm_instance = ChatOpenAI(
-                    model="gpt-3.5-turbo", # Using a common and cost-effective model
-                    temperature=0.3,
-                    max_tokens=2000,
-                    request_timeout=120, # Increased timeout for OpenAI
-                    openai_api_key=openai_api_key
-                )
-                
-                # Test the OpenAI connection
-                try:
-                    print("Testing OpenAI connection...")
-                    test_response = openai_llm_instance.invoke("Hello, please respond with 'OpenAI ready'.")
-                    if test_response and "OpenAI ready" in (test_response.content if hasattr(test_response, 'content') else str(test_response)):
-                        print("✓ OpenAI connection successful")
-                        llm = openai_llm_instance # Assign the successful instance to the global llm
-                        return
-                    else:
-                        print(f"❌ OpenAI test failed: Unexpected response. {test_response.content if hasattr(test_response, 'content') else str(test_response)}")
-                except Exception as test_error:
-                    print(f"❌ OpenAI test failed during invoke: {test_error}")
-            else:
-                print("❌ OpenAI API key (OPENAI_API_KEY) not found or empty.")
-        except ImportError:
-            print("❌ 'langchain_openai' not installed. Skipping OpenAI setup.")
-        except Exception as e:
-            print(f"❌ OpenAI setup experienced an unexpected error: {e}")
+def _create_openai(max_retries: int = 2):
+    """Returns an OpenAI chat model, or None (after printing why) if it cannot be set up."""
+    from utils.provider_health import get_provider_health
+    # Skip OpenAI if it failed within the health TTL
+    if get_provider_health("openai") is False:
+        print("⚠️ OpenAI failed recently. Skipping it until its health status expires.")
+        return None
+    try:
+        from langchain_openai import ChatOpenAI
+        openai_api_key = os.getenv('OPENAI_API_KEY') # Retrieve OpenAI API key
+
+        if openai_api_key and openai_api_key.strip():
+            # Initialize OpenAI LLM
+            return ChatOpenAI(
+                model=OPENAI_MODEL, # Using a common and cost-effective model
+                temperature=LLM_TEMPERATURE,
+                max_tokens=LLM_MAX_TOKENS,
+                request_timeout=120, # Increased timeout for OpenAI
+                max_retries=max_retries,
+                openai_api_key=openai_api_key
+            )
+        print("❌ OpenAI API key (OPENAI_API_KEY) not found or empty.")
+    except ImportError:
+        print("❌ 'langchain_openai' not installed. Skipping OpenAI setup.")
+    except Exception as e:
+        print(f"❌ OpenAI setup experienced an unexpected error: {e}")
+    return None
+
+def _configure_llm():
+    """Configures the usable providers into the global 'llm' (see setup_llm)."""
+    global llm # Declare 'llm' as global to modify the module-level variable
+    print("Setting up LLM provider...")
+
+    # Local stub provider for testing without network access or API keys
+    if os.getenv('RESUME_AGENT_LLM_PROVIDER', '').lower() == 'stub':
+        from utils.stub_llm import StubChatModel
+        llm = StubChatModel(latency=float(os.getenv('RESUME_AGENT_STUB_LATENCY', '0.5')))
+        print("✓ Using the local stub LLM (RESUME_AGENT_LLM_PROVIDER=stub).")
+        return
+
+    # With routing (the default), both providers are configured and requests are hedged
+    # between them; the router fails over, so each client retries only once itself.
+    # RESUME_AGENT_LLM_ROUTER=0 restores the single provider: Gemini, else OpenAI.
+    use_router = os.getenv('RESUME_AGENT_LLM_ROUTER', '1') != '0'
+    max_retries = 1 if use_router else 2
+
+    gemini_llm_instance = _create_gemini(max_retries)
+    if gemini_llm_instance is not None and not use_router:
+        print(f"✓ Using Google Gemini ({GEMINI_MODEL}).")
+        # Assign the instance (health-tracked, behind the response cache) to the global llm
+        llm = _prepare_llm(gemini_llm_instance, "gemini", GEMINI_MODEL)
+        return
+
+    # Fallback to OpenAI if Gemini is unavailable (or as the second routed provider)
+    openai_llm_instance = _create_openai(max_retries)
+
+    if gemini_llm_instance is not None and openai_llm_instance is not None:
+        from utils.llm_router import LLMRouter
+        from utils.provider_health import HealthTrackedLLM
+        print(f"✓ Routing between Google Gemini ({GEMINI_MODEL}) and OpenAI {OPENAI_MODEL} "
+              f"with hedged requests.")
+        router = LLMRouter([
+            ("gemini", HealthTrackedLLM(gemini_llm_instance, "gemini")),
+            ("openai", HealthTrackedLLM(openai_llm_instance, "openai")),
+        ])
+        llm = _with_response_cache(router, router.provider, f"{GEMINI_MODEL}+{OPENAI_MODEL}")
+    elif gemini_llm_instance is not None:
+        print(f"✓ Using Google Gemini ({GEMINI_MODEL}).")
+        llm = _prepare_llm(gemini_llm_instance, "gemini", GEMINI_MODEL)
+    elif openai_llm_instance is not None:
+        print(f"✓ Using OpenAI {OPENAI_MODEL} (Fallback).")
+        llm = _prepare_llm(openai_llm_instance, "openai", OPENAI_MODEL)
 
     # If no LLM could be set up
     if llm is None:
@@ -94,8 +186,9 @@ def setup_llm():
 
 def test_llm_simple():
     """
-    Tests the functionality of the globally configured LLM.
+    Tests the functionality of the globally configured LLM with a live request.
     Returns True if the LLM responds as expected, False otherwise.
+    Not part of the normal run: provider health is recorded from real requests.
     """
     global llm
     if not llm:
@@ -104,8 +197,10 @@ def test_llm_simple():
 
     try:
         print("Initiating simple LLM functionality test...")
-        # A specific prompt to ensure the LLM is responding and is callable
-        response = llm.invoke("Hello! Please respond with 'LLM is working correctly.'")
+        # A specific prompt to ensure the LLM is responding and is callable.
+        # The test always goes to the provider, never to the response cache.
+        live_llm = getattr(llm, 'wrapped', llm)
+        response = live_llm.invoke("Hello! Please respond with 'LLM is working correctly.'")
         if response:
             content = response.content if hasattr(response, 'content') else str(response)
             if "LLM is working correctly." in content:
@@ -0,0 +1,323 @@
+# utils/llm_router.py
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Dict, List, Optional, Tuple
+
+from utils.async_llm import _provider_bucket
+from utils.prompt_budget import estimate_tokens
+
+# Longest wait before hedging, used until a provider has enough latency samples for a p95
+DEFAULT_HEDGE_DELAY = 8.0
+# Latency samples kept per provider, and the number needed before the p95 is trusted
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 20
+
+class ProvidersUnavailable(RuntimeError):
+    """Raised when the circuit of every routed provider is open."""
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a provider after 'failure_threshold' consecutive errors.
+    After 'reset_seconds' one trial request is let through (half-open): success
+    closes the circuit, another failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset_seconds else "open"
+
+    def allow(self) -> bool:
+        """Returns True if a request may be sent now (reserving the trial slot when half-open)."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def release_trial(self):
+        """Frees the half-open trial slot of a request that was abandoned (e.g. a lost hedge) before it ended."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+class _Provider:
+    """A routed provider: its model, circuit breaker, rate limits and recent latencies."""
+
+    def __init__(self, name: str, llm, breaker: CircuitBreaker):
+        self.name = name
+        self.llm = llm
+        self.breaker = breaker
+        # The provider's own RESUME_AGENT_<NAME>_RPM / _TPM limits, shared with direct clients
+        self.request_bucket = _provider_bucket(name, 'RPM')
+        self.token_bucket = _provider_bucket(name, 'TPM')
+        self.max_tokens = getattr(llm, 'max_tokens', None) or 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.calls = 0
+        self.wins = 0
+        self.failures = 0
+
+    def p95(self) -> Optional[float]:
+        if len(self.latencies) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+class LLMRouter:
+    """
+    Routes requests across several configured chat models (for example Gemini and OpenAI),
+    in order of preference. If the chosen provider has not answered within its observed
+    p95 latency, the same request is also sent to the next provider (a hedged request)
+    and whichever answers first wins. Providers with repeated errors are skipped by a
+    circuit breaker until a trial request succeeds again.
+
+    Supports invoke, ainvoke and stream like the underlying models. Streams are not
+    hedged: a provider that fails before its first chunk is replaced by the next one.
+    Async requests are rate limited per routed provider (RESUME_AGENT_<NAME>_RPM / _TPM),
+    so an AsyncLLMClient around the router does not apply limits of its own.
+    """
+    limits_providers = True
+
+    def __init__(self, providers: List[Tuple[str, object]], hedge_delay: float = None,
+                 failure_threshold: int = 3, reset_seconds: float = 30.0):
+        if not providers:
+            raise ValueError("LLMRouter needs at least one provider.")
+        self.providers = [_Provider(name, llm, CircuitBreaker(failure_threshold, reset_seconds))
+                          for name, llm in providers]
+        self.provider = "+".join(name for name, _ in providers)
+        self.default_hedge_delay = hedge_delay if hedge_delay is not None else float(
+            os.getenv('RESUME_AGENT_HEDGE_DELAY', str(DEFAULT_HEDGE_DELAY)))
+        self.max_tokens = max((getattr(llm, 'max_tokens', None) or 0) for _, llm in providers) or None
+        self.hedged = 0
+
+    def _candidates(self) -> List[_Provider]:
+        """Providers whose circuit is not open, in order of preference."""
+        candidates = [provider for provider in self.providers if provider.breaker.state != "open"]
+        if not candidates:
+            raise ProvidersUnavailable("All LLM providers are failing (circuit open). Try again shortly.")
+        return candidates
+
+    @staticmethod
+    def _next_provider(backups: List[_Provider]) -> Optional[_Provider]:
+        """Takes the next provider whose circuit admits a request now (a half-open one admits one trial)."""
+        while backups:
+            provider = backups.pop(0)
+            if provider.breaker.allow():
+                return provider
+        return None
+
+    def hedge_delay(self, provider: _Provider) -> float:
+        """
+        Seconds to wait for a provider before hedging: its p95 latency once known,
+        never more than the configured hedge delay (RESUME_AGENT_HEDGE_DELAY).
+        """
+        p95 = provider.p95()
+        return min(p95, self.default_hedge_delay) if p95 is not None else self.default_hedge_delay
+
+    def _record(self, provider: _Provider, started: float, error: Exception = None):
+        provider.calls += 1
+        if error is None:
+            provider.latencies.append(time.perf_counter() - started)
+            provider.breaker.record_success()
+        else:
+            provider.failures += 1
+            provider.breaker.record_failure()
+
+    def _invoke_one(self, provider: _Provider, prompt, args, kwargs):
+        started = time.perf_counter()
+        try:
+            response = provider.llm.invoke(prompt, *args, **kwargs)
+        except Exception as e:
+            self._record(provider, started, e)
+            raise
+        self._record(provider, started)
+        return response
+
+    def _submit(self, provider: _Provider, prompt, args, kwargs) -> Future:
+        """
+        Runs one provider request on a daemon thread. The losing request of a hedge keeps
+        running until its provider answers, but never holds up interpreter exit.
+        """
+        future = Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(self._invoke_one(provider, prompt, args, kwargs))
+            except Exception as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name=f"llm-router-{provider.name}", daemon=True).start()
+        return future
+
+    async def _ainvoke_one(self, provider: _Provider, prompt, args, kwargs):
+        started = None
+        try:
+            # Wait for the provider's rate limits before the request is timed
+            if provider.request_bucket is not None:
+                await provider.request_bucket.acquire(1)
+            if provider.token_bucket is not None:
+                # Reserve the prompt plus the maximum completion length
+                await provider.token_bucket.acquire(estimate_tokens(str(prompt)) + provider.max_tokens)
+            started = time.perf_counter()
+            if hasattr(provider.llm, 'ainvoke'):
+                response = await provider.llm.ainvoke(prompt, *args, **kwargs)
+            else:
+                response = await asyncio.to_thread(provider.llm.invoke, prompt, *args, **kwargs)
+        except asyncio.CancelledError:
+            # Lost the race; neither a success nor a failure of the provider, but a trial is over
+            provider.breaker.release_trial()
+            raise
+        except Exception as e:
+            self._record(provider, started, e)
+            raise
+        self._record(provider, started)
+        return response
+
+    def invoke(self, prompt, *args, **kwargs):
+        """Invokes the preferred provider, hedging to the next one if it is slower than usual."""
+        backups = self._candidates()
+        futures, errors = {}, []
+        current = self._next_provider(backups)
+        if current is not None:
+            futures[self._submit(current, prompt, args, kwargs)] = current
+        while futures:
+            timeout = self.hedge_delay(current) if backups else None
+            done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # The request is slower than the provider's p95: race it against the next provider
+                backup = self._next_provider(backups)
+                if backup is not None:
+                    current = backup
+                    self.hedged += 1
+                    futures[self._submit(current, prompt, args, kwargs)] = current
+                continue
+            for future in done:
+                provider = futures.pop(future)
+                try:
+                    response = future.result()
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                provider.wins += 1
+                return response # A slower request still running finishes on its daemon thread
+            if not futures:
+                # Every request in flight failed: fail over to the next provider immediately
+                current = self._next_provider(backups)
+                if current is not None:
+                    futures[self._submit(current, prompt, args, kwargs)] = current
+        raise errors[-1] if errors else ProvidersUnavailable("No LLM provider accepted the request.")
+
+    async def ainvoke(self, prompt, *args, **kwargs):
+        """Async counterpart of invoke; the losing request of a hedge is cancelled."""
+        backups = self._candidates()
+        tasks, errors = {}, []
+        current = self._next_provider(backups)
+        if current is not None:
+            tasks[asyncio.ensure_future(self._ainvoke_one(current, prompt, args, kwargs))] = current
+        try:
+            while tasks:
+                timeout = self.hedge_delay(current) if backups else None
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    backup = self._next_provider(backups)
+                    if backup is not None:
+                        current = backup
+                        self.hedged += 1
+                        tasks[asyncio.ensure_future(self._ainvoke_one(current, prompt, args, kwargs))] = current
+                    continue
+                for task in done:
+                    provider = tasks.pop(task)
+                    if task.exception() is not None:
+                        errors.append(task.exception())
+                        continue
+                    provider.wins += 1
+                    return task.result()
+                if not tasks:
+                    current = self._next_provider(backups)
+                    if current is not None:
+                        tasks[asyncio.ensure_future(self._ainvoke_one(current, prompt, args, kwargs))] = current
+            raise errors[-1] if errors else ProvidersUnavailable("No LLM provider accepted the request.")
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stream(self, prompt, *args, **kwargs):
+        """Streams from the preferred provider, failing over if it errors before the first chunk."""
+        error = None
+        backups = self._candidates()
+        while backups:
+            provider = self._next_provider(backups)
+            if provider is None:
+                break
+            started = time.perf_counter()
+            chunks = provider.llm.stream(prompt, *args, **kwargs)
+            try:
+                first = next(chunks)
+            except StopIteration:
+                self._record(provider, started)
+                provider.wins += 1
+                return
+            except Exception as e:
+                self._record(provider, started, e)
+                error = e
+                continue
+            provider.wins += 1
+            try:
+                yield first
+                yield from chunks
+            except GeneratorExit:
+                # The caller stopped reading; neither a success nor a failure, but a trial is over
+                provider.breaker.release_trial()
+                raise
+            except Exception as e:
+                self._record(provider, started, e)
+                raise
+            self._record(provider, started)
+            return
+        raise error or ProvidersUnavailable("No LLM provider accepted the request.")
+
+    def stats(self) -> Dict:
+        """Per-provider calls, wins, failures, circuit state and p95 latency, plus the hedge count."""
+        return {
+            "hedged": self.hedged,
+            "providers": {
+                provider.name: {
+                    "calls": provider.calls,
+                    "wins": provider.wins,
+                    "failures": provider.failures,
+                    "circuit": provider.breaker.state,
+                    "p95_seconds": round(provider.p95(), 4) if provider.p95() is not None else None,
+                }
+                for provider in self.providers
+            },
+        }
@@ -0,0 +1,174 @@
+# utils/metrics.py
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+METRICS_FORMATS = ('jsonl', 'prometheus')
+# String attributes that become Prometheus labels; other strings appear only in JSON lines
+LABEL_ATTRIBUTES = ('engine', 'provider', 'mode')
+# Number of finished spans kept for the JSON lines export (aggregates are kept for all spans)
+MAX_RECORDED_SPANS = 10000
+
+class Span:
+    """
+    Times one pipeline stage and carries its attributes (bytes in/out, engine,
+    token counts, cache hits, ...). Use as a context manager; the span is recorded
+    when the block exits, with an 'error' attribute if it raised.
+    """
+    __slots__ = ('stage', 'attributes', 'recorder', 'started', 'seconds')
+
+    def __init__(self, stage: str, attributes: Dict, recorder: "MetricsRecorder"):
+        self.stage = stage
+        self.attributes = attributes
+        self.recorder = recorder
+        self.started = 0.0
+        self.seconds = 0.0
+
+    def set(self, **attributes):
+        """Sets (or overwrites) attributes of the span."""
+        self.attributes.update(attributes)
+
+    def add(self, name: str, amount: float = 1):
+        """Adds to a numeric attribute, starting from zero."""
+        self.attributes[name] = self.attributes.get(name, 0) + amount
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.seconds = time.perf_counter() - self.started
+        # A generator closed early by its consumer is not a failure of the stage
+        if exc_type is not None and exc_type is not GeneratorExit:
+            self.attributes['error'] = exc_type.__name__
+        self.recorder.record(self)
+        return False
+
+class _NoopSpan:
+    """
+    The span returned while metrics are disabled: every method does nothing.
+    It is falsy, so call sites can skip computing costly attributes with 'if span:'.
+    """
+    __slots__ = ()
+
+    def set(self, **attributes):
+        pass
+
+    def add(self, name: str, amount: float = 1):
+        pass
+
+    def __bool__(self):
+        return False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP_SPAN = _NoopSpan()
+
+class MetricsRecorder:
+    """
+    Collects finished spans. Keeps the most recent spans for JSON lines export and
+    running totals per stage (and label values) for the Prometheus text format.
+    """
+
+    def __init__(self, max_spans: int = MAX_RECORDED_SPANS):
+        self.spans = deque(maxlen=max_spans)
+        self.totals: Dict[Tuple, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, span: Span):
+        entry = {"stage": span.stage, "seconds": round(span.seconds, 6), "timestamp": round(time.time(), 3)}
+        entry.update(span.attributes)
+        labels = (span.stage,) + tuple(str(span.attributes.get(name, "")) for name in LABEL_ATTRIBUTES)
+        with self._lock:
+            self.spans.append(entry)
+            totals = self.totals.setdefault(labels, {"calls": 0, "seconds": 0.0, "errors": 0})
+            totals["calls"] += 1
+            totals["seconds"] += span.seconds
+            if 'error' in span.attributes:
+                totals["errors"] += 1
+            for name, value in span.attributes.items():
+                # Numbers are summed and flags counted when true
+                if isinstance(value, bool):
+                    totals[name] = totals.get(name, 0) + int(value)
+                elif isinstance(value, (int, float)):
+                    totals[name] = totals.get(name, 0) + value
+
+    def to_jsonl(self) -> str:
+        """Returns the recorded spans, one JSON object per line."""
+        with self._lock:
+            return "".join(json.dumps(entry) + "\n" for entry in self.spans)
+
+    def to_prometheus(self) -> str:
+        """Returns the running totals in the Prometheus text exposition format."""
+        with self._lock:
+            totals = {labels: dict(values) for labels, values in self.totals.items()}
+        metrics: Dict[str, list] = {}
+        for labels, values in sorted(totals.items()):
+            label_pairs = [("stage", labels[0])] + [
+                (name, value) for name, value in zip(LABEL_ATTRIBUTES, labels[1:]) if value
+            ]
+            label_text = ",".join(f'{name}="{_escape_label(value)}"' for name, value in label_pairs)
+            for name, value in values.items():
+                metrics.setdefault(f"resume_agent_stage_{name}_total", []).append(f"{{{label_text}}} {value:g}")
+        lines = []
+        for metric, samples in metrics.items():
+            lines.append(f"# TYPE {metric} counter")
+            lines.extend(metric + sample for sample in samples)
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str, metrics_format: str = None) -> str:
+        """
+        Writes the metrics to a file. The format is 'jsonl' or 'prometheus'; by default
+        it is inferred from the extension (.prom for Prometheus, anything else JSON lines).
+        """
+        metrics_format = metrics_format or ('prometheus' if path.endswith('.prom') else 'jsonl')
+        if metrics_format not in METRICS_FORMATS:
+            raise ValueError(f"Unknown metrics format '{metrics_format}'. Use one of: {', '.join(METRICS_FORMATS)}.")
+        content = self.to_prometheus() if metrics_format == 'prometheus' else self.to_jsonl()
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+def _escape_label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+# Enabled at import when RESUME_AGENT_METRICS names an output file, or later with enable_metrics()
+_recorder: Optional[MetricsRecorder] = MetricsRecorder() if os.getenv('RESUME_AGENT_METRICS') else None
+
+def enable_metrics() -> MetricsRecorder:
+    """Turns metrics collection on (if it is not already) and returns the recorder."""
+    global _recorder
+    if _recorder is None:
+        _recorder = MetricsRecorder()
+    return _recorder
+
+def get_recorder() -> Optional[MetricsRecorder]:
+    """Returns the active recorder, or None while metrics are disabled."""
+    return _recorder
+
+def span(stage: str, **attributes):
+    """
+    Returns a span timing the given stage. While metrics are disabled this is a shared
+    no-op object, so instrumented code pays only for this call.
+    """
+    if _recorder is None:
+        return _NOOP_SPAN
+    return Span(stage, attributes, _recorder)
+
+def write_metrics(path: str = None, metrics_format: str = None) -> Optional[str]:
+    """
+    Writes the collected metrics to 'path' (default: RESUME_AGENT_METRICS), in 'metrics_format'
+    (default: RESUME_AGENT_METRICS_FORMAT, or inferred from the extension).
+    Returns the path written, or None if metrics are disabled or no path is set.
+    """
+    path = path or os.getenv('RESUME_AGENT_METRICS')
+    if _recorder is None or not path:
+        return None
+    return _recorder.write(path, metrics_format or os.getenv('RESUME_AGENT_METRICS_FORMAT'))
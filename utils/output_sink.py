@@ -0,0 +1,183 @@
+# utils/output_sink.py
+import gzip
+import hashlib
+import json
+import os
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict
+
+from utils.file_manager import default_output_filename, save_output_to_file
+
+SINK_KINDS = ('files', 'jsonl')
+COMPRESSIONS = ('none', 'gzip', 'zstd')
+# Shards are committed and a new one started after this many records or uncompressed bytes
+SHARD_MAX_RECORDS = 10000
+SHARD_MAX_BYTES = 256 * 1024 * 1024
+# Encoded records are buffered in memory up to this size before being written to the shard
+WRITE_BUFFER_BYTES = 1024 * 1024
+
+# Optional zstd support
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+def text_sha256(text: str) -> str:
+    """Returns the SHA-256 hex digest of a text, used to identify the inputs of a result."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+class OutputSink(ABC):
+    """
+    Destination for optimization results. write() stores one result and returns where
+    it went; close() commits anything still pending. Sinks are thread-safe and can be
+    used as context managers. Subclasses must implement write().
+    """
+
+    @abstractmethod
+    def write(self, content: str, key: str = None, metadata: Dict = None) -> str:
+        """Stores one result under 'key' with its 'metadata' and returns where it went."""
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+class FileSink(OutputSink):
+    """
+    The single-file backend: every result is its own text file in 'directory',
+    named '<key><extension>', or timestamped (and never overwritten) when there is no key.
+    Metadata is not stored.
+    """
+
+    def __init__(self, directory: str = ".", extension: str = ".txt"):
+        self.directory = directory
+        self.extension = extension
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, content: str, key: str = None, metadata: Dict = None) -> str:
+        if key:
+            return save_output_to_file(content, os.path.join(self.directory, f"{key}{self.extension}"))
+        return save_output_to_file(content, os.path.join(self.directory, default_output_filename()))
+
+class JSONLShardSink(OutputSink):
+    """
+    Appends results as JSON lines (key, creation time, metadata such as input hashes,
+    and the content) to buffered, optionally gzip- or zstd-compressed shards.
+    A shard is written under a hidden '.part' name and renamed to its final name
+    '<prefix>-<timestamp>-<sink id>-<sequence>.jsonl[.gz|.zst]' once it is complete:
+    when it reaches 'max_records' or 'max_bytes', or on close(). Readers never see
+    a partial shard.
+    """
+
+    def __init__(self, directory: str, prefix: str = "results", compression: str = "none",
+                 max_records: int = SHARD_MAX_RECORDS, max_bytes: int = SHARD_MAX_BYTES,
+                 buffer_bytes: int = WRITE_BUFFER_BYTES):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression '{compression}'. Use one of: {', '.join(COMPRESSIONS)}.")
+        if compression == 'zstd' and not ZSTD_AVAILABLE:
+            raise ValueError("zstd compression needs the 'zstandard' package. Install with: pip install zstandard")
+        self.directory = directory
+        self.prefix = prefix
+        self.compression = compression
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.buffer_bytes = buffer_bytes
+        self.committed = [] # Final paths of the shards written so far
+        self._sequence = 0
+        self._sink_id = uuid.uuid4().hex[:8] # Keeps shard names unique across processes and sinks
+        self._lock = threading.Lock()
+        self._shard = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _extension(self) -> str:
+        return {'none': '.jsonl', 'gzip': '.jsonl.gz', 'zstd': '.jsonl.zst'}[self.compression]
+
+    def _open_shard(self):
+        """Starts a new shard under a hidden temporary name."""
+        self._sequence += 1
+        timestamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        final_name = f"{self.prefix}-{timestamp}-{self._sink_id}-{self._sequence:05d}{self._extension()}"
+        part_path = os.path.join(self.directory, f".{final_name}.part")
+        raw = open(part_path, 'xb')
+        if self.compression == 'gzip':
+            stream = gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6)
+        elif self.compression == 'zstd':
+            stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+        else:
+            stream = raw
+        self._shard = {
+            "final_path": os.path.join(self.directory, final_name), "part_path": part_path,
+            "raw": raw, "stream": stream, "buffer": [], "buffered": 0, "records": 0, "bytes": 0,
+        }
+
+    @staticmethod
+    def _flush_buffer(shard: Dict):
+        if shard["buffer"]:
+            shard["stream"].write(b"".join(shard["buffer"]))
+            shard["buffer"] = []
+            shard["buffered"] = 0
+
+    def _commit_shard(self):
+        """Writes out the buffer, finishes compression, syncs and renames the shard into place."""
+        shard, self._shard = self._shard, None
+        if shard is None:
+            return
+        self._flush_buffer(shard)
+        if shard["stream"] is not shard["raw"]:
+            shard["stream"].close() # Writes the compression trailer; the raw file stays open
+        shard["raw"].flush()
+        os.fsync(shard["raw"].fileno())
+        shard["raw"].close()
+        if shard["records"]:
+            os.replace(shard["part_path"], shard["final_path"])
+            self.committed.append(shard["final_path"])
+        else:
+            os.remove(shard["part_path"])
+
+    def write(self, content: str, key: str = None, metadata: Dict = None) -> str:
+        """Appends one result and returns its location as '<final shard path>#<line number>'."""
+        record = {"key": key, "created": datetime.now().isoformat(timespec="milliseconds")}
+        record.update(metadata or {})
+        record["content"] = content
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+
+        with self._lock:
+            if self._shard is None:
+                self._open_shard()
+            shard = self._shard
+            shard["buffer"].append(line)
+            shard["buffered"] += len(line)
+            shard["records"] += 1
+            shard["bytes"] += len(line)
+            location = f"{shard['final_path']}#{shard['records']}"
+            if shard["buffered"] >= self.buffer_bytes:
+                self._flush_buffer(shard)
+            if shard["records"] >= self.max_records or shard["bytes"] >= self.max_bytes:
+                self._commit_shard()
+        return location
+
+    def close(self):
+        """Commits the current shard, if it holds any records."""
+        with self._lock:
+            self._commit_shard()
+
+def create_sink(kind: str, directory: str, compression: str = "none",
+                max_records: int = SHARD_MAX_RECORDS, extension: str = ".txt") -> OutputSink:
+    """
+    Creates an output sink: 'files' (one file per result, named with 'extension')
+    or 'jsonl' (compressed JSONL shards).
+    """
+    if kind == 'files':
+        return FileSink(directory, extension)
+    if kind == 'jsonl':
+        return JSONLShardSink(directory, compression=compression, max_records=max_records)
+    raise ValueError(f"Unknown output sink '{kind}'. Use one of: {', '.join(SINK_KINDS)}.")
@@ -0,0 +1,65 @@
+# utils/pdf_cache.py
+import hashlib
+import os
+from typing import Optional, Tuple
+
+from utils.cache_store import LRUCacheStore, get_cache_dir, hash_file
+
+# Extraction engines in order of preference, matching ResumeInputHandler.extract_text_from_pdf
+PDF_ENGINES = ('pymupdf', 'pdfplumber', 'pypdf2')
+
+_cache = None
+_cache_pid = None
+
+class PDFTextCache:
+    """
+    Persistent cache of extracted PDF text, keyed by the PDF's content hash and
+    the extraction engine. Renamed or copied files still hit the cache; edited files miss it.
+    """
+
+    def __init__(self, db_path: str = None, max_bytes: int = None):
+        if db_path is None:
+            db_path = os.path.join(get_cache_dir(), 'pdf_text.sqlite3')
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv('RESUME_AGENT_PDF_CACHE_MB', '256')) * 1024 * 1024)
+        self.store = LRUCacheStore(db_path, max_bytes)
+
+    @staticmethod
+    def content_hash(pdf_path: str) -> str:
+        """Returns the content hash used to key a PDF file."""
+        return hash_file(pdf_path)
+
+    @staticmethod
+    def bytes_hash(pdf_data) -> str:
+        """Returns the content hash of a PDF held in memory (equal to content_hash of the same file)."""
+        return hashlib.sha256(pdf_data).hexdigest()
+
+    def get(self, content_hash: str) -> Optional[Tuple[str, str]]:
+        """Returns (engine, text) for the most preferred engine cached for this PDF, or None."""
+        for engine in PDF_ENGINES:
+            text = self.store.get(f"{content_hash}:{engine}")
+            if text is not None:
+                return engine, text
+        return None
+
+    def put(self, content_hash: str, engine: str, text: str):
+        """Stores the text extracted from a PDF by the given engine."""
+        self.store.put(f"{content_hash}:{engine}", text)
+
+def get_pdf_cache() -> Optional[PDFTextCache]:
+    """
+    Returns the shared PDF text cache, or None when disabled with RESUME_AGENT_PDF_CACHE=0
+    or when it cannot be opened. A separate instance is opened in each process, since
+    SQLite connections cannot cross a fork.
+    """
+    global _cache, _cache_pid
+    if os.getenv('RESUME_AGENT_PDF_CACHE', '1') == '0':
+        return None
+    if _cache is None or _cache_pid != os.getpid():
+        try:
+            _cache = PDFTextCache()
+        except Exception as e:
+            print(f"⚠️ PDF text cache unavailable: {e}")
+            return None
+        _cache_pid = os.getpid()
+    return _cache
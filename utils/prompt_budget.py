@@ -0,0 +1,170 @@
+# utils/prompt_budget.py
+import os
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from utils.skill_matcher import DEFAULT_MATCHER
+
+# Maximum input tokens for the optimization prompt (RESUME_AGENT_PROMPT_BUDGET, 0 = no limit)
+DEFAULT_PROMPT_BUDGET = 3000
+# The job description is never cut below this many tokens to fit the budget
+MIN_JOB_DESCRIPTION_TOKENS = 200
+
+# Sentences that carry no information for tailoring a resume: EEO statements,
+# benefits and perks, company boilerplate and application instructions. Each pattern
+# is a whole boilerplate phrase, so words like 'discriminative' or 'dental imaging'
+# in a requirement do not match, and a sentence that states a requirement or names
+# a skill is never dropped (see _is_boilerplate)
+_BOILERPLATE_PATTERN = re.compile(
+    r'equal (?:employment )?opportunity(?: employer)?|\beeo\b|affirmative action|without regard to'
+    r'|(?:do|does|will) not discriminate|(?:don\'t|doesn\'t) discriminate|race,? (?:color|religion)'
+    r'|sexual orientation|gender identity|veteran status|protected (?:veteran|class)|disability status'
+    r'|reasonable accommodations?|e-verify|(?:subject to|pass(?:ing)?) (?:a )?background checks?|drug[- ]free workplace'
+    r'|\bbenefits? (?:include|package)|401\(?k\)?|(?:medical|health),? dental|dental (?:insurance|coverage|plans?)'
+    r'|paid time off|\bpto\b|parental leave|stock options|wellness (?:programs?|stipends?|benefits?)'
+    r'|commuter benefits|free (?:lunch|snacks)|perks (?:include|such as)|(?:great|our) perks|learning stipend'
+    r'|privacy (?:policy|notice)|apply (?:now|today|online)|click (?:here|apply)|to apply,|recruitment agencies'
+    r'|^(?:about (?:us|the company)|who we are)\b|our (?:mission|values|culture) (?:is|are)',
+    re.IGNORECASE,
+)
+# Sentences that state what the role needs are kept first when the budget is tight
+_REQUIREMENT_PATTERN = re.compile(
+    r'\b(?:require[ds]?|requirements?|must|should|need(?:ed|s)?|experience|years?|proficien\w*|expert\w*'
+    r'|knowledge|familiar\w*|ability to|skills?|qualifications?|responsib\w*|you will|you\'ll|degree'
+    r'|bachelor\w*|master\w*|certifi\w*|preferred|plus|strong)\b',
+    re.IGNORECASE,
+)
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?;])\s+(?=\S)')
+_BULLET_START = re.compile(r'\s*(?:[•\-\*▪●◦‣–·]|\d{1,2}[.)])\s+')
+_NORMALIZE = re.compile(r'[^a-z0-9+#]+')
+
+@lru_cache(maxsize=1)
+def _openai_encoding():
+    """Returns the tiktoken encoding for the OpenAI model, or None if tiktoken is not installed."""
+    try:
+        import tiktoken
+        from utils.llm_config import OPENAI_MODEL
+        try:
+            return tiktoken.encoding_for_model(OPENAI_MODEL)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimates a text's token count (about four characters per token)."""
+    return len(text) // 4 + 1
+
+def count_tokens(text: str, provider: Optional[str] = None) -> int:
+    """
+    Counts the tokens of a text for the given provider. OpenAI prompts are counted
+    exactly with tiktoken when it is installed; otherwise (and for Gemini) the
+    four-characters-per-token estimate is used.
+    """
+    if provider == "openai":
+        encoding = _openai_encoding()
+        if encoding is not None:
+            return len(encoding.encode(text, disallowed_special=()))
+    return estimate_tokens(text)
+
+def truncate_to_tokens(text: str, max_tokens: int, provider: Optional[str] = None) -> str:
+    """
+    Returns the start of a text that fits in 'max_tokens' (0 = no limit), cut at a word
+    boundary when possible. Counted like count_tokens for the provider.
+    """
+    text = text.strip()
+    if not max_tokens or count_tokens(text, provider) <= max_tokens:
+        return text
+    if provider == "openai":
+        encoding = _openai_encoding()
+        if encoding is not None:
+            return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens]).rstrip()
+    cut = text[:max(0, (max_tokens - 1) * 4)]
+    boundary = max(cut.rfind(' '), cut.rfind('\n'))
+    return (cut[:boundary] if boundary > 0 else cut).rstrip()
+
+def prompt_budget() -> int:
+    """Returns the configured input token budget for optimization prompts (0 = no limit)."""
+    return int(os.getenv('RESUME_AGENT_PROMPT_BUDGET', str(DEFAULT_PROMPT_BUDGET)))
+
+def compaction_enabled() -> bool:
+    """Prompt compaction can be turned off with RESUME_AGENT_PROMPT_COMPACTION=0."""
+    return os.getenv('RESUME_AGENT_PROMPT_COMPACTION', '1') != '0'
+
+def compact_resume_text(text: str) -> str:
+    """Strips trailing whitespace and collapses runs of blank lines; the content is unchanged."""
+    lines = [line.rstrip() for line in text.strip().splitlines()]
+    compacted, blank = [], False
+    for line in lines:
+        if not line:
+            if not blank:
+                compacted.append(line)
+            blank = True
+        else:
+            compacted.append(line)
+            blank = False
+    return "\n".join(compacted)
+
+def _job_description_units(job_description: str) -> List[Tuple[int, str]]:
+    """Splits a job description into (line number, sentence) units, dropping exact duplicates."""
+    units, seen = [], set()
+    for line_number, line in enumerate(job_description.splitlines()):
+        for sentence in _SENTENCE_SPLIT.split(line.strip()):
+            key = _NORMALIZE.sub(' ', _BULLET_START.sub('', sentence).lower()).strip()
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            units.append((line_number, sentence))
+    return units
+
+def _unit_priority(index: int, sentence: str) -> float:
+    """
+    Scores a sentence for the budget: requirements and skill mentions (by their taxonomy
+    weight) first, the title line always.
+    """
+    if index == 0:
+        return float('inf') # The first line is usually the job title
+    skills = DEFAULT_MATCHER.find_keywords(sentence)
+    score = 2.0 * len(_REQUIREMENT_PATTERN.findall(sentence)) + 3.0 * sum(DEFAULT_MATCHER.weight(skill) for skill in skills)
+    if _BULLET_START.match(sentence):
+        score += 1.0
+    return score
+
+def _is_boilerplate(sentence: str) -> bool:
+    """True for a boilerplate sentence that states no requirement and names no skill."""
+    return (_BOILERPLATE_PATTERN.search(sentence) is not None and not _REQUIREMENT_PATTERN.search(sentence)
+            and not DEFAULT_MATCHER.find_keywords(sentence))
+
+@lru_cache(maxsize=128)
+def compact_job_description(job_description: str, max_tokens: int = 0, provider: Optional[str] = None) -> str:
+    """
+    Removes duplicated sentences and boilerplate (EEO statements, benefits, company
+    blurbs, application instructions) from a job description. If the result is still
+    over 'max_tokens' (0 = no limit), the highest-priority sentences are kept, favouring
+    requirement sentences and skill mentions, in their original order.
+    Results are memoized, since batch runs pair one job description with many resumes.
+    """
+    units = [(line, sentence) for line, sentence in _job_description_units(job_description)
+             if not _is_boilerplate(sentence)]
+
+    if max_tokens and units:
+        costs = [count_tokens(sentence, provider) + 1 for _, sentence in units]
+        if sum(costs) > max_tokens:
+            ranked = sorted(range(len(units)), key=lambda i: (-_unit_priority(i, units[i][1]), i))
+            selected, used = set(), 0
+            for i in ranked:
+                if used + costs[i] <= max_tokens:
+                    selected.add(i)
+                    used += costs[i]
+            units = [unit for i, unit in enumerate(units) if i in selected]
+
+    # Rebuild the text: sentences from the same source line stay on one line
+    lines, current_line = [], None
+    for line_number, sentence in units:
+        if line_number == current_line:
+            lines[-1] += " " + sentence
+        else:
+            lines.append(sentence)
+            current_line = line_number
+    return "\n".join(lines)
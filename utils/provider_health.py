@@ -0,0 +1,104 @@
+# utils/provider_health.py
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+from utils.cache_store import get_cache_dir
+
+_lock = threading.Lock()
+
+def _state_path() -> str:
+    """Returns the path of the file holding recent provider health results."""
+    return os.path.join(get_cache_dir(), 'provider_health.json')
+
+def _health_ttl() -> float:
+    """Seconds a recorded health result stays valid (RESUME_AGENT_HEALTH_TTL, default 5 minutes)."""
+    return float(os.getenv('RESUME_AGENT_HEALTH_TTL', '300'))
+
+def _load_state() -> dict:
+    try:
+        with open(_state_path(), 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+def get_provider_health(provider: str) -> Optional[bool]:
+    """
+    Returns True/False if the provider's health was recorded within the TTL,
+    or None when it is unknown or the last result has expired.
+    """
+    entry = _load_state().get(provider)
+    if not entry or time.time() - entry.get("checked", 0) > _health_ttl():
+        return None
+    return entry.get("healthy")
+
+def record_provider_health(provider: str, healthy: bool, error: str = None):
+    """
+    Records the outcome of a real request to a provider. The state file is only
+    rewritten when the status changes or the previous result is about to expire.
+    """
+    with _lock:
+        state = _load_state()
+        entry = state.get(provider)
+        now = time.time()
+        if entry and entry.get("healthy") == healthy and now - entry.get("checked", 0) < _health_ttl() / 2:
+            return
+        state[provider] = {"healthy": healthy, "checked": now, "error": error}
+        try:
+            # Write then rename, so concurrent readers never see a partial file
+            temp_path = f"{_state_path()}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(state, file)
+            os.replace(temp_path, _state_path())
+        except OSError as e:
+            print(f"Could not record provider health: {e}")
+
+class HealthTrackedLLM:
+    """
+    Wraps a chat model and records the provider's health from real requests:
+    a successful call marks it healthy, a failed call marks it unhealthy so the
+    next run skips it until the health TTL expires. Rate-limit errors are not
+    counted as failures, since they are retried.
+    Any attribute not defined here is forwarded to the wrapped model.
+    """
+
+    def __init__(self, llm, provider: str):
+        self.wrapped = llm
+        self.provider = provider
+
+    def _record_failure(self, error: Exception):
+        from utils.async_llm import is_rate_limit_error
+        if not is_rate_limit_error(error):
+            record_provider_health(self.provider, False, str(error))
+
+    def invoke(self, prompt, *args, **kwargs):
+        try:
+            response = self.wrapped.invoke(prompt, *args, **kwargs)
+        except Exception as e:
+            self._record_failure(e)
+            raise
+        record_provider_health(self.provider, True)
+        return response
+
+    def stream(self, prompt, *args, **kwargs):
+        try:
+            yield from self.wrapped.stream(prompt, *args, **kwargs)
+        except Exception as e:
+            self._record_failure(e)
+            raise
+        record_provider_health(self.provider, True)
+
+    async def ainvoke(self, prompt, *args, **kwargs):
+        try:
+            response = await self.wrapped.ainvoke(prompt, *args, **kwargs)
+        except Exception as e:
+            self._record_failure(e)
+            raise
+        record_provider_health(self.provider, True)
+        return response
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the wrapper itself
+        return getattr(self.wrapped, name)
@@ -0,0 +1,207 @@
+# utils/results.py
+import json
+import time
+from typing import Dict, List, Optional
+
+# Optional msgpack support for compact binary serialization
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+# Formats a result can be rendered in for output files and sinks, with their file extensions
+RESULT_EXTENSIONS = {'text': '.txt', 'markdown': '.md', 'json': '.json'}
+RESULT_FORMATS = tuple(RESULT_EXTENSIONS)
+
+# Placeholder experience used when the resume has no recognizable experience section
+_EXPERIENCE_TEMPLATE = '''
+Software Developer | Tech Solutions Inc. | 20XX - Present
+• Developed and maintained full-stack web applications, improving user engagement by X%.
+• Implemented robust backend APIs, supporting high-traffic user interactions.
+• Collaborated with cross-functional teams to define, design, and ship new features.
+• Participated in code reviews, ensuring high code quality and adherence to best practices.
+'''
+_EDUCATION_TEMPLATE = 'B.S. in Computer Science | University Name | 20XX'
+_UPPERCASE_SKILLS = ('SQL', 'AWS', 'GCP')
+
+def dumps_msgpack(data) -> bytes:
+    """Serializes plain data (dicts, lists, strings, numbers) with msgpack."""
+    if not MSGPACK_AVAILABLE:
+        raise ValueError("msgpack serialization needs the 'msgpack' package. Install with: pip install msgpack")
+    return msgpack.packb(data, use_bin_type=True)
+
+def _join_titled(skills: List[str]) -> str:
+    return ', '.join(skill.title() for skill in skills)
+
+class ResumeAnalysis:
+    """
+    The structured outcome of the rule-based optimization: contact fields, the skills
+    found by category, the skills that also appear in the job description, the
+    experience and education sections and how long each step took.
+    Nothing is formatted up front. The ATS resume is rendered the first time
+    'optimized_resume' is read, and the full report only by render_text() or
+    render_markdown(); to_dict() and to_json() give the fields to services directly.
+    """
+    __slots__ = ('name', 'email', 'phone', 'skills', 'job_keywords', 'sections', 'timings', '_optimized_resume')
+
+    def __init__(self, name: str, email: str, phone: str, skills: Dict[str, List[str]],
+                 job_keywords: List[str], sections: Dict[str, str], timings: Dict[str, float] = None):
+        self.name = name
+        self.email = email
+        self.phone = phone
+        self.skills = skills
+        self.job_keywords = job_keywords # Technical and domain skills also found in the job description
+        self.sections = sections # Body text of the sections found, by canonical name
+        self.timings = timings if timings is not None else {} # Seconds spent per step
+        self._optimized_resume = None
+
+    @property
+    def contact_line(self) -> str:
+        contact_info = []
+        if self.email:
+            contact_info.append(f"Email: {self.email}")
+        if self.phone:
+            contact_info.append(f"Phone: {self.phone}")
+        return ', '.join(contact_info)
+
+    @property
+    def competencies(self) -> List[str]:
+        """Soft and domain skills, as listed under core competencies."""
+        return (self.skills['soft'] + self.skills['domain'])[:8]
+
+    @property
+    def optimized_resume(self) -> str:
+        """The ATS-friendly resume, rendered on first access."""
+        if self._optimized_resume is None:
+            started = time.perf_counter()
+            self._optimized_resume = self._render_resume()
+            self.timings["render_resume"] = round(time.perf_counter() - started, 6)
+        return self._optimized_resume
+
+    def _render_resume(self) -> str:
+        technical, domain = self.skills['technical'], self.skills['domain']
+        competencies = self.competencies
+        databases = ', '.join(skill.upper() if skill.upper() in _UPPERCASE_SKILLS else skill.title()
+                              for skill in technical[12:18])
+        resume = f"""
+{self.name or "Your Name"}
+{self.contact_line}
+
+PROFESSIONAL SUMMARY
+Experienced professional with a strong background in software development and project delivery.
+Adept at leveraging modern technologies to build scalable and efficient solutions.
+{f"Key skills aligned with target role: {', '.join(self.job_keywords[:5])}" if self.job_keywords else "Committed to continuous learning and achieving impactful results."}
+
+TECHNICAL SKILLS
+• Programming Languages: {_join_titled(technical[:6]) if technical else 'Not specified'}
+• Frameworks & Tools: {_join_titled(technical[6:12]) if len(technical) > 6 else 'Not specified'}
+• Databases & Cloud: {databases if len(technical) > 12 else 'Not specified'}
+• Development Practices: {_join_titled(domain[:6]) if domain else 'Not specified'}
+
+PROFESSIONAL EXPERIENCE
+{self.sections.get('experience') or _EXPERIENCE_TEMPLATE}
+
+EDUCATION
+{self.sections.get('education') or _EDUCATION_TEMPLATE}
+
+CORE COMPETENCIES
+• {_join_titled(competencies) if competencies else 'Problem Solving • Adaptability • Teamwork • Innovation'}
+
+=== ATS OPTIMIZATION FEATURES ===
+✓ Standard section headers for ATS parsing
+✓ Keyword optimization based on job requirements
+✓ Quantified achievements and metrics (where provided or templated)
+✓ Clean, professional formatting
+✓ Relevant technical skills prominently displayed
+✓ Action-oriented bullet points
+        """
+        return resume.strip()
+
+    def render_text(self) -> str:
+        """Renders the full plain-text report: skill analysis, ATS resume, job matching and recommendations."""
+        skills, job_keywords = self.skills, self.job_keywords
+        return f"""
+--- SKILL ANALYSIS ---
+Technical Skills: {', '.join(skills['technical']) if skills['technical'] else 'None found'}
+Soft Skills: {', '.join(skills['soft']) if skills['soft'] else 'None found'}
+Domain Skills: {', '.join(skills['domain']) if skills['domain'] else 'None found'}
+
+--- ATS-OPTIMIZED RESUME ---
+{self.optimized_resume}
+
+--- JOB MATCHING ANALYSIS ---
+Job Keywords Found in Resume: {len(job_keywords)} matches detected
+Matched Skills: {', '.join(job_keywords) if job_keywords else 'No direct skill matches found based on current keywords.'}
+
+--- OPTIMIZATION RECOMMENDATIONS ---
+✓ Structured with ATS-friendly formatting
+✓ Incorporated relevant keywords from job description
+✓ Quantified achievements where possible (ensure your original resume has these)
+✓ Used action verbs and professional language
+✓ Optimized for keyword scanning systems
+✓ Clear section headers for ATS parsing
+    """
+
+    def render_markdown(self) -> str:
+        """Renders the full report as Markdown, with the ATS resume in a fenced text block."""
+        skills, job_keywords = self.skills, self.job_keywords
+        lines = ["## Skill Analysis"]
+        for label, category in (("Technical", 'technical'), ("Soft", 'soft'), ("Domain", 'domain')):
+            lines.append(f"- **{label} skills:** {', '.join(skills[category]) if skills[category] else 'None found'}")
+        lines += ["", "## ATS-Optimized Resume", "", "```text", self.optimized_resume, "```", "",
+                  "## Job Matching Analysis",
+                  f"- **Job keywords found in resume:** {len(job_keywords)}",
+                  f"- **Matched skills:** {', '.join(job_keywords) if job_keywords else 'None'}"]
+        return "\n".join(lines) + "\n"
+
+    def render(self, result_format: str = "text") -> str:
+        """Renders the result in one of RESULT_FORMATS."""
+        if result_format == 'text':
+            return self.render_text()
+        if result_format == 'markdown':
+            return self.render_markdown()
+        if result_format == 'json':
+            return self.to_json()
+        raise ValueError(f"Unknown result format '{result_format}'. Use one of: {', '.join(RESULT_FORMATS)}.")
+
+    def to_dict(self, include_resume: bool = True) -> Dict:
+        """
+        Returns the fields as plain data. The rendered ATS resume is included unless
+        'include_resume' is False, in which case nothing is rendered.
+        """
+        data = {
+            "name": self.name, "email": self.email, "phone": self.phone, "skills": self.skills,
+            "job_keywords": self.job_keywords, "sections": self.sections,
+        }
+        if include_resume:
+            data["optimized_resume"] = self.optimized_resume
+        data["timings"] = dict(self.timings)
+        return data
+
+    def to_json(self, include_resume: bool = True) -> str:
+        return json.dumps(self.to_dict(include_resume), ensure_ascii=False)
+
+    def to_msgpack(self, include_resume: bool = True) -> bytes:
+        return dumps_msgpack(self.to_dict(include_resume))
+
+def render_content(content: str, result_format: str = "text", analysis: Optional[ResumeAnalysis] = None,
+                   metadata: Dict = None) -> str:
+    """
+    Renders one optimization result for an output file or sink: the rule-based 'analysis'
+    in the requested format, or else the (LLM) text 'content' as it is.
+    'json' has one schema for both: 'mode' (from 'metadata', else 'fallback' or 'llm'),
+    the other 'metadata' fields, 'optimized_resume', and 'analysis' (the structured fields
+    without the resume, or null when the LLM wrote the result).
+    """
+    if result_format == 'json':
+        data = {"mode": "fallback" if analysis is not None else "llm"}
+        data.update(metadata or {})
+        data["optimized_resume"] = analysis.optimized_resume if analysis is not None else content
+        data["analysis"] = analysis.to_dict(include_resume=False) if analysis is not None else None
+        return json.dumps(data, ensure_ascii=False)
+    if analysis is not None:
+        return analysis.render(result_format)
+    if result_format not in RESULT_FORMATS:
+        raise ValueError(f"Unknown result format '{result_format}'. Use one of: {', '.join(RESULT_FORMATS)}.")
+    return content
@@ -0,0 +1,160 @@
+# utils/resume_parser.py
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from utils.semantic_matcher import match_skills
+
+# Canonical section names and the headers that introduce them
+SECTION_HEADERS = {
+    "summary": ["summary", "professional summary", "career summary", "profile", "professional profile",
+                "objective", "career objective", "about me", "about"],
+    "experience": ["experience", "professional experience", "work experience", "employment history",
+                   "work history", "career history", "relevant experience", "employment"],
+    "education": ["education", "academic background", "education and training", "academic qualifications"],
+    "skills": ["skills", "technical skills", "key skills", "core skills", "core competencies",
+               "competencies", "technologies", "tools and technologies", "skills and abilities"],
+    "projects": ["projects", "personal projects", "key projects", "academic projects"],
+    "certifications": ["certifications", "certificates", "licenses and certifications", "licenses"],
+    "awards": ["awards", "honors", "honors and awards", "achievements", "accomplishments"],
+    "publications": ["publications", "research"],
+    "volunteer": ["volunteer", "volunteering", "volunteer experience", "community involvement"],
+    "languages": ["languages"],
+    "interests": ["interests", "hobbies", "hobbies and interests"],
+}
+
+_HEADER_NAMES = {alias: name for name, aliases in SECTION_HEADERS.items() for alias in aliases}
+# A header is a known title at the start of a line (optionally with a leading '#' or a trailing ':'),
+# either alone on its line or followed by a colon and inline content ("Skills: Python, SQL")
+_HEADER_PATTERN = re.compile(
+    r'[ \t]*(?:#+[ \t]*)?(' + '|'.join(sorted((re.escape(a) for a in _HEADER_NAMES), key=len, reverse=True)) +
+    r')[ \t]*(?::[ \t]*|(?=\r?$))',
+    re.IGNORECASE,
+)
+_BULLET_PATTERN = re.compile(r'[ \t]*(?:[•\-\*▪●◦‣–·]|\d{1,2}[.)])[ \t]+')
+_EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_PHONE_PATTERN = re.compile(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+_LINK_PATTERN = re.compile(r'\b(?:https?://|www\.|linkedin\.com/|github\.com/)\S+', re.IGNORECASE)
+
+Span = Tuple[int, int]
+
+class Section:
+    """A resume section: its canonical name and offsets of the header, body and bullet items."""
+    __slots__ = ('name', 'header', 'start', 'end', 'bullets')
+
+    def __init__(self, name: str, header: Span, start: int):
+        self.name = name
+        self.header = header
+        self.start = start
+        self.end = start
+        self.bullets: List[Span] = []
+
+class Resume:
+    """
+    The result of parsing resume text once. It keeps a reference to the original text
+    and stores only offsets into it; text is sliced out when a field is read.
+    Skills are extracted on first access and then kept.
+    """
+    __slots__ = ('text', 'name_span', 'email_span', 'phone_span', 'links', 'sections', '_skills')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.name_span: Optional[Span] = None
+        self.email_span: Optional[Span] = None
+        self.phone_span: Optional[Span] = None
+        self.links: List[Span] = []
+        self.sections: List[Section] = []
+        self._skills = None
+
+    def _slice(self, span: Optional[Span]) -> str:
+        return self.text[span[0]:span[1]] if span else ""
+
+    @property
+    def name(self) -> str:
+        return self._slice(self.name_span)
+
+    @property
+    def email(self) -> str:
+        return self._slice(self.email_span)
+
+    @property
+    def phone(self) -> str:
+        return self._slice(self.phone_span)
+
+    @property
+    def skills(self) -> Dict[str, List[str]]:
+        """Taxonomy skills found in the resume (see SimpleFallback.extract_skills_simple)."""
+        if self._skills is None:
+            self._skills = match_skills(self.text)
+        return self._skills
+
+    def section(self, name: str) -> Optional[Section]:
+        """Returns the first section with the given canonical name, or None."""
+        for section in self.sections:
+            if section.name == name:
+                return section
+        return None
+
+    def section_text(self, name: str) -> str:
+        """Returns the body text of the first section with the given canonical name ('' if absent)."""
+        section = self.section(name)
+        return self.text[section.start:section.end].strip() if section else ""
+
+    def bullets(self, name: str) -> List[str]:
+        """Returns the bullet items of the first section with the given canonical name."""
+        section = self.section(name)
+        return [self.text[start:end] for start, end in section.bullets] if section else []
+
+def _parse(text: str) -> Resume:
+    """Scans the text line by line exactly once, recording headers, contact fields and bullets."""
+    resume = Resume(text)
+    current = None
+    position, length = 0, len(text)
+    while position < length:
+        line_end = text.find('\n', position)
+        if line_end == -1:
+            line_end = length
+        next_position = line_end + 1
+
+        header = _HEADER_PATTERN.match(text, position, line_end)
+        if header:
+            if current is not None:
+                current.end = position
+            current = Section(_HEADER_NAMES[header.group(1).lower()], header.span(1), header.end())
+            resume.sections.append(current)
+            position = next_position
+            continue
+
+        if resume.email_span is None:
+            email = _EMAIL_PATTERN.search(text, position, line_end)
+            if email:
+                resume.email_span = email.span()
+        if resume.phone_span is None:
+            phone = _PHONE_PATTERN.search(text, position, line_end)
+            if phone:
+                resume.phone_span = phone.span()
+        for link in _LINK_PATTERN.finditer(text, position, line_end):
+            resume.links.append(link.span())
+
+        if resume.name_span is None and current is None and text[position:line_end].strip():
+            # The first non-empty line before any section is taken as the name
+            stripped_start = position + len(text[position:line_end]) - len(text[position:line_end].lstrip())
+            resume.name_span = (stripped_start, position + len(text[position:line_end].rstrip()))
+
+        if current is not None:
+            bullet = _BULLET_PATTERN.match(text, position, line_end)
+            if bullet:
+                current.bullets.append((bullet.end(), position + len(text[position:line_end].rstrip())))
+        position = next_position
+
+    if current is not None:
+        current.end = length
+    return resume
+
+@lru_cache(maxsize=64)
+def parse_resume(text: str) -> Resume:
+    """
+    Parses resume text into a Resume record. Results are memoized, so the skill
+    extraction, templating and prompt building for one run all share a single parse.
+    """
+    return _parse(text)
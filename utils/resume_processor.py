@@ -1,6 +1,15 @@
 # utils/resume_processor.py
-from typing import Dict, List
-import re
+import time
+from typing import Dict, Iterator, List
+
+from utils.metrics import span
+from utils.prompt_budget import (
+    MIN_JOB_DESCRIPTION_TOKENS, compact_job_description, compact_resume_text, compaction_enabled,
+    count_tokens, estimate_tokens, prompt_budget, truncate_to_tokens
+)
+from utils.resume_parser import parse_resume
+from utils.results import ResumeAnalysis
+from utils.semantic_matcher import find_skills
 
 class SimpleFallback:
     """
@@ -11,201 +20,193 @@ class SimpleFallback:
     @staticmethod
     def extract_skills_simple(resume_text: str) -> Dict[str, List[str]]:
         """
-        Extracts skills from the resume text based on predefined keyword lists.
+        Extracts skills from the resume text based on the predefined keyword taxonomy.
         Categorizes skills into 'technical', 'soft', and 'domain'.
+        Skills described in other words ('container orchestration') are found too when
+        semantic matching is available (see utils/semantic_matcher.py).
+        The returned dict is shared by all callers for the same text; do not modify it.
         """
-        # Define lists of common keywords for different skill categories
-        technical_keywords = [
-            'python', 'javascript', 'java', 'c++', 'react', 'node.js', 'sql', 'aws',
-            'docker', 'kubernetes', 'git', 'html', 'css', 'typescript', 'express',
-            'postgresql', 'mongodb', 'redis', 'linux', 'bash', 'jenkins', 'github',
-            'vue', 'angular', 'flask', 'django', 'spring', 'mysql', 'oracle',
-            'azure', 'gcp', 'terraform', 'ansible', 'jest', 'cypress', 'junit',
-            'rest', 'api', 'graphql', 'microservices', 'devops', 'ci/cd', 'machine learning',
-            'data analysis', 'deep learning', 'nlp', 'pytorch', 'tensorflow', 'scikit-learn',
-            'pandas', 'numpy', 'spark', 'hadoop', 'tableau', 'power bi', 'excel', 'gcp'
-        ]
-
-        soft_keywords = [
-            'leadership', 'communication', 'teamwork', 'problem-solving', 'analytical',
-            'creative', 'adaptable', 'collaborative', 'detail-oriented', 'organized',
-            'mentoring', 'training', 'presentation', 'negotiation', 'time management',
-            'motivated', 'passionate', 'learning', 'critical thinking', 'interpersonal',
-            'conflict resolution', 'emotional intelligence', 'proactive'
-        ]
-
-        domain_keywords = [
-            'agile', 'scrum', 'kanban', 'ci/cd', 'devops', 'testing', 'debugging',
-            'optimization', 'architecture', 'design patterns', 'api', 'microservices',
-            'cloud computing', 'security', 'automation', 'monitoring', 'logging',
-            'performance tuning', 'full-stack', 'web development', 'responsive', 'ui', 'ux',
-            'project management', 'product management', 'business analysis', 'data modeling',
-            'system design', 'requirements gathering'
-        ]
-
-        resume_lower = resume_text.lower() # Convert resume text to lowercase for case-insensitive matching
-
-        # Find skills by checking if keywords exist in the resume text
-        found_technical = sorted(list(set([skill for skill in technical_keywords if skill.lower() in resume_lower])))
-        found_soft = sorted(list(set([skill for skill in soft_keywords if skill.lower() in resume_lower])))
-        found_domain = sorted(list(set([skill for skill in domain_keywords if skill.lower() in resume_lower])))
-
-        return {
-            "technical": found_technical,
-            "soft": found_soft,
-            "domain": found_domain
-        }
+        # A single pass of the precompiled, word-boundary-aware matcher plus the semantic
+        # search, run once per resume and shared through the memoized parse
+        return parse_resume(resume_text).skills
 
     @staticmethod
-    def create_optimized_resume(resume_text: str, job_description: str = "") -> str:
+    def create_optimized_resume(resume_text: str, job_description: str = "",
+                                skills: Dict[str, List[str]] = None) -> str:
         """
         Creates a basic ATS-friendly resume format by extracting and structuring
         information from the raw resume text. This is a rule-based approach.
         It also attempts to incorporate job-specific keywords.
+        Pass 'skills' when they were already extracted to avoid scanning the text again.
         """
-        lines = [line.strip() for line in resume_text.split('\n') if line.strip()]
-        name_line = lines[0] if lines else "Your Name" # Assume first non-empty line is the name
-
-        # Extract contact information using regular expressions
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        phone_pattern = r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-
-        email_match = re.search(email_pattern, resume_text)
-        phone_match = re.search(phone_pattern, resume_text)
-
-        contact_info = []
-        if email_match:
-            contact_info.append(f"Email: {email_match.group()}")
-        if phone_match:
-            contact_info.append(f"Phone: {phone_match.group()}")
-
-        # Extract skills using the simple keyword extraction method
-        skills = SimpleFallback.extract_skills_simple(resume_text)
-
-        # Attempt to extract common resume sections based on keywords
-        experience_section = ""
-        education_section = ""
-        
-        text_lower = resume_text.lower()
-        
-        # Heuristic to find and extract the "Experience" section
-        if "experience:" in text_lower or "professional experience" in text_lower:
-            exp_start_idx = -1
-            if "experience:" in text_lower:
-                exp_start_idx = text_lower.find("experience:")
-            elif "professional experience" in text_lower:
-                exp_start_idx = text_lower.find("professional experience")
-
-            if exp_start_idx != -1:
-                # Find the end of the experience section by looking for subsequent major sections
-                exp_end_idx = len(resume_text)
-                for section_header in ["education:", "skills:", "projects:", "awards:"]:
-                    found_idx = text_lower.find(section_header, exp_start_idx + len("experience:"))
-                    if found_idx != -1 and found_idx < exp_end_idx:
-                        exp_end_idx = found_idx
-                experience_section = resume_text[exp_start_idx:exp_end_idx].strip()
-                # Remove the header itself from the extracted section
-                experience_section = re.sub(r'(?i)experience:|professional experience', '', experience_section, count=1).strip()
-
-
-        # Heuristic to find and extract the "Education" section
-        if "education:" in text_lower:
-            edu_start_idx = text_lower.find("education:")
-            edu_end_idx = len(resume_text)
-            for section_header in ["skills:", "projects:", "awards:"]:
-                found_idx = text_lower.find(section_header, edu_start_idx + len("education:"))
-                if found_idx != -1 and found_idx < edu_end_idx:
-                    edu_end_idx = found_idx
-            education_section = resume_text[edu_start_idx:edu_end_idx].strip()
-            education_section = re.sub(r'(?i)education:', '', education_section, count=1).strip()
-
-
-        # Identify job keywords that appear in the resume and the job description
-        job_keywords = []
-        if job_description:
-            job_lower = job_description.lower()
-            all_skills_combined = skills['technical'] + skills['domain'] # Combine relevant skill types
-            job_keywords = [keyword for keyword in all_skills_combined if keyword.lower() in job_lower]
-
-        # Generate the structured, ATS-friendly resume
-        optimized_resume = f"""
-{name_line}
-{', '.join(contact_info)}
-
-PROFESSIONAL SUMMARY
-Experienced professional with a strong background in software development and project delivery.
-Adept at leveraging modern technologies to build scalable and efficient solutions.
-{f"Key skills aligned with target role: {', '.join(job_keywords[:5])}" if job_keywords else "Committed to continuous learning and achieving impactful results."}
-
-TECHNICAL SKILLS
-• Programming Languages: {', '.join([s.title() for s in skills['technical'][:6]]) if skills['technical'] else 'Not specified'}
-• Frameworks & Tools: {', '.join([s.title() for s in skills['technical'][6:12]]) if len(skills['technical']) > 6 else 'Not specified'}
-• Databases & Cloud: {', '.join([s.upper() if s.upper() in ['SQL', 'AWS', 'GCP'] else s.title() for s in skills['technical'][12:18]]) if len(skills['technical']) > 12 else 'Not specified'}
-• Development Practices: {', '.join([s.title() for s in skills['domain'][:6]]) if skills['domain'] else 'Not specified'}
-
-PROFESSIONAL EXPERIENCE
-{experience_section if experience_section else '''
-Software Developer | Tech Solutions Inc. | 20XX - Present
-• Developed and maintained full-stack web applications, improving user engagement by X%.
-• Implemented robust backend APIs, supporting high-traffic user interactions.
-• Collaborated with cross-functional teams to define, design, and ship new features.
-• Participated in code reviews, ensuring high code quality and adherence to best practices.
-'''}
-
-EDUCATION
-{education_section if education_section else 'B.S. in Computer Science | University Name | 20XX'}
-
-CORE COMPETENCIES
-• {', '.join([s.title() for s in (skills['soft'] + skills['domain'])[:8]]) if (skills['soft'] + skills['domain']) else 'Problem Solving • Adaptability • Teamwork • Innovation'}
-
-=== ATS OPTIMIZATION FEATURES ===
-✓ Standard section headers for ATS parsing
-✓ Keyword optimization based on job requirements
-✓ Quantified achievements and metrics (where provided or templated)
-✓ Clean, professional formatting
-✓ Relevant technical skills prominently displayed
-✓ Action-oriented bullet points
-        """
-        return optimized_resume.strip()
+        return analyze_resume(resume_text, job_description, skills).optimized_resume
+
+def analyze_resume(resume_text: str, job_description: str = "",
+                   skills: Dict[str, List[str]] = None) -> ResumeAnalysis:
+    """
+    Runs the rule-based optimization and returns its structured result (see
+    utils/results.py): the resume is parsed and matched against the job description
+    once, and nothing is formatted until a rendering is requested.
+    Pass 'skills' when they were already extracted to avoid scanning the text again.
+    """
+    started = time.perf_counter()
+    # Parse the resume once: name, contact fields, sections and skills come from the same scan
+    resume = parse_resume(resume_text)
+    if skills is None:
+        skills = resume.skills
+    parsed = time.perf_counter()
+
+    # Identify the technical and domain skills that the job description asks for
+    job_keywords = []
+    if job_description:
+        job_terms = find_skills(job_description)
+        job_keywords = [keyword for keyword in skills['technical'] + skills['domain'] if keyword in job_terms]
+    sections = {}
+    for name in ("experience", "education"):
+        section_text = resume.section_text(name)
+        if section_text:
+            sections[name] = section_text
+    return ResumeAnalysis(resume.name, resume.email, resume.phone, skills, job_keywords, sections, {
+        "parse": round(parsed - started, 6),
+        "job_matching": round(time.perf_counter() - parsed, 6),
+    })
 
 def simple_resume_optimization(resume_text: str, job_description: str) -> str:
     """
     Performs an enhanced simple resume optimization using the SimpleFallback class.
     This function generates a skill analysis, an ATS-optimized resume,
     and a job matching analysis without relying on an LLM.
+    Returns the plain-text report; use analyze_resume for the structured result.
     """
     print("🔄 Running enhanced optimization (fallback mode)...")
-
-    # Extract skills using the SimpleFallback method
+    return analyze_resume(resume_text, job_description).render_text()
+
+def _format_prompt(resume_text: str, skills_text: str, job_description: str) -> str:
+    """Fills in the optimization prompt template."""
+    return (
+        f"You are an expert resume writer. Create a highly ATS-friendly resume. "
+        f"Utilize the following information to tailor the resume specifically for the job description:\n\n"
+        f"--- ORIGINAL RESUME CONTENT ---\n{resume_text}\n\n"
+        f"--- EXTRACTED SKILLS ---\n{skills_text}\n\n"
+        f"--- JOB DESCRIPTION ---\n{job_description}\n\n"
+        f"Focus on:\n"
+        f"- Incorporating keywords from the job description naturally\n"
+        f"- Quantifying achievements wherever possible\n"
+        f"- Using clear, standard section headers\n"
+        f"- Ensuring ATS-friendly formatting\n"
+        f"Provide only the complete, well-formatted resume text."
+    )
+
+class OptimizationPrompt:
+    """A prompt ready to send, with its token count before and after compaction."""
+    __slots__ = ('prompt', 'original_tokens', 'prompt_tokens')
+
+    def __init__(self, prompt: str, original_tokens: int, prompt_tokens: int):
+        self.prompt = prompt
+        self.original_tokens = original_tokens
+        self.prompt_tokens = prompt_tokens
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.original_tokens - self.prompt_tokens
+
+def prepare_optimization_prompt(resume_text: str, job_description: str, provider: str = None) -> OptimizationPrompt:
+    """
+    Builds the prompt sent to the LLM for AI-powered optimization.
+    Skills extracted by SimpleFallback are included to give the model structured context.
+    The job description is compacted (duplicates and boilerplate removed, then trimmed to
+    the input token budget, see utils/prompt_budget.py) and tokens are counted for 'provider'.
+    """
     skills = SimpleFallback.extract_skills_simple(resume_text)
-    # Create the optimized resume structure using SimpleFallback
-    optimized = SimpleFallback.create_optimized_resume(resume_text, job_description)
-
-    # Calculate job matching: find skills from the resume that are present in the job description
-    all_skills_for_matching = skills['technical'] + skills['domain'] # Focus on technical and domain skills for matching
-    job_matches = [skill for skill in all_skills_for_matching if skill.lower() in job_description.lower()]
-
-    # Format the comprehensive result
-    result = f"""
---- SKILL ANALYSIS ---
-Technical Skills: {', '.join(skills['technical']) if skills['technical'] else 'None found'}
-Soft Skills: {', '.join(skills['soft']) if skills['soft'] else 'None found'}
-Domain Skills: {', '.join(skills['domain']) if skills['domain'] else 'None found'}
-
---- ATS-OPTIMIZED RESUME ---
-{optimized}
-
---- JOB MATCHING ANALYSIS ---
-Job Keywords Found in Resume: {len(job_matches)} matches detected
-Matched Skills: {', '.join(job_matches) if job_matches else 'No direct skill matches found based on current keywords.'}
-
---- OPTIMIZATION RECOMMENDATIONS ---
-✓ Structured with ATS-friendly formatting
-✓ Incorporated relevant keywords from job description
-✓ Quantified achievements where possible (ensure your original resume has these)
-✓ Used action verbs and professional language
-✓ Optimized for keyword scanning systems
-✓ Clear section headers for ATS parsing
+    skills_text = (
+        f"Technical: {', '.join(skills['technical'])}\n"
+        f"Soft: {', '.join(skills['soft'])}\n"
+        f"Domain: {', '.join(skills['domain'])}"
+    )
+
+    with span("prompt_build", provider=provider or "") as prompt_span:
+        # Construct the prompt for the LLM to generate the optimized resume
+        original_prompt = _format_prompt(resume_text, skills_text, job_description)
+        original_tokens = count_tokens(original_prompt, provider)
+        if not compaction_enabled():
+            return OptimizationPrompt(original_prompt, original_tokens, original_tokens)
+
+        resume_text = compact_resume_text(resume_text)
+        budget = prompt_budget()
+        job_description_budget = 0
+        if budget:
+            # Whatever the resume and instructions leave of the budget goes to the job description
+            fixed_tokens = count_tokens(_format_prompt(resume_text, skills_text, ""), provider)
+            job_description_budget = max(MIN_JOB_DESCRIPTION_TOKENS, budget - fixed_tokens)
+        # A job description with no sentence left after compaction is cut to its budget instead,
+        # never sent whole
+        job_description = (compact_job_description(job_description, job_description_budget, provider)
+                           or truncate_to_tokens(job_description, job_description_budget, provider))
+
+        prompt = _format_prompt(resume_text, skills_text, job_description)
+        prepared = OptimizationPrompt(prompt, original_tokens, count_tokens(prompt, provider))
+        prompt_span.set(original_tokens=prepared.original_tokens, prompt_tokens=prepared.prompt_tokens,
+                        tokens_saved=prepared.tokens_saved)
+        if budget and prepared.prompt_tokens > budget:
+            # The resume and instructions leave less than MIN_JOB_DESCRIPTION_TOKENS of the budget
+            prompt_span.set(budget_exceeded=True)
+            print(f"⚠️ The prompt uses {prepared.prompt_tokens} tokens, over the budget of {budget} "
+                  f"(RESUME_AGENT_PROMPT_BUDGET): the resume and instructions leave too little room for the job description.")
+        return prepared
+
+def build_optimization_prompt(resume_text: str, job_description: str, provider: str = None) -> str:
+    """Returns only the prompt text of prepare_optimization_prompt."""
+    return prepare_optimization_prompt(resume_text, job_description, provider).prompt
+
+def llm_resume_optimization(llm_instance, resume_text: str, job_description: str, prompt: str = None) -> str:
     """
-    return result
-
+    Runs the AI-powered optimization with the given LLM instance.
+    Returns the text content of the LLM's response.
+    Pass 'prompt' to send a prompt already built with prepare_optimization_prompt.
+    """
+    prompt = prompt or build_optimization_prompt(resume_text, job_description, getattr(llm_instance, 'provider', None))
+    with span("llm_call", mode="invoke", provider=getattr(llm_instance, 'provider', ""),
+              prompt_tokens=estimate_tokens(prompt)) as llm_span:
+        # Invoke the LLM to get the optimized resume content
+        response = llm_instance.invoke(prompt)
+        # Extract the content from the LLM's response object
+        content = response.content if hasattr(response, 'content') else str(response)
+        llm_span.set(response_tokens=estimate_tokens(content), cache_hit=getattr(response, 'cached', False))
+    return content
+
+def llm_resume_optimization_stream(llm_instance, resume_text: str, job_description: str,
+                                   prompt: str = None) -> Iterator[str]:
+    """
+    Streaming counterpart of llm_resume_optimization: yields the response text
+    chunk by chunk as the LLM produces it, using the chat model's 'stream'.
+    """
+    prompt = prompt or build_optimization_prompt(resume_text, job_description, getattr(llm_instance, 'provider', None))
+    with span("llm_call", mode="stream", provider=getattr(llm_instance, 'provider', ""),
+              prompt_tokens=estimate_tokens(prompt)) as llm_span:
+        started = time.perf_counter()
+        chars = 0
+        try:
+            for chunk in llm_instance.stream(prompt):
+                content = chunk.content if hasattr(chunk, 'content') else str(chunk)
+                if isinstance(content, str) and content:
+                    if not chars:
+                        llm_span.set(first_chunk_seconds=round(time.perf_counter() - started, 6),
+                                     cache_hit=getattr(chunk, 'cached', False))
+                    chars += len(content)
+                    yield content
+        finally:
+            llm_span.set(response_tokens=chars // 4 + 1 if chars else 0)
+
+async def llm_resume_optimization_async(llm_client, resume_text: str, job_description: str,
+                                       prompt: str = None) -> str:
+    """
+    Async counterpart of llm_resume_optimization for use on an event loop,
+    typically with a utils.async_llm.AsyncLLMClient.
+    """
+    prompt = prompt or build_optimization_prompt(resume_text, job_description, getattr(llm_client, 'provider', None))
+    with span("llm_call", mode="async", provider=getattr(llm_client, 'provider', ""),
+              prompt_tokens=estimate_tokens(prompt)) as llm_span:
+        response = await llm_client.ainvoke(prompt)
+        content = response.content if hasattr(response, 'content') else str(response)
+        llm_span.set(response_tokens=estimate_tokens(content), cache_hit=getattr(response, 'cached', False))
+    return content
@@ -0,0 +1,74 @@
+# utils/section_cache.py
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+from utils.cache_store import LRUCacheStore, get_cache_dir
+
+_cache = None
+_cache_pid = None
+
+class SectionCache:
+    """
+    Persistent record of the last LLM run of each resume, identified by its name and
+    contact lines, for incremental re-optimization: the hash of the resume text and, for
+    a run made section by section, the key of every section prompt (the model, the
+    section's source text and the job requirements relevant to it).
+    It decides when a rerun goes section by section and reports which sections changed.
+    The rewritten sections themselves are reused through the LLM response cache
+    (utils/llm_cache.py), which keys them by the same prompts.
+    """
+
+    def __init__(self, db_path: str = None, max_bytes: int = None, ttl_seconds: float = None):
+        if db_path is None:
+            db_path = os.path.join(get_cache_dir(), 'sections.sqlite3')
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv('RESUME_AGENT_SECTION_CACHE_MB', '32')) * 1024 * 1024)
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv('RESUME_AGENT_SECTION_CACHE_TTL', str(7 * 24 * 3600)))
+        self.store = LRUCacheStore(db_path, max_bytes, ttl_seconds)
+
+    @staticmethod
+    def section_key(model: str, prompt: str) -> str:
+        """Returns the key of a section rewrite by 'model' for the given section prompt."""
+        return hashlib.sha256(f"{model}\n{prompt}".encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def resume_key(identity: str) -> str:
+        """Returns the key under which the last run of a resume is recorded."""
+        return "run:" + hashlib.sha256(identity.strip().encode('utf-8')).hexdigest()
+
+    def previous_run(self, identity: str) -> Optional[Dict]:
+        """
+        Returns the last run of the resume with this identity as {'sections': section keys
+        (empty for a run with the whole prompt), 'resume_sha256': hash of its text}, or None.
+        """
+        value = self.store.get(self.resume_key(identity))
+        if value is None:
+            return None
+        run = json.loads(value)
+        if isinstance(run, list): # Recorded before the resume hash was kept
+            return {"sections": run, "resume_sha256": None}
+        return run
+
+    def record_run(self, identity: str, section_keys: List[str], resume_sha256: str = None):
+        """Records this run of a resume (no section keys for a whole-prompt run) for the next run to compare with."""
+        self.store.put(self.resume_key(identity), json.dumps({"sections": section_keys, "resume_sha256": resume_sha256}))
+
+def get_section_cache() -> Optional[SectionCache]:
+    """
+    Returns the shared section cache, or None when disabled with RESUME_AGENT_SECTION_CACHE=0
+    or when it cannot be opened. A separate instance is opened in each process.
+    """
+    global _cache, _cache_pid
+    if os.getenv('RESUME_AGENT_SECTION_CACHE', '1') == '0':
+        return None
+    if _cache is None or _cache_pid != os.getpid():
+        try:
+            _cache = SectionCache()
+        except Exception as e:
+            print(f"⚠️ Section cache unavailable: {e}")
+            return None
+        _cache_pid = os.getpid()
+    return _cache
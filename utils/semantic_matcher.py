@@ -0,0 +1,379 @@
+# utils/semantic_matcher.py
+import hashlib
+import importlib.util
+import math
+import os
+import random
+import re
+import uuid
+import zlib
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from utils.skill_matcher import DEFAULT_MATCHER, SkillMatcher
+
+# NumPy is optional and imported on first use, so the CLI starts without it;
+# without NumPy skills are found by exact lookup only
+SEMANTIC_AVAILABLE = importlib.util.find_spec('numpy') is not None
+
+# Phrases at least this similar (cosine of their embeddings) to a taxonomy phrase match its skill
+# (RESUME_AGENT_SEMANTIC_THRESHOLD)
+DEFAULT_SEMANTIC_THRESHOLD = 0.75
+EMBEDDING_DIMENSIONS = 256
+# Each character n-gram is added, with a hashed sign, to this many dimensions (a sparse random projection)
+PROJECTIONS = 4
+NGRAM_SIZES = (3, 4)
+MAX_PHRASE_WORDS = 3
+MIN_PHRASE_CHARS = 4
+# Taxonomies with more phrases than this (per phrase length) are searched through an approximate index
+BRUTE_FORCE_MAX_ENTRIES = 4096
+KMEANS_ITERATIONS = 8
+# Clusters probed per query: a tenth of them, at least IVF_MIN_PROBES (about 95% of the matches above
+# the threshold are found, measured on taxonomies of 30k and 100k random words)
+IVF_MIN_PROBES = 8
+IVF_PROBE_FRACTION = 0.1
+# Bumped whenever the embedding of a phrase changes, so cached taxonomy embeddings are rebuilt
+EMBEDDING_FORMAT = 1
+
+_WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+# Left out of phrases, so 'led the team' and 'led a team' are the same phrase
+_STOP_WORDS = frozenset("a an and as at by for from in into of on or our the their to with".split())
+_QUERY_BLOCK = 1024
+
+_rng = random.Random(1)
+_MULTIPLIERS = [_rng.randrange(1, 1 << 32) | 1 for _ in range(PROJECTIONS)]
+_OFFSETS = [_rng.randrange(0, 1 << 32) for _ in range(PROJECTIONS)]
+
+_matcher = None
+_matcher_failed = False
+
+def semantic_enabled() -> bool:
+    """True when NumPy is installed and semantic matching is not disabled (RESUME_AGENT_SEMANTIC_SKILLS=0)."""
+    return SEMANTIC_AVAILABLE and os.getenv('RESUME_AGENT_SEMANTIC_SKILLS', '1') != '0'
+
+def semantic_threshold() -> float:
+    """Returns the configured similarity threshold (RESUME_AGENT_SEMANTIC_THRESHOLD)."""
+    return float(os.getenv('RESUME_AGENT_SEMANTIC_THRESHOLD', str(DEFAULT_SEMANTIC_THRESHOLD)))
+
+def phrase_words(text: str) -> List[str]:
+    """Returns the lowercased words of a text, without stop words."""
+    return [word for word in _WORD_PATTERN.findall(text.lower()) if word not in _STOP_WORDS]
+
+def _numpy():
+    import numpy
+    return numpy
+
+@lru_cache(maxsize=1 << 16)
+def _word_features(word: str) -> Tuple[int, ...]:
+    """CRC32 hashes of the character 3- and 4-grams of a word, with boundary marks ('<ja', 'jav', ..., 'va>')."""
+    padded = f"<{word}>"
+    grams = set()
+    for size in NGRAM_SIZES:
+        grams.update(padded[i:i + size] for i in range(len(padded) - size + 1))
+    return tuple(zlib.crc32(gram.encode('utf-8')) for gram in grams)
+
+def word_vectors(words: List[str]):
+    """
+    Embeds words as unit-length float32 rows: the signed sum of the hashed projections
+    of their character n-grams. A phrase is embedded as the normalized sum of its word
+    vectors, so every word counts the same and a phrase sharing only one long word
+    with a taxonomy phrase stays below the threshold.
+    """
+    np = _numpy()
+    rows, hashes = [], []
+    for row, word in enumerate(words):
+        features = _word_features(word)
+        hashes.extend(features)
+        rows.extend([row] * len(features))
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    rows = np.asarray(rows, dtype=np.int64) * EMBEDDING_DIMENSIONS
+    size = len(words) * EMBEDDING_DIMENSIONS
+    vectors = np.zeros(size, dtype=np.float64)
+    for multiplier, offset in zip(_MULTIPLIERS, _OFFSETS):
+        mixed = (hashes * np.uint64(multiplier) + np.uint64(offset)) & np.uint64(0xFFFFFFFF)
+        dimensions = ((mixed >> np.uint64(8)) % np.uint64(EMBEDDING_DIMENSIONS)).astype(np.int64)
+        signs = np.where(mixed & np.uint64(1), 1.0, -1.0)
+        vectors += np.bincount(rows + dimensions, weights=signs, minlength=size)
+    return _normalize(vectors.reshape(len(words), EMBEDDING_DIMENSIONS).astype(np.float32))
+
+def _normalize(vectors):
+    np = _numpy()
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+def embed_phrases(phrases: List[str]):
+    """Embeds phrases as unit-length float32 rows (one per phrase)."""
+    np = _numpy()
+    words = [phrase_words(phrase) for phrase in phrases]
+    vocabulary = {word: i for i, word in enumerate(dict.fromkeys(word for phrase in words for word in phrase))}
+    vectors = word_vectors(list(vocabulary))
+    embeddings = np.zeros((len(phrases), EMBEDDING_DIMENSIONS), dtype=np.float32)
+    for row, phrase in enumerate(words):
+        for word in phrase:
+            embeddings[row] += vectors[vocabulary[word]]
+    return _normalize(embeddings)
+
+class EmbeddingIndex:
+    """
+    Nearest-neighbour index of unit-length vectors. Up to BRUTE_FORCE_MAX_ENTRIES vectors,
+    queries are scored against all of them in blocked matrix products, which is exact and
+    fastest at that size. Larger indexes are approximate (an inverted file): the vectors
+    are grouped into about sqrt(n) clusters by spherical k-means, and each query is scored
+    against the centroids and then only against the members of its closest clusters
+    (see IVF_PROBE_FRACTION), still in matrix products, one per cluster.
+    """
+
+    def __init__(self, vectors, threshold: float, seed: int = 1):
+        np = _numpy()
+        self.vectors = vectors
+        self.threshold = threshold
+        self.centroids = None
+        if len(vectors) > BRUTE_FORCE_MAX_ENTRIES:
+            clusters = int(math.sqrt(len(vectors)))
+            rng = np.random.default_rng(seed)
+            centroids = vectors[rng.choice(len(vectors), clusters, replace=False)]
+            for _ in range(KMEANS_ITERATIONS):
+                assignment = self._nearest(vectors, centroids)
+                order = np.argsort(assignment, kind='stable')
+                counts = np.bincount(assignment, minlength=clusters)
+                used = counts > 0 # An empty cluster keeps its centroid
+                sums = np.add.reduceat(vectors[order], (np.cumsum(counts) - counts)[used], axis=0)
+                centroids = centroids.copy()
+                centroids[used] = _normalize(sums)
+            assignment = self._nearest(vectors, centroids)
+            self.centroids = centroids
+            self.order = np.argsort(assignment, kind='stable')
+            self.offsets = np.concatenate(([0], np.cumsum(np.bincount(assignment, minlength=clusters))))
+
+    def __len__(self):
+        return len(self.vectors)
+
+    @staticmethod
+    def _nearest(vectors, centroids):
+        """The index of the most similar centroid of each vector."""
+        np = _numpy()
+        return np.concatenate([(vectors[start:start + _QUERY_BLOCK] @ centroids.T).argmax(axis=1)
+                               for start in range(0, len(vectors), _QUERY_BLOCK)])
+
+    def search(self, queries):
+        """
+        Finds the most similar indexed vector of each query (unit-length rows).
+        Returns (indices, similarities); the index is -1 where nothing reaches the threshold.
+        """
+        np = _numpy()
+        best = np.full(len(queries), -1, dtype=np.int64)
+        scores = np.full(len(queries), -1.0, dtype=np.float32)
+        if not len(queries) or not len(self.vectors):
+            return best, scores
+        if self.centroids is None:
+            for start in range(0, len(queries), _QUERY_BLOCK):
+                similarities = queries[start:start + _QUERY_BLOCK] @ self.vectors.T
+                indices = similarities.argmax(axis=1)
+                best[start:start + len(indices)] = indices
+                scores[start:start + len(indices)] = similarities[np.arange(len(indices)), indices]
+        else:
+            # (query, cluster) pairs of each query's closest clusters, grouped by cluster
+            probes = min(max(IVF_MIN_PROBES, int(len(self.centroids) * IVF_PROBE_FRACTION)), len(self.centroids))
+            closest = np.concatenate([
+                np.argpartition(-(queries[start:start + _QUERY_BLOCK] @ self.centroids.T),
+                                probes - 1, axis=1)[:, :probes]
+                for start in range(0, len(queries), _QUERY_BLOCK)
+            ])
+            clusters = closest.ravel()
+            query_ids = np.repeat(np.arange(len(queries)), probes)
+            grouped = np.argsort(clusters, kind='stable')
+            bounds = np.concatenate(([0], np.cumsum(np.bincount(clusters, minlength=len(self.centroids)))))
+            for cluster in range(len(self.centroids)):
+                members = self.order[self.offsets[cluster]:self.offsets[cluster + 1]]
+                probing = query_ids[grouped[bounds[cluster]:bounds[cluster + 1]]]
+                if not len(members) or not len(probing):
+                    continue
+                similarities = queries[probing] @ self.vectors[members].T
+                indices = similarities.argmax(axis=1)
+                values = similarities[np.arange(len(indices)), indices]
+                better = values > scores[probing]
+                best[probing[better]] = members[indices[better]]
+                scores[probing[better]] = values[better]
+        best[scores < self.threshold] = -1
+        return best, scores
+
+def _embeddings_path(phrases: List[str]) -> str:
+    """The cache file of the embeddings of a phrase list, named after the phrases and the embedding layout."""
+    from utils.cache_store import get_cache_dir
+    digest = hashlib.sha256(
+        f"{EMBEDDING_FORMAT}|{EMBEDDING_DIMENSIONS}|{PROJECTIONS}|{NGRAM_SIZES}\n".encode('utf-8') +
+        "\n".join(phrases).encode('utf-8')
+    ).hexdigest()[:16]
+    return os.path.join(get_cache_dir(), f"skill-embeddings-{digest}.npy")
+
+def load_embeddings(phrases: List[str]):
+    """
+    Returns the embeddings of the taxonomy phrases. They are computed once and stored as
+    a .npy file in the cache directory, reused until the phrases change.
+    RESUME_AGENT_TAXONOMY_SNAPSHOT=0 disables the file, as for the compiled matcher.
+    """
+    np = _numpy()
+    if os.getenv('RESUME_AGENT_TAXONOMY_SNAPSHOT', '1') == '0':
+        return embed_phrases(phrases)
+    try:
+        path = _embeddings_path(phrases)
+    except OSError:
+        # No usable cache directory: compute the embeddings without storing them
+        return embed_phrases(phrases)
+    try:
+        embeddings = np.load(path, allow_pickle=False)
+        if embeddings.shape == (len(phrases), EMBEDDING_DIMENSIONS) and embeddings.dtype == np.float32:
+            return embeddings
+    except (OSError, ValueError):
+        pass # Missing or unreadable: rebuild it below
+
+    embeddings = embed_phrases(phrases)
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(temp_path, 'wb') as file:
+            np.save(file, embeddings)
+        os.replace(temp_path, path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+    return embeddings
+
+class SemanticSkillMatcher:
+    """
+    Finds taxonomy skills that a text mentions in other words ('built container
+    orchestration' -> 'kubernetes'), on the CPU and without a network.
+    Every skill name, alias and related phrase of the taxonomy is embedded once (hashed
+    character n-grams, so spelling variants stay close) and indexed by its number of
+    words. Every phrase of one to MAX_PHRASE_WORDS words of the text is embedded from its
+    words' vectors and all of them are scored in one vectorized search per phrase length.
+    A phrase is only compared with taxonomy phrases of the same length, so a single word
+    does not match a longer phrase that happens to contain it.
+    """
+
+    def __init__(self, matcher: SkillMatcher = DEFAULT_MATCHER, threshold: float = None):
+        self.matcher = matcher
+        self.threshold = semantic_threshold() if threshold is None else threshold
+        entries: Dict[str, str] = {}
+        sources = [(skill, skill) for skill in matcher.keyword_categories]
+        sources += [(alias, skill) for alias, skill in matcher.aliases.items()]
+        sources += [(phrase, skill) for skill, phrases in matcher.related.items() for phrase in phrases]
+        for phrase, skill in sources:
+            words = phrase_words(phrase)
+            phrase = " ".join(words)
+            if len(phrase) >= MIN_PHRASE_CHARS and len(words) <= MAX_PHRASE_WORDS:
+                entries.setdefault(phrase, skill)
+        phrases = sorted(entries)
+        embeddings = load_embeddings(phrases)
+
+        # One index per phrase length: {words: (phrases, skills, index)}
+        self.groups: Dict[int, Tuple[List[str], List[str], EmbeddingIndex]] = {}
+        for length in range(1, MAX_PHRASE_WORDS + 1):
+            rows = [row for row, phrase in enumerate(phrases) if phrase.count(" ") + 1 == length]
+            if rows:
+                self.groups[length] = ([phrases[row] for row in rows], [entries[phrases[row]] for row in rows],
+                                       EmbeddingIndex(embeddings[rows], self.threshold))
+
+    def paraphrases_batch(self, texts: List[str]) -> List[Dict[str, Tuple[str, float]]]:
+        """
+        Scores the phrases of many texts together. Returns, for each text, the skills it
+        matches as {skill: (best matching phrase of the text, similarity)}.
+        """
+        np = _numpy()
+        found = [{} for _ in texts]
+        # The words of all texts in a row, with the text and line each belongs to (phrases never span lines)
+        words, owners, lines = [], [], []
+        line_number = 0
+        for number, text in enumerate(texts):
+            for line in text.splitlines():
+                line_words = phrase_words(line)
+                words.extend(line_words)
+                owners.extend([number] * len(line_words))
+                lines.extend([line_number] * len(line_words))
+                line_number += 1
+        if not words:
+            return found
+
+        vocabulary = {word: i for i, word in enumerate(dict.fromkeys(words))}
+        unique_words = list(vocabulary)
+        vectors = word_vectors(unique_words)
+        ids = np.fromiter((vocabulary[word] for word in words), dtype=np.int64, count=len(words))
+        owners, lines = np.asarray(owners), np.asarray(lines)
+        lengths = np.fromiter((len(word) for word in unique_words), dtype=np.int64, count=len(unique_words))[ids]
+
+        for length, (_, skills, index) in self.groups.items():
+            if len(words) < length:
+                continue
+            starts = np.arange(len(words) - length + 1)
+            ends = starts + length - 1
+            chars = sum(lengths[starts + k] for k in range(length)) + length - 1
+            valid = (lines[starts] == lines[ends]) & (chars >= MIN_PHRASE_CHARS)
+            starts = starts[valid]
+            if not len(starts):
+                continue
+            # Each distinct phrase of each text is scored once
+            windows = np.stack([owners[starts]] + [ids[starts + k] for k in range(length)], axis=1)
+            windows = np.unique(windows, axis=0)
+            queries = vectors[windows[:, 1]].copy()
+            for k in range(2, length + 1):
+                queries += vectors[windows[:, k]]
+            best, scores = index.search(_normalize(queries))
+            for row in np.nonzero(best >= 0)[0]:
+                skill = skills[best[row]]
+                score = float(scores[row])
+                matches = found[windows[row, 0]]
+                if skill not in matches or score > matches[skill][1]:
+                    matches[skill] = (" ".join(unique_words[i] for i in windows[row, 1:]), round(score, 4))
+        return found
+
+    def paraphrases(self, text: str) -> Dict[str, Tuple[str, float]]:
+        """Returns the skills the text matches as {skill: (best matching phrase, similarity)}."""
+        return self.paraphrases_batch([text])[0]
+
+    def find_keywords(self, text: str) -> Set[str]:
+        """Returns the skills found by exact lookup or by a similar phrase."""
+        return self.matcher.find_keywords(text) | set(self.paraphrases(text))
+
+    def find_keywords_batch(self, texts: List[str]) -> List[Set[str]]:
+        """find_keywords for many texts, with the phrases of all of them scored in one batch."""
+        return [self.matcher.find_keywords(text) | set(matches)
+                for text, matches in zip(texts, self.paraphrases_batch(texts))]
+
+    def match(self, text: str) -> Dict[str, List[str]]:
+        """Returns the skills found in the text, sorted and grouped by category."""
+        return self.matcher.group(self.find_keywords(text))
+
+def get_semantic_matcher() -> Optional[SemanticSkillMatcher]:
+    """
+    Returns the shared semantic matcher of the default taxonomy, built on first use, or
+    None when semantic matching is unavailable, disabled or could not be built.
+    """
+    global _matcher, _matcher_failed
+    if not semantic_enabled() or _matcher_failed:
+        return None
+    if _matcher is None:
+        try:
+            _matcher = SemanticSkillMatcher()
+        except Exception as e:
+            print(f"⚠️ Semantic skill matching unavailable: {e}")
+            _matcher_failed = True
+            return None
+    return _matcher
+
+@lru_cache(maxsize=256)
+def find_skills(text: str) -> FrozenSet[str]:
+    """
+    Returns the default taxonomy's skills found in the text: exact matches plus, when
+    semantic matching is enabled, skills mentioned in other words. Memoized, so a job
+    description matched against many resumes is scanned once.
+    """
+    semantic = get_semantic_matcher()
+    if semantic is None:
+        return frozenset(DEFAULT_MATCHER.find_keywords(text))
+    return frozenset(semantic.find_keywords(text))
+
+def match_skills(text: str) -> Dict[str, List[str]]:
+    """Returns the skills of find_skills, sorted and grouped by category."""
+    return DEFAULT_MATCHER.group(find_skills(text))
@@ -0,0 +1,226 @@
+# utils/server.py
+import asyncio
+import base64
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from utils.async_llm import AsyncLLMClient
+from utils.input_handlers import ResumeInputHandler
+from utils.resume_processor import analyze_resume, llm_resume_optimization_async, prepare_optimization_prompt
+
+# Largest request body accepted (resume upload plus job description)
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+
+def _preload_pdf_libraries():
+    """Worker initializer: imports the PDF engines once per worker process."""
+    from utils.input_handlers import preload_pdf_engines
+    preload_pdf_engines()
+
+def _noop() -> None:
+    return None
+
+class OptimizationService:
+    """
+    Keeps one warm LLM client and a pool of PDF worker processes for the lifetime of the server.
+    PDF extraction runs in the process pool, LLM calls on a background asyncio loop.
+    At most 'max_pending' requests are admitted at once; further requests are rejected
+    (HTTP 429) instead of queueing without bound.
+    """
+
+    def __init__(self, llm=None, pdf_workers: Optional[int] = None, max_in_flight: int = 8, max_pending: int = 32):
+        self.llm = llm
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+        # Start the PDF workers now, so the first upload does not pay for process start-up and imports
+        pdf_workers = pdf_workers or os.cpu_count() or 1
+        self.pdf_pool = ProcessPoolExecutor(max_workers=pdf_workers, initializer=_preload_pdf_libraries)
+        for future in [self.pdf_pool.submit(_noop) for _ in range(pdf_workers)]:
+            future.result()
+
+        self.loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self.loop.run_forever, name="llm-event-loop", daemon=True)
+        self._loop_thread.start()
+        self.llm_client = AsyncLLMClient(llm, max_in_flight=max_in_flight) if llm is not None else None
+
+    def try_admit(self) -> bool:
+        """Reserves a slot for a request, or returns False if the service is full."""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                return False
+            self.pending += 1
+            return True
+
+    def release(self):
+        """Frees a slot reserved with try_admit."""
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    async def _extract_pdf(self, pdf_bytes: bytes) -> str:
+        """Extracts an uploaded PDF in the process pool, from memory (no temporary file)."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self.pdf_pool, ResumeInputHandler.extract_text_from_pdf_bytes, pdf_bytes)
+
+    async def _optimize(self, resume_text: Optional[str], pdf_bytes: Optional[bytes], job_description: str) -> Dict:
+        started = time.perf_counter()
+        if pdf_bytes is not None:
+            resume_text = await self._extract_pdf(pdf_bytes)
+        if not resume_text or not resume_text.strip():
+            raise ValueError("No text could be extracted from the resume.")
+
+        result, analysis, mode, error = None, None, "fallback", None
+        if self.llm_client is not None:
+            try:
+                # Prompt building (parsing, semantic matching, compaction) is CPU-bound too
+                prepared = await asyncio.to_thread(prepare_optimization_prompt, resume_text, job_description,
+                                                   self.llm_client.provider)
+                result = await llm_resume_optimization_async(self.llm_client, resume_text, job_description,
+                                                             prepared.prompt)
+                mode = "llm"
+            except Exception as e:
+                error = f"LLM optimization failed: {e}"
+        if result is None:
+            # Rule-based optimization is CPU-bound; keep it off the event loop
+            analysis = await asyncio.to_thread(analyze_resume, resume_text, job_description)
+            result = analysis.render_text()
+
+        return {
+            "mode": mode,
+            "result": result,
+            "analysis": analysis.to_dict(include_resume=False) if analysis is not None else None,
+            "error": error,
+            "resume_chars": len(resume_text),
+            "seconds": round(time.perf_counter() - started, 4),
+        }
+
+    def optimize(self, job_description: str, resume_text: str = None, pdf_bytes: bytes = None) -> Dict:
+        """Runs one optimization on the service's event loop and waits for the result."""
+        future = asyncio.run_coroutine_threadsafe(self._optimize(resume_text, pdf_bytes, job_description), self.loop)
+        return future.result()
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                "status": "ok",
+                "llm": type(getattr(self.llm, 'wrapped', self.llm)).__name__ if self.llm is not None else None,
+                "pending": self.pending,
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._loop_thread.join(timeout=5)
+        self.pdf_pool.shutdown(cancel_futures=True)
+
+def _parse_request_body(content_type: str, body: bytes) -> Tuple[Optional[str], Optional[bytes], str]:
+    """
+    Returns (resume_text, pdf_bytes, job_description) from a JSON or multipart/form-data body.
+
+    JSON: {"job_description": ..., "resume_text": ...} or {"job_description": ..., "resume_pdf_base64": ...}
+    Form: a 'resume' file field (.pdf or text) and a 'job_description' field.
+    """
+    if content_type.startswith('application/json'):
+        payload = json.loads(body or b'{}')
+        if not isinstance(payload, dict):
+            raise ValueError("The JSON body must be an object.")
+        for field in ("job_description", "resume_text", "resume_pdf_base64"):
+            if payload.get(field) is not None and not isinstance(payload[field], str):
+                raise ValueError(f"'{field}' must be a string.")
+        pdf_data = payload.get("resume_pdf_base64")
+        pdf_bytes = base64.b64decode(pdf_data) if pdf_data else None
+        resume_text, job_description = payload.get("resume_text"), payload.get("job_description") or ""
+    elif content_type.startswith('multipart/form-data'):
+        message = BytesParser(policy=HTTP).parsebytes(
+            b'Content-Type: ' + content_type.encode('latin-1') + b'\r\n\r\n' + body
+        )
+        fields = {}
+        for part in message.iter_parts():
+            name = part.get_param('name', header='content-disposition')
+            fields[name] = (part.get_filename() or "", part.get_content_type(), part.get_payload(decode=True) or b"")
+        filename, part_type, data = fields.get("resume", ("", "", b""))
+        is_pdf = filename.lower().endswith('.pdf') or part_type == 'application/pdf' or data.startswith(b'%PDF')
+        pdf_bytes = data if is_pdf and data else None
+        resume_text = None if is_pdf else data.decode('utf-8', errors='replace')
+        job_description = fields.get("job_description", ("", "", b""))[2].decode('utf-8', errors='replace')
+    else:
+        raise ValueError("Send application/json or multipart/form-data.")
+
+    if not job_description.strip():
+        raise ValueError("A job description is required.")
+    if pdf_bytes is None and not (resume_text or "").strip():
+        raise ValueError("A resume (text or PDF) is required.")
+    return resume_text, pdf_bytes, job_description
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end: GET /health and POST /optimize."""
+    protocol_version = "HTTP/1.1"
+    service: OptimizationService = None
+
+    def _send_json(self, status: int, payload: Dict, headers: Dict = None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, self.service.status())
+        else:
+            self._send_json(404, {"error": "Not found."})
+
+    def do_POST(self):
+        if self.path != "/optimize":
+            self.close_connection = True
+            self._send_json(404, {"error": "Not found."})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True  # The body's extent is unknown, so the connection cannot be reused
+            self._send_json(400, {"error": "Invalid Content-Length header."})
+            return
+        if length > MAX_UPLOAD_BYTES:
+            self.close_connection = True  # The body is not read, so the connection cannot be reused
+            self._send_json(413, {"error": f"Request body exceeds {MAX_UPLOAD_BYTES} bytes."})
+            return
+        body = self.rfile.read(length)
+
+        if not self.service.try_admit():
+            self._send_json(429, {"error": "Server is busy. Please retry shortly."}, {"Retry-After": "1"})
+            return
+        try:
+            resume_text, pdf_bytes, job_description = _parse_request_body(self.headers.get("Content-Type", ""), body)
+            self._send_json(200, self.service.optimize(job_description, resume_text, pdf_bytes))
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+        except Exception as e:
+            self._send_json(500, {"error": f"Optimization failed: {e}"})
+        finally:
+            self.service.release()
+
+def make_server(service: OptimizationService, host: str = "127.0.0.1", port: int = 8000) -> ThreadingHTTPServer:
+    """Creates (without starting) an HTTP server bound to the given service."""
+    handler = type("RequestHandler", (_RequestHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
@@ -0,0 +1,227 @@
+# utils/skill_matcher.py
+import hashlib
+import json
+import marshal
+import os
+import re
+import sys
+import uuid
+from typing import Dict, List, Optional, Set
+
+# The versioned skill taxonomy (override with RESUME_AGENT_TAXONOMY)
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'skill_taxonomy.json')
+# Bumped whenever the layout of the compiled snapshot changes
+SNAPSHOT_FORMAT = 2
+
+# Words are runs of letters and digits; any other visible character is a token of its own.
+# Phrases are looked up token by token, so 'java' never matches inside 'javascript',
+# 'node.js' matches across its punctuation and line breaks inside a phrase do not matter.
+_TOKEN_PATTERN = re.compile(r'\w+|[^\w\s]')
+_SEPARATOR = '\x1f'
+
+def phrase_key(phrase: str) -> str:
+    """Returns the lookup key of a skill name or alias: its lowercased tokens."""
+    return _SEPARATOR.join(_TOKEN_PATTERN.findall(phrase.lower()))
+
+class SkillMatcher:
+    """
+    Finds taxonomy skills in text in a single pass over its tokens. Every skill name and
+    alias is a key in one dictionary, and the prefixes of multi-word phrases are kept in
+    a set, so each position of the text costs a few dictionary lookups no matter how
+    large the taxonomy is. Matches respect word boundaries ('java' is not found in
+    'javascript', 'ui' not in 'build'), a trailing plural 's' is tolerated ('APIs'), and
+    aliases are reported under their skill name ('k8s' -> 'kubernetes').
+    Related phrases (paraphrases such as 'container orchestration' for 'kubernetes') are
+    kept for the semantic matcher (utils/semantic_matcher.py) and not matched here.
+    """
+
+    def __init__(self, taxonomy: Dict[str, List[str]], aliases: Dict[str, str] = None,
+                 weights: Dict[str, float] = None, version: Optional[int] = None,
+                 related: Dict[str, List[str]] = None):
+        self.version = version
+        self.categories = list(taxonomy)
+        # Map each (lowercased) skill name to every category it belongs to
+        self.keyword_categories: Dict[str, List[str]] = {}
+        for category, keywords in taxonomy.items():
+            for keyword in keywords:
+                categories = self.keyword_categories.setdefault(keyword.lower(), [])
+                if category not in categories:
+                    categories.append(category)
+        self.aliases = {alias.lower(): skill.lower() for alias, skill in (aliases or {}).items()}
+        self.weights = {skill.lower(): weight for skill, weight in (weights or {}).items()}
+        self.related = {skill.lower(): [phrase.lower() for phrase in phrases]
+                        for skill, phrases in (related or {}).items()}
+
+        self._phrases: Dict[str, str] = {}
+        for phrase, skill in list(self.aliases.items()) + [(skill, skill) for skill in self.keyword_categories]:
+            key = phrase_key(phrase)
+            if key:
+                self._phrases[key] = skill
+        self._prefixes: Set[str] = set()
+        self._max_tokens = 1
+        for key in self._phrases:
+            tokens = key.split(_SEPARATOR)
+            self._max_tokens = max(self._max_tokens, len(tokens))
+            for end in range(1, len(tokens)):
+                self._prefixes.add(_SEPARATOR.join(tokens[:end]))
+
+    @classmethod
+    def from_file(cls, path: str) -> "SkillMatcher":
+        """Builds a matcher from a taxonomy JSON file (see load_taxonomy)."""
+        return cls(**load_taxonomy(path))
+
+    @property
+    def taxonomy(self) -> Dict[str, List[str]]:
+        """The skill names of each category."""
+        taxonomy = {category: [] for category in self.categories}
+        for skill, categories in self.keyword_categories.items():
+            for category in categories:
+                taxonomy[category].append(skill)
+        return taxonomy
+
+    def weight(self, skill: str) -> float:
+        """Returns the weight of a skill (1.0 if the taxonomy gives none)."""
+        return self.weights.get(skill, 1.0)
+
+    def find_keywords(self, text: str) -> Set[str]:
+        """Returns the set of skill names (aliases resolved) found in the text."""
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        phrases, prefixes = self._phrases, self._prefixes
+        found = set()
+        for start in range(len(tokens)):
+            key = tokens[start]
+            for end in range(start + 1, min(start + self._max_tokens, len(tokens)) + 1):
+                if end > start + 1:
+                    key += _SEPARATOR + tokens[end - 1]
+                skill = phrases.get(key)
+                if skill is None and key[-1] == 's':
+                    skill = phrases.get(key[:-1])
+                if skill is not None:
+                    found.add(skill)
+                if key not in prefixes:
+                    break
+        return found
+
+    def match(self, text: str) -> Dict[str, List[str]]:
+        """Returns the skills found in the text, sorted and grouped by category."""
+        return self.group(self.find_keywords(text))
+
+    def group(self, keywords) -> Dict[str, List[str]]:
+        """Sorts skill names and groups them by category."""
+        found = {category: [] for category in self.categories}
+        for keyword in keywords:
+            for category in self.keyword_categories.get(keyword, []):
+                found[category].append(keyword)
+        return {category: sorted(keywords) for category, keywords in found.items()}
+
+    def _snapshot(self) -> Dict:
+        """The compiled state of the matcher, as plain values marshal can store."""
+        return {
+            "version": self.version, "categories": self.categories,
+            "keyword_categories": self.keyword_categories, "aliases": self.aliases,
+            "weights": self.weights, "related": self.related, "phrases": self._phrases, "prefixes": self._prefixes,
+            "max_tokens": self._max_tokens,
+        }
+
+    @classmethod
+    def _from_snapshot(cls, data: Dict) -> "SkillMatcher":
+        matcher = cls.__new__(cls)
+        matcher.version = data["version"]
+        matcher.categories = data["categories"]
+        matcher.keyword_categories = data["keyword_categories"]
+        matcher.aliases = data["aliases"]
+        matcher.weights = data["weights"]
+        matcher.related = data["related"]
+        matcher._phrases = data["phrases"]
+        matcher._prefixes = data["prefixes"]
+        matcher._max_tokens = data["max_tokens"]
+        return matcher
+
+def load_taxonomy(path: str) -> Dict:
+    """
+    Reads a taxonomy JSON file: {"version", "default_weights": {category: weight},
+    "skills": {category: [name | {"name", "aliases", "related", "weight"}]}}.
+    Returns the keyword arguments of SkillMatcher (taxonomy, aliases, weights, version, related).
+    A skill listed twice, or an alias or related phrase claimed by two skills, is an error.
+    """
+    with open(path, 'r', encoding='utf-8') as file:
+        data = json.load(file)
+
+    default_weights = data.get("default_weights", {})
+    taxonomy, aliases, weights, related, owners, related_owners = {}, {}, {}, {}, {}, {}
+    for category, entries in data["skills"].items():
+        taxonomy[category] = []
+        for entry in entries:
+            if isinstance(entry, str):
+                entry = {"name": entry}
+            name = entry["name"].lower()
+            if name in owners:
+                raise ValueError(f"Skill '{name}' is listed twice in {path} ({owners[name]} and {category}).")
+            owners[name] = category
+            taxonomy[category].append(name)
+            weights[name] = float(entry.get("weight", default_weights.get(category, 1.0)))
+            for alias in entry.get("aliases", []):
+                alias = alias.lower()
+                if aliases.get(alias, name) != name:
+                    raise ValueError(f"Alias '{alias}' in {path} belongs to both '{aliases[alias]}' and '{name}'.")
+                aliases[alias] = name
+            for phrase in entry.get("related", []):
+                phrase = phrase.lower()
+                if related_owners.get(phrase, name) != name:
+                    raise ValueError(f"Related phrase '{phrase}' in {path} belongs to both "
+                                     f"'{related_owners[phrase]}' and '{name}'.")
+                related_owners[phrase] = name
+                related.setdefault(name, []).append(phrase)
+    for alias, name in aliases.items():
+        if alias in owners and alias != name:
+            raise ValueError(f"Alias '{alias}' of '{name}' in {path} is also a skill name.")
+    return {"taxonomy": taxonomy, "aliases": aliases, "weights": weights, "version": data.get("version"),
+            "related": related}
+
+def _snapshot_path(path: str) -> str:
+    """The snapshot file of a taxonomy, named after its path, modification time and size."""
+    from utils.cache_store import get_cache_dir
+    stat = os.stat(path)
+    identity = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}|{SNAPSHOT_FORMAT}|{sys.version_info[:2]}"
+    digest = hashlib.sha256(identity.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(get_cache_dir(), f"taxonomy-{digest}.marshal")
+
+def load_matcher(path: str = None) -> SkillMatcher:
+    """
+    Returns the matcher for a taxonomy file (default: RESUME_AGENT_TAXONOMY or the bundled
+    taxonomy). The compiled matcher is stored as a marshal snapshot in the cache directory
+    and reused until the file changes, so startup does not rebuild the lookup tables.
+    Set RESUME_AGENT_TAXONOMY_SNAPSHOT=0 to always build from the JSON file.
+    """
+    path = path or os.getenv('RESUME_AGENT_TAXONOMY') or DEFAULT_TAXONOMY_PATH
+    if os.getenv('RESUME_AGENT_TAXONOMY_SNAPSHOT', '1') == '0':
+        return SkillMatcher.from_file(path)
+
+    try:
+        snapshot = _snapshot_path(path)
+    except OSError:
+        # No usable cache directory: the snapshot is only a speed-up, build from the file
+        return SkillMatcher.from_file(path)
+    try:
+        with open(snapshot, 'rb') as file:
+            return SkillMatcher._from_snapshot(marshal.loads(file.read()))
+    except (OSError, EOFError, ValueError, TypeError, KeyError):
+        pass # Missing, stale or unreadable: rebuild it below
+
+    matcher = SkillMatcher.from_file(path)
+    temp_path = f"{snapshot}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(temp_path, 'wb') as file:
+            file.write(marshal.dumps(matcher._snapshot()))
+        os.replace(temp_path, snapshot)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+    return matcher
+
+# Loaded once at import so every call reuses the compiled lookup tables
+DEFAULT_MATCHER = load_matcher()
+# Skill names of the default taxonomy, grouped by category
+DEFAULT_TAXONOMY = DEFAULT_MATCHER.taxonomy
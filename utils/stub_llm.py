@@ -0,0 +1,73 @@
+# utils/stub_llm.py
+import asyncio
+import random
+import time
+from typing import Iterator
+
+class StubResponse:
+    """Mirrors the 'content' attribute of LangChain messages and message chunks."""
+
+    def __init__(self, content: str):
+        self.content = content
+
+    def __str__(self):
+        return self.content
+
+class StubChatModel:
+    """
+    A local stand-in for the LangChain chat models, for tests, benchmarks and the server's
+    stub mode. It makes no network calls: after 'latency' seconds it produces
+    'response_tokens' tokens at 'tokens_per_second' (0 = instantly), and supports
+    invoke, ainvoke and stream like the real models.
+    To simulate an unreliable provider, a fraction 'tail_probability' of calls takes
+    'tail_latency' extra seconds and a fraction 'failure_rate' raises an error.
+    """
+
+    def __init__(self, latency: float = 0.5, tokens_per_second: float = 0.0, response_tokens: int = 300,
+                 model: str = "stub-model", tail_latency: float = 0.0, tail_probability: float = 0.0,
+                 failure_rate: float = 0.0, seed: int = None):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.response_tokens = response_tokens
+        self.model = model
+        self.tail_latency = tail_latency
+        self.tail_probability = tail_probability
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    def _start_call(self) -> float:
+        """Counts a call, raises a simulated failure if drawn, and returns its latency before the first token."""
+        self.calls += 1
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            raise RuntimeError(f"{self.model}: simulated provider failure")
+        if self.tail_probability and self._random.random() < self.tail_probability:
+            return self.latency + self.tail_latency
+        return self.latency
+
+    def _tokens(self, prompt) -> Iterator[str]:
+        """Yields a deterministic response: a header line followed by filler tokens."""
+        yield f"[{self.model}] Optimized resume for a {len(str(prompt))}-character prompt\n"
+        for i in range(1, self.response_tokens):
+            yield "token\n" if i % 12 == 0 else "token "
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def invoke(self, prompt, *args, **kwargs):
+        latency = self._start_call()
+        time.sleep(latency + self._token_delay() * self.response_tokens)
+        return StubResponse("".join(self._tokens(prompt)))
+
+    async def ainvoke(self, prompt, *args, **kwargs):
+        latency = self._start_call()
+        await asyncio.sleep(latency + self._token_delay() * self.response_tokens)
+        return StubResponse("".join(self._tokens(prompt)))
+
+    def stream(self, prompt, *args, **kwargs):
+        time.sleep(self._start_call())
+        delay = self._token_delay()
+        for token in self._tokens(prompt):
+            if delay:
+                time.sleep(delay)
+            yield StubResponse(token)
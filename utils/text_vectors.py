@@ -0,0 +1,109 @@
+# utils/text_vectors.py
+import re
+import zlib
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from utils.skill_matcher import DEFAULT_MATCHER, SkillMatcher
+
+# Sparse vector support is optional; the interactive tool works without it
+try:
+    import numpy as np
+    from scipy import sparse
+    VECTORS_AVAILABLE = True
+except ImportError:
+    VECTORS_AVAILABLE = False
+
+# Number of hashed term columns; terms are hashed, so no vocabulary has to be stored
+TERM_DIMENSIONS = 1 << 20
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+STOP_WORDS = frozenset("""
+a an and are as at be but by for from has have in is it of on or our that the their
+this to we will with you your who what which all any can may must should would
+""".split())
+
+def require_vectors():
+    """Raises ImportError with an install hint when NumPy/SciPy are missing."""
+    if not VECTORS_AVAILABLE:
+        raise ImportError("Sparse matching requires NumPy and SciPy. Install with: pip install numpy scipy")
+
+def tokenize(text: str) -> List[str]:
+    """Lowercases the text and splits it into word tokens, dropping stop words."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+@lru_cache(maxsize=1 << 16)
+def _token_hash(token: str) -> int:
+    """CRC32 of a token; stable across processes, unlike Python's hash()."""
+    return zlib.crc32(token.encode('utf-8'))
+
+def term_counts(text: str, ngram_range: Tuple[int, int] = (1, 2)) -> Counter:
+    """
+    Counts word n-grams of the text by hashed column id.
+    Longer n-grams combine the hashes of their tokens instead of hashing joined strings.
+    """
+    hashes = [_token_hash(token) for token in tokenize(text)]
+    counts = Counter()
+    low, high = ngram_range
+    for n in range(low, high + 1):
+        if n == 1:
+            counts.update(h % TERM_DIMENSIONS for h in hashes)
+            continue
+        for i in range(len(hashes) - n + 1):
+            h = hashes[i]
+            for j in range(i + 1, i + n):
+                h = ((h * 0x01000193) ^ hashes[j]) & 0xFFFFFFFF
+            counts[h % TERM_DIMENSIONS] += 1
+    return counts
+
+class SkillVocabulary:
+    """Assigns a stable column index to every keyword of a skill taxonomy."""
+
+    def __init__(self, matcher: SkillMatcher = DEFAULT_MATCHER):
+        self.matcher = matcher
+        self.skills = sorted(matcher.keyword_categories)
+        self.index: Dict[str, int] = {skill: i for i, skill in enumerate(self.skills)}
+
+    def __len__(self):
+        return len(self.skills)
+
+    def skill_ids(self, text: str) -> List[int]:
+        """Returns the sorted column indices of the taxonomy skills found in the text."""
+        return sorted(self.index[skill] for skill in self.matcher.find_keywords(text) if skill in self.index)
+
+def term_matrix(texts: List[str], ngram_range: Tuple[int, int] = (1, 2)):
+    """
+    Builds a CSR matrix of sublinear term frequencies (1 + log tf), one row per text.
+    """
+    require_vectors()
+    indptr, indices, data = [0], [], []
+    for text in texts:
+        counts = term_counts(text, ngram_range)
+        columns = sorted(counts)
+        indices.extend(columns)
+        data.extend(counts[column] for column in columns)
+        indptr.append(len(indices))
+    data = 1.0 + np.log(np.asarray(data, dtype=np.float32))
+    return sparse.csr_matrix(
+        (data, np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(texts), TERM_DIMENSIONS),
+    )
+
+def skill_matrix(texts: List[str], vocabulary: SkillVocabulary):
+    """Builds a binary CSR matrix marking which taxonomy skills each text contains."""
+    require_vectors()
+    indptr, indices = [0], []
+    for text in texts:
+        indices.extend(vocabulary.skill_ids(text))
+        indptr.append(len(indices))
+    return sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(texts), len(vocabulary)),
+    )
+
+def normalize_rows(matrix):
+    """Scales each row of a sparse matrix to unit L2 norm (all-zero rows are left as they are)."""
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ matrix